@@ -0,0 +1,21 @@
+# gunicorn settings : gunicorn --config gunicorn.conf.py mobility_matrix:server
+
+# preload mode : data , figures and rendered sections are built once in the master process and
+# the workers are forked from it , sharing that memory instead of building their own copies
+# (see preload() in mobility_matrix.py)
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT' , 8000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY' , 4))
+preload_app = True
+
+
+def when_ready(server) :
+
+    # runs in the master after the app was imported , before the first worker is forked
+
+    import mobility_matrix
+
+    seconds = mobility_matrix.preload()
+    server.log.info(f"preloaded figures and sections in {seconds:.1f} s")
@@ -1,2972 +1,4679 @@
+import time
+import_started = time.perf_counter()         # start of the module import (see import_seconds)
+
 import pandas as pd 
 import plotly.express as px
 import plotly.graph_objects as go
-import base64
-from sklearn.linear_model import LinearRegression
 import numpy as np
 import dash
-from dash import Dash, html, dcc, Input, Output
+from dash import Dash, html, dcc, dash_table, Input, Output, State, ALL, MATCH, Patch, ctx
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
+import threading
+from functools import lru_cache, partial
+from collections import OrderedDict
+import os
+import sys
+import json
+import hashlib
+import logging
+import inspect
+import glob
+import shutil
+import subprocess
+import io
+import math
+import base64
+import importlib.util
+import gc
+import plotly
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from flask import request , g , Response
 
+logger = logging.getLogger('mobility_matrix')
 
-# plot 1 (car sales)
 
+# metrics
 
+# latency and payload histograms of the callbacks, sections and figure builders , served in the
+# prometheus text format on /metrics (every gunicorn worker keeps its own numbers)
 
-car_sales = pd.read_csv('./data/car_sales.csv')
+SECONDS_BUCKETS = [0.005 , 0.01 , 0.025 , 0.05 , 0.1 , 0.25 , 0.5 , 1 , 2.5 , 5 , 10 , 30]
+BYTES_BUCKETS = [1e3 , 1e4 , 5e4 , 1e5 , 2.5e5 , 5e5 , 1e6 , 2.5e6 , 5e6 , 1e7 , 2.5e7]
 
-# use melt() for plotting
+histograms = {
+    'mobility_matrix_callback_seconds' : ('Wall time of a dash callback request' , SECONDS_BUCKETS) ,
+    'mobility_matrix_callback_response_bytes' : ('Size of a dash callback response' , BYTES_BUCKETS) ,
+    'mobility_matrix_section_seconds' : ('Wall time to serve a dropdown section' , SECONDS_BUCKETS) ,
+    'mobility_matrix_section_response_bytes' : ('Serialized size of a dropdown section' , BYTES_BUCKETS) ,
+    'mobility_matrix_figure_load_seconds' : ('Time to build a figure or load it from the figure cache' , SECONDS_BUCKETS)
+}
 
-car_sales_melted = car_sales.melt(
-                                id_vars = 'million_units' ,
-                                var_name = 'year' ,
-                                value_name = 'units'
-)
+histogram_series = {name : {} for name in histograms}     # metric -> labels -> [bucket counts , sum , count]
+section_figure_bytes = {}                                  # section -> {figure name -> serialized size}
+metrics_lock = threading.Lock()
 
-# filter the data for each category
-global_sales = car_sales_melted[car_sales_melted['million_units'] == 'global_car_sales']
-us_sales = car_sales_melted[car_sales_melted['million_units'] == 'us_car_sales']
-europe_sales = car_sales_melted[car_sales_melted['million_units'] == 'europe_car_sales']
 
-# Create the figure
+def observe(metric , labels , value) :
 
-car_sales_fig = go.Figure()
+    buckets = histograms[metric][1]
+    labels = tuple(sorted(labels.items()))
 
-# add global sales as line chart
+    with metrics_lock :
+        series = histogram_series[metric].setdefault(labels , [[0] * len(buckets) , 0.0 , 0])
 
-car_sales_fig.add_trace(go.Scatter(
-                    x = global_sales['year'] ,
-                    y = global_sales['units'] ,
-                    mode = 'lines+markers' ,  
-                    name = 'Global' ,
-                    line = dict(color = '#26518e') ,
-                    hovertemplate = 'Year: %{x}<br>Global Sales: %{y} million<extra></extra>'
-                    )
-)
+        for i , bound in enumerate(buckets) :
+            if value <= bound :
+                series[0][i] += 1
 
-# add US sales as a bar chart
+        series[1] += value
+        series[2] += 1
 
-car_sales_fig.add_trace(go.Bar(
-                x = us_sales['year'] ,
-                y = us_sales['units'] ,
-                name = 'United States' ,
-                marker_color = '#cc1f1f' ,
-                hovertemplate = 'Year: %{x}<br>US Sales: %{y} million<extra></extra>'
-                )
-)
 
-# add Europe sales as a bar chart
+def escape_label(value) :
+    return str(value).replace('\\' , '\\\\').replace('"' , '\\"').replace('\n' , '\\n')
 
-car_sales_fig.add_trace(go.Bar(
-                x = europe_sales['year'] ,
-                y = europe_sales['units'] ,
-                name = 'Europe' ,
-                marker_color = '#27a920' ,
-                hovertemplate = 'Year: %{x}<br>Europe Sales: %{y} million<extra></extra>'
-                )
-)
 
-# Customize layout
+def format_labels(labels) :
 
-car_sales_fig.update_layout(
-                title = 'Car Sales' ,
-                xaxis = dict(
-                            title = 'year' , 
-                            tickmode = 'linear' ,
-                            showgrid = True , 
-                            gridcolor = 'white'
-                        ) ,
-                yaxis = dict(
-                            title = 'units sold' ,
-                            ticksuffix = 'M' ,
-                            showgrid = True , 
-                            gridcolor = 'white'
-                        ) ,
-                barmode = 'group' ,  # Bars are grouped side by side
-                plot_bgcolor = '#BDC3C7' ,
-                paper_bgcolor = '#2C3E50' ,
-                width = 700 ,
-                height = 500 ,
-                legend = dict(title = "Sales Category") ,
-                font = dict(
-                        family = 'PT Sans Narrow' ,
-                        size = 16 ,
-                        color = '#ECF0F1'
-                        )
-)
+    if not labels :
+        return ''
 
+    return '{' + ','.join(f'{key}="{escape_label(value)}"' for key , value in labels) + '}'
 
 
-#market shares plots (scatter)
+def metrics_text() :
 
+    lines = []
 
+    with metrics_lock :
+        for metric , (description , buckets) in histograms.items() :
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} histogram')
 
-# function to encode images in base64
+            for labels , (counts , total , count) in sorted(histogram_series[metric].items()) :
+                for bound , bucket_count in zip(buckets , counts) :
+                    lines.append(f'{metric}_bucket{format_labels(labels + (("le" , f"{bound:g}") ,))} {bucket_count}')
+                lines.append(f'{metric}_bucket{format_labels(labels + (("le" , "+Inf") ,))} {count}')
+                lines.append(f'{metric}_sum{format_labels(labels)} {total:g}')
+                lines.append(f'{metric}_count{format_labels(labels)} {count}')
 
-def encode_image(image_path):
-    # open(image_path, "rb"): opens the image file in binary mode (rb = read binary)
+        # which figures every served section included (and how large each one is)
 
-    with open(image_path, "rb") as image_file:
+        lines.append('# HELP mobility_matrix_section_figure_bytes Serialized size of a figure included in a section')
+        lines.append('# TYPE mobility_matrix_section_figure_bytes gauge')
 
-        # image_file.read(): reads the entire file content
-        # base64.b64encode(): encodes the binary content into a base64 string
-        # "data:image/png;base64,": adds a prefix to tell the browser this is an embedded PNG image.
-        # .decode(): converts the base64 binary string into a regular string for Plotly
+        for section , sizes in sorted(section_figure_bytes.items()) :
+            for figure , size in sorted(sizes.items()) :
+                lines.append(f'mobility_matrix_section_figure_bytes{format_labels((("figure" , figure) , ("section" , section)))} {size}')
 
-        return "data:image/png;base64," + base64.b64encode(image_file.read()).decode()
+    with section_cache_lock :
+        stats = dict(section_cache_stats)
+        entries = len(section_cache)
 
+    for key , value in stats.items() :
+        lines.append(f'# HELP mobility_matrix_section_cache_{key}_total Section cache {key}')
+        lines.append(f'# TYPE mobility_matrix_section_cache_{key}_total counter')
+        lines.append(f'mobility_matrix_section_cache_{key}_total {value}')
 
-# plot 2 (market share global)
+    lines.append('# HELP mobility_matrix_import_seconds Time to import the app module (libraries, registries, layout)')
+    lines.append('# TYPE mobility_matrix_import_seconds gauge')
+    lines.append(f'mobility_matrix_import_seconds {import_seconds:g}')
 
+    lines.append('# HELP mobility_matrix_section_cache_entries Sections held in the section cache')
+    lines.append('# TYPE mobility_matrix_section_cache_entries gauge')
+    lines.append(f'mobility_matrix_section_cache_entries {entries}')
 
+    return '\n'.join(lines) + '\n'
 
-global_market_share = pd.read_csv('./data/global_market_share.csv')
 
 
+# figure registry
 
-global_market_share = global_market_share.melt(
-                                            id_vars = ['company' , 'image'] ,
-                                            var_name = 'year' , 
-                                            value_name = 'value'
-                                        )
+# every figure is a named builder function registered with @register_figure ;
+# a builder only runs the first time get_figure() asks for its figure (from display_content) ,
+# afterwards the finished figure is memoized, so a worker only pays for the sections it serves
 
-# encode the images in the df
+figure_builders = {}                # figure name -> builder function
+figures = {}                        # figure name -> built figure (memoized)
+figure_versions = {}                # figure name -> counts how often the figure was (re)built or loaded
+figures_lock = threading.Lock()     # the dev server is threaded, build every figure only once
+rendering = threading.local()       # names of the figures used by the section rendered in this thread
 
-global_market_share['image'] = global_market_share['image'].apply(encode_image)
 
-# initialize the figure
+def register_figure(name) :
 
-global_market_share_fig = go.Figure()
+    def decorator(builder) :
+        figure_builders[name] = builder
+        return builder
 
-# get unique years
+    return decorator
 
-years_gms = sorted(global_market_share['year'].unique())
 
-# add scatter trace for hover functionality (starting frame)
+def get_figure(name) :
 
-initial_year_gms = years_gms[0] # picks the first year in the sorted list (e.g., 2015)
-initial_data_gms = global_market_share[global_market_share['year'] == initial_year_gms] # filters the df to include only rows where year == initial_year
+    # remember which figures a section uses (see section_layout)
 
-# add a scatter plot for the first year’s data (e.g., 2015)
+    if getattr(rendering , 'figures' , None) is not None :
+        rendering.figures.append(name)
 
-global_market_share_fig.add_trace(go.Scatter(
-                                    x = initial_data_gms['company'] , # company names are on the x-axis
-                                    y = initial_data_gms['value'] ,  # market share values are on the y-axis
-                                    mode = 'markers' ,  # displays invisible markers
-                                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,  # invisible markers are added for hover functionality.
-                                    text = [
-                                            f"{row['company']}<br>{row['value']}% Market Share" # list comprehension generates hover text for each company.
-                                            for _ , row in initial_data_gms.iterrows()
-                                        ] ,
-                                    hoverinfo = 'text'
-                                    )
-)
+    # fast path : figure was already built
 
-# Add animation frames
+    if name in figures :
+        return figures[name]
 
-frames = []
+    with figures_lock :
+        if name not in figures :
 
-# loops through each year in the sorted list of years
+            # try the on-disk cache first, build only if the inputs changed
 
-for year in years_gms:
+            started = time.perf_counter()
+            figure = read_cached_figure(name)
+            source = 'cache'
 
-    # filters the df (year_data) for rows corresponding to the current year
+            if figure is None :
+                figure = build_figure(name)
+                source = 'builder'
 
-    year_data = global_market_share[global_market_share['year'] == year]
-    
-    # scatter trace for the current frame
-
-    scatter = go.Scatter(
-                    x = year_data['company'] ,
-                    y = year_data['value'] , 
-                    mode = 'markers' ,
-                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,
-                    text = [
-                        f"{row['company']}<br>{row['value']}% Market Share<br>{row['year']}"
-                        for _ , row in year_data.iterrows()
-                    ] ,
-                    hoverinfo = 'text'
-    )
-    
-    # add images dynamically to the frame
-    images = [
-        go.layout.Image(
-                    source = row['image'] ,    # uses the base64-encoded image
-                    x = row['company'] ,       # places the image at the company’s x-coordinate 
-                    y = row['value'] ,         # places the image at market share y-coordinate.
-                    xref = 'x' ,
-                    yref = 'y' ,
-                    sizex = 2 ,              # size of images on x-axis
-                    sizey = 2 ,              # size of images on y-axis
-                    xanchor = 'center' ,       # centers the image at the specified coordinates
-                    yanchor = 'middle'         # centers the image at the specified coordinates
-                    )   
-        for _ , row in year_data.iterrows()
-    ]
-    
-    # add the year annotation dynamically to each frame
-
-    annotation = dict(
-                    x = 0.5 , 
-                    y = 1.1 ,
-                    text = f'<b>{year}</b>' ,
-                    showarrow = False ,
-                    xref = 'paper' ,
-                    yref = 'paper' ,
-                    font = dict(
-                            family = 'PT Sans Narrow' , 
-                            size = 20 , 
-                            color = '#ECF0F1'
-                            ) ,
-                    align = 'center'
-    )
-    
-    # combine the scatter plot, images, and annotation into a single frame
+            observe('mobility_matrix_figure_load_seconds' , {'figure' : name , 'source' : source} , time.perf_counter() - started)
 
-    frames.append(go.Frame(
-                        data = [scatter] ,
-                        layout = dict(
-                                    images = images , 
-                                    annotations = [annotation]
-                                ) ,
-                        name = str(year)
-                        )
-    )
+            set_figure(name , figure)
 
-# add all frames to the figure
+    return figures[name]
 
-global_market_share_fig.frames = frames
 
-# add play and pause buttons for the animation
+def set_figure(name , figure) :
+    figures[name] = figure
+    figure_versions[name] = figure_versions.get(name , 0) + 1
 
-global_market_share_fig.update_layout(
-                                updatemenus = [
-                                    {
-                                        'buttons' : [
-                                            {                                                       #'Play' : starts cycling through the frames
-                                                'args' : [None , {'frame' : {'duration' : 1000 ,    # at a speed of 1 frame per second 
-                                                                            'redraw' : True} ,       
-                                                                            'fromcurrent' : True}] ,
-                                                'label' : 'Play' ,
-                                                'method' : 'animate'
-                                            } ,
-                                            {                                                                       #'Pause' : stops the animation
-                                                'args' : [[None] , {'frame' : {'duration' : 0 , 'redraw' : True} , 
-                                                                    'mode' : 'immediate' , 
-                                                                    'transition' : {'duration' : 0}}
-                                                        ] ,
-                                                'label' : 'Pause' ,
-                                                'method' : 'animate'
-                                            }
-                                        ] ,
-                                        'direction' : 'left' ,
-                                        'pad' : {'r' : 10 , 't' : 87} ,
-                                        'showactive' : False ,
-                                        'type' : 'buttons' ,
-                                        'x' : 0.1 ,
-                                        'xanchor' : 'right' ,
-                                        'y' : 0 ,
-                                        'yanchor' : 'top'
-                                    }
-                                ]
-)
 
-# set layout properties
 
-global_market_share_fig.update_layout(
-                                title = 'Global Market Shares' ,
-                                xaxis = dict(title = 'company') ,
-                                yaxis = dict(
-                                            title = 'market share' ,
-                                            range = [0 , 21] ,
-                                            tickmode = 'linear' ,
-                                            tick0 = 0 ,
-                                            dtick = 3 ,
-                                            ticksuffix = '%'
-                                        ) ,
-                                plot_bgcolor = '#BDC3C7' ,
-                                paper_bgcolor = '#2C3E50' ,
-                                font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                        ) ,
-                                width = 700 ,
-                                height = 700
-)
+# on-disk figure cache
 
+# every built figure is written as json to FIGURE_CACHE_DIR together with the content hashes
+# of all files its builder read (csv data, logos) ; on the next start the figure is loaded from
+# there as long as none of those files (and this module itself) changed
+# set FIGURE_CACHE_DIR to an empty string to disable the cache
 
+FIGURE_CACHE_DIR = os.environ.get('FIGURE_CACHE_DIR' , './cache/figures')
 
+tracked_inputs = None       # files read by the builder that is running right now
 
-# plot 3 (us market shares)
 
+def track_input(path) :
 
+    # builders run one at a time (under figures_lock), so a plain list is enough
 
-us_market_share = pd.read_csv('./data/us_market_share.csv')
+    if tracked_inputs is not None and path not in tracked_inputs :
+        tracked_inputs.append(path)
 
-us_market_share = us_market_share.melt(
-                                    id_vars = ['company' , 'image'] , 
-                                    var_name = 'year' , 
-                                    value_name = 'value'
-                    )
 
-# encode the images in the df
+@lru_cache(maxsize = None)
+def hash_file(path , mtime_ns , size) :
 
-us_market_share['image'] = us_market_share['image'].apply(encode_image)
+    # mtime and size are only part of the lru key, so an edited file is hashed again
 
-# initialize the figure
+    with open(path , 'rb') as file :
+        return hashlib.sha256(file.read()).hexdigest()
 
-us_market_share_fig = go.Figure()
 
-# get unique years
+def file_fingerprint(path) :
 
-years_usms = sorted(us_market_share['year'].unique())
+    # a missing input (e.g. the logo manifest before the first build) is part of the fingerprint too
 
-# add scatter trace for hover functionality (starting frame)
+    try :
+        stat = os.stat(path)
+    except FileNotFoundError :
+        return None
 
-initial_year_usms = years_usms[0] # picks the first year in the sorted list (e.g., 2015)
-initial_data_usms = us_market_share[us_market_share['year'] == initial_year_usms] # filters the df to include only rows where year == initial_year
+    return hash_file(path , stat.st_mtime_ns , stat.st_size)
 
-# add a scatter plot for the first year’s data (e.g., 2015)
 
-us_market_share_fig.add_trace(go.Scatter(
-                                    x = initial_data_usms['company'] , # company names are on the x-axis
-                                    y = initial_data_usms['value'] ,  # market share values are on the y-axis
-                                    mode = 'markers' ,  # displays invisible markers
-                                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,  # invisible markers are added for hover functionality.
-                                    text = [
-                                            f"{row['company']}<br>{row['value']}% Market Share" # list comprehension generates hover text for each company.
-                                            for _ , row in initial_data_usms.iterrows()
-                                        ] ,
-                                    hoverinfo = 'text'
-                                    )
-)
+def builder_fingerprint(name) :
 
-# Add animation frames
+    # changed code (or plotly version) must not reuse figures built by the old code ; the whole
+    # module is hashed , since a builder's output also depends on every helper it calls
 
-frames = []
+    builder = figure_builders[name]
+    arguments = ''
 
-# loops through each year in the sorted list of years
+    # builders shared by several figures are registered as partial(builder , **arguments)
 
-for year in years_usms:
+    if isinstance(builder , partial) :
+        arguments = repr((builder.args , sorted(builder.keywords.items())))
 
-    # filters the df (year_data) for rows corresponding to the current year
+    source = file_fingerprint(__file__)
+    key = f'{name}|{plotly.__version__}|{TYPED_ARRAYS}|{source}|{arguments}'
 
-    year_data = us_market_share[us_market_share['year'] == year]
-    
-    # scatter trace for the current frame
-
-    scatter = go.Scatter(
-                    x = year_data['company'] ,
-                    y = year_data['value'] , 
-                    mode = 'markers' ,
-                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,
-                    text = [
-                        f"{row['company']}<br>{row['value']}% Market Share<br>{row['year']}"
-                        for _ , row in year_data.iterrows()
-                    ] ,
-                    hoverinfo = 'text'
-    )
-    
-    # add images dynamically to the frame
-    images = [
-        go.layout.Image(
-                    source = row['image'] ,    # uses the base64-encoded image
-                    x = row['company'] ,       # places the image at the company’s x-coordinate 
-                    y = row['value'] ,         # places the image at market share y-coordinate.
-                    xref = 'x' ,
-                    yref = 'y' ,
-                    sizex = 1.5 ,              # size of images on x-axis
-                    sizey = 1.5 ,              # size of images on y-axis
-                    xanchor = 'center' ,       # centers the image at the specified coordinates
-                    yanchor = 'middle'         # centers the image at the specified coordinates
-                    )   
-        for _ , row in year_data.iterrows()
-    ]
-    
-    # add the year annotation dynamically to each frame
-
-    annotation = dict(
-                    x = 0.5 , 
-                    y = 1.1 ,
-                    text = f'<b>{year}</b>' ,
-                    showarrow = False ,
-                    xref = 'paper' ,
-                    yref = 'paper' ,
-                    font = dict(
-                            family = 'PT Sans Narrow' , 
-                            size = 20 , 
-                            color = '#ECF0F1'
-                            ) ,
-                    align = 'center'
-    )
-    
-    # combine the scatter plot, images, and annotation into a single frame
+    return hashlib.sha256(key.encode()).hexdigest()
 
-    frames.append(go.Frame(
-                        data = [scatter] ,
-                        layout = dict(
-                                    images = images , 
-                                    annotations = [annotation]
-                                ) ,
-                        name = str(year)
-                        )
-    )
 
-# add all frames to the figure
+def figure_cache_path(name) :
+    return os.path.join(FIGURE_CACHE_DIR , f'{name}.json')
 
-us_market_share_fig.frames = frames
 
-# add play and pause buttons for the animation
+def read_cached_figure(name) :
 
-us_market_share_fig.update_layout(
-                                updatemenus = [
-                                    {
-                                        'buttons' : [
-                                            {                                                       #'Play' : starts cycling through the frames
-                                                'args' : [None , {'frame' : {'duration' : 1000 ,    # at a speed of 1 frame per second 
-                                                                            'redraw' : True} ,       
-                                                                            'fromcurrent' : True}
-                                                        ] ,
-                                                'label' : 'Play' ,
-                                                'method' : 'animate'
-                                            } ,
-                                            {                                                                       #'Pause' : stops the animation
-                                                'args' : [[None] , {'frame' : {'duration' : 0 , 'redraw' : True} , 
-                                                                    'mode' : 'immediate' , 
-                                                                    'transition' : {'duration' : 0}}
-                                                        ] ,
-                                                'label' : 'Pause' ,
-                                                'method' : 'animate'
-                                            }
-                                        ] ,
-                                        'direction' : 'left' ,
-                                        'pad' : {'r' : 10 , 't' : 87} ,
-                                        'showactive' : False ,
-                                        'type' : 'buttons' ,
-                                        'x' : 0.1 ,
-                                        'xanchor' : 'right' ,
-                                        'y' : 0 ,
-                                        'yanchor' : 'top'
-                                    }
-                                ]
-)
+    if not FIGURE_CACHE_DIR :
+        return None
 
-# set layout properties
+    try :
+        with open(figure_cache_path(name) , encoding = 'utf-8') as file :
+            cached = json_loads(file.read())
 
-us_market_share_fig.update_layout(
-                                title = 'United States Market Shares' ,
-                                xaxis = dict(title = 'company') ,
-                                yaxis = dict(
-                                            title = 'market share' ,
-                                            range = [0 , 17] ,
-                                            tickmode = 'linear' ,
-                                            tick0 = 0 ,
-                                            dtick = 3 ,
-                                            ticksuffix = '%'
-                                        ) ,
-                                plot_bgcolor = '#BDC3C7' ,
-                                paper_bgcolor = '#2C3E50' ,
-                                font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                        ) ,
-                                width = 700 ,
-                                height = 700
-)
+        if cached['builder'] != builder_fingerprint(name) :
+            return None
 
+        for path , fingerprint in cached['inputs'].items() :
+            if file_fingerprint(path) != fingerprint :
+                return None
 
+    except (OSError , ValueError , KeyError) :
+        return None             # missing, unreadable or stale cache file -> rebuild
 
-# plot 4 (europe market share)
+    return cached['figure']
 
 
+def build_figure(name) :
 
-europe_market_share = pd.read_csv('./data/europe_market_share.csv')
+    global tracked_inputs
 
-europe_market_share = europe_market_share.melt(
-                                    id_vars = ['company' , 'image'] , 
-                                    var_name = 'year' , 
-                                    value_name = 'value'
-                    )
+    tracked_inputs = []
 
-# encode the images in the df
+    try :
+        figure = figure_builders[name]()
+        inputs = tracked_inputs
+    finally :
+        tracked_inputs = None
 
-europe_market_share['image'] = europe_market_share['image'].apply(encode_image)
+    # keep the figure in its serialized (plain dict) form, the same form it has when it is
+    # loaded from the cache ; dcc.Graph accepts both and no plotly validation is repeated
 
-# initialize the figure
+    figure = compact_figure(json_loads(figure.to_json()))
+    figure_json = to_json_plotly(figure)
 
-europe_market_share_fig = go.Figure()
+    if FIGURE_CACHE_DIR :
+        write_cached_figure(name , figure_json , inputs)
 
-# get unique years
+    return figure
 
-years_ems = sorted(europe_market_share['year'].unique())
 
-# add scatter trace for hover functionality (starting frame)
+def write_cached_figure(name , figure_json , inputs) :
 
-initial_year_ems = years_ems[0] # picks the first year in the sorted list (e.g., 2015)
-initial_data_ems = europe_market_share[europe_market_share['year'] == initial_year_ems] # filters the df to include only rows where year == initial_year
+    cached = (
+        '{"builder": ' + json.dumps(builder_fingerprint(name)) +
+        ', "inputs": ' + json.dumps({path : file_fingerprint(path) for path in inputs}) +
+        ', "figure": ' + figure_json + '}'
+    )
 
-# add a scatter plot for the first year’s data (e.g., 2015)
+    # write to a temporary file and rename it, several workers may write the same figure
 
-europe_market_share_fig.add_trace(go.Scatter(
-                                        x = initial_data_ems['company'] , # company names are on the x-axis
-                                        y = initial_data_ems['value'] ,  # market share values are on the y-axis
-                                        mode = 'markers' ,  # displays invisible markers
-                                        marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,  # invisible markers are added for hover functionality.
-                                        text = [
-                                                f"{row['company']}<br>{row['value']}% Market Share" # list comprehension generates hover text for each company.
-                                                for _ , row in initial_data_ems.iterrows()
-                                            ] ,
-                                        hoverinfo = 'text'
-                                        )
-)
+    path = figure_cache_path(name)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
 
-# Add animation frames
+    try :
+        os.makedirs(FIGURE_CACHE_DIR , exist_ok = True)
+        with open(tmp_path , 'w' , encoding = 'utf-8') as file :
+            file.write(cached)
+        os.replace(tmp_path , path)
+    except OSError :
+        pass                    # a read-only cache dir only costs the rebuild on the next start
 
-frames = []
 
-# loops through each year in the sorted list of years
+def build_figure_cache() :
 
-for year in years_ems:
+    # build step : (re)build every figure whose inputs changed and write it to the cache
 
-    # filters the df (year_data) for rows corresponding to the current year
+    rebuilt = []
 
-    year_data = europe_market_share[europe_market_share['year'] == year]
-    
-    # scatter trace for the current frame
-
-    scatter = go.Scatter(
-                    x = year_data['company'] ,
-                    y = year_data['value'] , 
-                    mode = 'markers' ,
-                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,
-                    text = [
-                        f"{row['company']}<br>{row['value']}% Market Share<br>{row['year']}"
-                        for _ , row in year_data.iterrows()
-                    ] ,
-                    hoverinfo = 'text'
-    )
-    
-    # add images dynamically to the frame
-    images = [
-        go.layout.Image(
-                    source = row['image'] ,    # uses the base64-encoded image
-                    x = row['company'] ,       # places the image at the company’s x-coordinate 
-                    y = row['value'] ,         # places the image at market share y-coordinate.
-                    xref = 'x' ,
-                    yref = 'y' ,
-                    sizex = 3 ,              # size of images on x-axis
-                    sizey = 3 ,              # size of images on y-axis
-                    xanchor = 'center' ,       # centers the image at the specified coordinates
-                    yanchor = 'middle'         # centers the image at the specified coordinates
-                    )   
-        for _ , row in year_data.iterrows()
-    ]
-    
-    # add the year annotation dynamically to each frame
-
-    annotation = dict(
-                    x = 0.5 , 
-                    y = 1.1 ,
-                    text = f'<b>{year}</b>' ,
-                    showarrow = False ,
-                    xref = 'paper' ,
-                    yref = 'paper' ,
-                    font = dict(
-                            family = 'PT Sans Narrow' , 
-                            size = 20 , 
-                            color = '#ECF0F1'
-                            ) ,
-                    align = 'center'
-    )
-    
-    # combine the scatter plot, images, and annotation into a single frame
+    for name in figure_builders :
+        if read_cached_figure(name) is None :
+            set_figure(name , build_figure(name))
+            rebuilt.append(name)
 
-    frames.append(go.Frame(
-                        data = [scatter] ,
-                        layout = dict(
-                                    images = images , 
-                                    annotations = [annotation]
-                                ) ,
-                        name = str(year)
-                        )
-    )
+    return rebuilt
 
-# add all frames to the figure
 
-europe_market_share_fig.frames = frames
+# read every csv only once, several figures share the same files (e.g. revenue and sales data)
+# the returned dfs are shared between builders, so builders must not modify them in place
 
-# add play and pause buttons for the animation
+def load_csv(path) :
+    track_input(path)
+    return read_csv_cached(path)
 
-europe_market_share_fig.update_layout(
-                                    updatemenus = [
-                                        {
-                                            'buttons' : [
-                                                {                                                       #'Play' : starts cycling through the frames
-                                                    'args' : [None , {'frame' : {'duration' : 1000 ,    # at a speed of 1 frame per second 
-                                                                                'redraw' : True} ,       
-                                                                                'fromcurrent' : True}] ,
-                                                    'label' : 'Play' ,
-                                                    'method' : 'animate'
-                                                } ,
-                                                {                                                                       #'Pause' : stops the animation
-                                                    'args' : [[None] , {'frame' : {'duration' : 0 , 'redraw' : True} , 
-                                                                        'mode' : 'immediate' , 
-                                                                        'transition' : {'duration' : 0}}
-                                                            ] ,
-                                                    'label' : 'Pause' ,
-                                                    'method' : 'animate'
-                                                }
-                                            ] ,
-                                            'direction' : 'left' ,
-                                            'pad' : {'r' : 10 , 't' : 87} ,
-                                            'showactive' : False ,
-                                            'type' : 'buttons' ,
-                                            'x' : 0.1 ,
-                                            'xanchor' : 'right' ,
-                                            'y' : 0 ,
-                                            'yanchor' : 'top'
-                                        }
-                                    ]
-)
 
-# set layout properties
+@lru_cache(maxsize = None)
+def read_csv_cached(path) :
+    return pd.read_csv(path)
 
-europe_market_share_fig.update_layout(
-                                    title = 'Europe Market Shares' ,
-                                    xaxis = dict(title = 'company') ,
-                                    yaxis = dict(
-                                                title = 'market share' ,
-                                                range = [0 , 31] ,
-                                                tickmode = 'linear' ,
-                                                tick0 = 0 ,
-                                                dtick = 3 ,
-                                                ticksuffix = '%'
-                                            ) ,
-                                    plot_bgcolor = '#BDC3C7' ,
-                                    paper_bgcolor = '#2C3E50' ,
-                                    font = dict(
-                                            family = 'PT Sans Narrow' ,
-                                            size = 16 ,
-                                            color = '#ECF0F1'
-                                            ) ,
-                                    width = 700 ,
-                                    height = 700
-)
 
 
+# figure templates
 
-# comparising plots
+# every figure carried plotly's default template (7.5 KB of json , half of a typical figure) and
+# the same inline colours and fonts ; the dashboard theme and the brand themes are named templates
+# now , registered once in pio.templates and referenced by name (template = 'dashboard_dark')
+# they only keep the parts of the plotly template the figures here use : cartesian and mapbox
+# layout defaults and the defaults of the trace types bar , scatter , scattergl and scattermapbox
 
-# plot 5 (sales by category GB3)
+LEAN_LAYOUT_KEYS = [
+    'autotypenumbers' , 'colorway' , 'font' , 'hovermode' , 'hoverlabel' , 'paper_bgcolor' , 'plot_bgcolor' ,
+    'xaxis' , 'yaxis' , 'shapedefaults' , 'annotationdefaults' , 'title' , 'mapbox'
+]
+LEAN_TRACE_TYPES = ['bar' , 'scatter' , 'scattergl' , 'scattermapbox']
 
 
+def lean_template(**layout) :
 
-audi_sales = pd.read_csv('./data/audi_sales.csv')
-bmw_sales = pd.read_csv('./data/bmw_sales.csv')
-mercedes_sales = pd.read_csv('./data/mercedes_sales.csv')
+    plotly_template = pio.templates['plotly']
 
-# melting the dfs to long format and adding column 'brand'
+    template = go.layout.Template(
+                                layout = {key : plotly_template.layout[key] for key in LEAN_LAYOUT_KEYS} ,
+                                data = {trace_type : plotly_template.data[trace_type] for trace_type in LEAN_TRACE_TYPES}
+    )
+    template.layout.update(layout)
 
-audi_sales_melted = audi_sales.melt(
-                                id_vars = ['category'] , 
-                                var_name = 'year' , 
-                                value_name = 'volume'
-                    )
+    return template
 
-audi_sales_melted['brand'] = 'Audi'
 
-bmw_sales_melted = bmw_sales.melt(
-                                id_vars = ['category'] , 
-                                var_name = 'year' , 
-                                value_name  ='volume'
-                    )
+def brand_template(family , color , paper_bgcolor , gridcolor) :
+    return lean_template(
+                        plot_bgcolor = 'white' ,
+                        paper_bgcolor = paper_bgcolor ,
+                        font = dict(family = family , size = 12 , color = color) ,
+                        xaxis = dict(gridcolor = gridcolor) ,
+                        yaxis = dict(gridcolor = gridcolor)
+    )
 
-bmw_sales_melted['brand'] = 'BMW'
 
-mercedes_sales_melted = mercedes_sales.melt(
-                                        id_vars = ['category'] , 
-                                        var_name = 'year' , 
-                                        value_name = 'volume'
-                        )
+figure_templates = {
+    'dashboard_dark' : lean_template(
+                                    plot_bgcolor = '#BDC3C7' ,
+                                    paper_bgcolor = '#2C3E50' ,
+                                    font = dict(family = 'PT Sans Narrow' , size = 16 , color = '#ECF0F1')
+                    ) ,
+    'audi' : brand_template('Futura' , 'white' , 'black' , 'black') ,          # 'Futura' as closest to AudiType
+    'bmw' : brand_template('Helvetica' , 'black' , '#6F6F6F' , '#6F6F6F') ,      # 'Helvetica' as closest to the bmw font
+    'mercedes' : brand_template('Noto Serif' , '#231f20' , '#dcddd7' , '#dcddd7') ,
+    'toyota' : brand_template('Arial' , 'black' , 'white' , 'black') ,
+    'volkswagen' : brand_template('Arial Rounded MT Bold' , 'black' , '#A8A8A8' , '#A8A8A8')
+}
 
-mercedes_sales_melted['brand'] = 'Mercedes-Benz'
+for name , template in figure_templates.items() :
+    pio.templates[name] = template
 
-# combining all sales data into a single df
+pio.templates.default = 'dashboard_dark'       # also px colours and figures without a template
 
-big_three_sales = pd.concat([audi_sales_melted , bmw_sales_melted , mercedes_sales_melted])
 
-# creating the stacked bar chart (using Plotly Express)
+# plotly.js does not know the template names , figures returned as plain dicts (instead of
+# go.Figure) embed the template itself
 
-big_three_sales_fig = px.bar(
-                            big_three_sales,  
-                            x = 'year' , 
-                            y = 'volume' , 
-                            color = 'brand' , 
-                            color_discrete_map = {
-                                                'Audi' : '#F50537' ,
-                                                'BMW' : '#007eed' ,
-                                                'Mercedes-Benz' : '#7a8084'
-                                            } ,
-                            #  facet_col='brand'
+@lru_cache(maxsize = None)
+def template_json(name) :
+    return pio.templates[name].to_plotly_json()
 
-                            title = 'Total Sales by Year and Company' ,
-                            hover_data = ['category' , 'brand' , 'volume'] ,
-                            labels = {'volume' : 'sales volume' , 'year' : 'year' , 'category' : 'category'} ,
-                            barmode = 'group'
-                        )
 
-# update layout 
 
-big_three_sales_fig.update_layout(
-                                xaxis_title = 'year' ,
-                                yaxis_title = 'total sales volume' ,
-                                legend_title = 'Company' ,
-                                template = 'plotly' ,
-                                xaxis = dict(type = 'category') ,
-                                yaxis = dict(
-                                            tickmode = 'linear',  # set tick mode to linear
-                                            tick0 = 0,            # start ticks at 0
-                                            dtick = 300000,            # step size of 100000
-                                            range = [0, 2500000]
-                                        ) ,
-                                plot_bgcolor = '#BDC3C7' ,
-                                paper_bgcolor = '#2C3E50' ,
-                                font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                        ) ,
-                                width = 700 , 
-                                height = 500        
-)
+# json serialization
 
-# formatting hovertemplate
+# plotly's default json engine encodes every figure three times (encode , parse , encode again)
+# in pure python ; with orjson installed , figures , section layouts and every dash callback
+# response (dash serializes through plotly.io.json) are encoded by orjson instead
+# JSON_ENGINE = json switches back to the plotly encoder
 
-big_three_sales_fig.update_traces(
-                                hovertemplate = (
-                                                '<b>Brand:</b> %{customdata[1]}<br>'
-                                                '<b>Year:</b> %{x}<br>'
-                                                '<b>Category:</b> %{customdata[0]}<br>'
-                                                '<b>Sales Volume:</b> %{y:,} units'
-                                            )
-)
+try :
+    import orjson
+except ImportError :
+    orjson = None
 
+JSON_ENGINE = os.environ.get('JSON_ENGINE' , 'orjson' if orjson is not None else 'json')
+pio.json.config.default_engine = JSON_ENGINE
 
+json_loads = orjson.loads if JSON_ENGINE == 'orjson' else json.loads
 
-# plot 6 (sales by category T&V)
 
+def orjson_default(value) :
 
+    # dash components and anything else orjson does not know (plotly's own encoder rules)
 
-toyota_sales = pd.read_csv('./data/toyota_sales.csv')
-vw_sales = pd.read_csv('./data/volkswagen_sales.csv')
+    if hasattr(value , 'to_plotly_json') :
+        return value.to_plotly_json()
 
-# melting the dfs to long format and adding column 'brand'
+    return plotly.utils.PlotlyJSONEncoder().default(value)
 
-toyota_sales_melted = toyota_sales.melt(
-                                    id_vars = ['category'] , 
-                                    var_name = 'year' , 
-                                    value_name = 'volume'
-                    )
 
-toyota_sales_melted['brand'] = 'Toyota'
+def dumps_json(value) :
 
-vw_sales_melted = vw_sales.melt(
-                            id_vars = ['category'] , 
-                            var_name = 'year' , 
-                            value_name = 'volume'
-                )
+    # plotly's orjson engine first copies the whole value into json compatible types in python ;
+    # a section layout is mostly plain dicts and lists already , orjson takes them as they are
 
-vw_sales_melted['brand'] = 'Volkswagen'
+    if JSON_ENGINE == 'orjson' :
+        return orjson.dumps(value , default = orjson_default , option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
 
-# combining all sales data into a single df
+    return to_json_plotly(value)
 
-sales_tv = pd.concat([toyota_sales_melted , vw_sales_melted])
 
-# creating the stacked bar chart (using Plotly Express)
+# numeric trace arrays are sent as plotly.js typed arrays ({'dtype' , 'bdata' : base64}) : no
+# float formatting on the server, no number parsing in the browser and fewer bytes
+# integer arrays use the smallest integer type that holds them , map coordinates and marker
+# sizes single precision (< 1 m on the map) ; other float arrays (e.g. distances shown in a
+# hover text) keep their exact decimal form
+# arrays that a callback extends with Patch must stay lists , the growth map only extends
+# traces that are still empty (below TYPED_ARRAY_MIN_LENGTH)
 
-sales_tv_fig = px.bar(sales_tv,  
-                            x = 'year' , 
-                            y = 'volume' , 
-                            color = 'brand' , 
-                            color_discrete_map = {
-                                                'Toyota' : '#EB0A1E' ,
-                                                'Volkswagen' : '#6091C3'
-                                            } ,
-                            title = 'Total Sales by Year and Company' ,
-                            hover_data = ['category' , 'brand' , 'volume'] ,
-                            labels = {'volume' : 'Total Sales Volume' , 'year' : 'Year' , 'category' : 'Category'} ,
-                            barmode = 'group'
-)
+TYPED_ARRAYS = os.environ.get('TYPED_ARRAYS' , '1') != '0'
+TYPED_ARRAY_MIN_LENGTH = 32
 
-sales_tv_fig.update_layout(
-                        xaxis_title = 'year' ,
-                        yaxis_title = 'total sales volume' ,
-                        legend_title = 'Company' ,
-                        template = 'plotly' ,
-                        xaxis = dict(type = 'category') ,
-                        yaxis = dict(
-                                    tickmode = 'linear',       # set tick mode to linear
-                                    tick0 = 0,                 # start ticks at 0
-                                    dtick = 800000,            # step size of 800000
-                                    range = [0, 11000000]
-                                ) ,
-                        plot_bgcolor = '#BDC3C7' ,
-                        paper_bgcolor = '#2C3E50' ,
-                        font = dict(
-                                    family = 'PT Sans Narrow' ,
-                                    size = 16 ,
-                                    color = '#ECF0F1'
-                                ) ,
-                        width = 700 , 
-                        height = 500
-)
+typed_array_fields = {
+    ('lat' ,) : 'f4' ,
+    ('lon' ,) : 'f4' ,
+    ('marker' , 'size') : 'f4' ,
+    ('z' ,) : None ,                # None : integers only
+    ('customdata' ,) : None ,
+    ('marker' , 'color') : None
+}
 
-# formatting hovertemplate
+integer_dtypes = [np.uint8 , np.int8 , np.uint16 , np.int16 , np.uint32 , np.int32]
 
-sales_tv_fig.update_traces(
-                        hovertemplate = (
-                                        '<b>Brand:</b> %{customdata[1]}<br>'
-                                        '<b>Year:</b> %{x}<br>'
-                                        '<b>Category:</b> %{customdata[0]}<br>'
-                                        '<b>Sales Volume:</b> %{y:,} units'
-                                    )
-)
 
+def typed_array(values , dtype = None) :
 
+    # numeric 1-d values -> typed array spec , anything else is returned unchanged
 
-# plot 7 (revenue BG3)
+    array = np.asarray(values)
 
+    if array.ndim != 1 or array.dtype.kind not in 'iuf' or len(array) < TYPED_ARRAY_MIN_LENGTH :
+        return values
 
+    if dtype is None :
+        if array.dtype.kind == 'f' and not (np.isfinite(array).all() and (array == np.round(array)).all()) :
+            return values
 
-audi_revenue = pd.read_csv('./data/audi_revenue.csv')
-bmw_revenue = pd.read_csv('./data/bmw_revenue.csv')
-mercedes_revenue = pd.read_csv('./data/mercedes_revenue.csv')
+        low , high = array.min() , array.max()
+        dtype = next((candidate for candidate in integer_dtypes
+                      if np.iinfo(candidate).min <= low and high <= np.iinfo(candidate).max) , None)
 
-# filter rows for 'Revenue'
+        if dtype is None :
+            return values
 
-a_revenue = audi_revenue[audi_revenue['category'] == 'revenue_(euro_billion)']
-b_revenue = bmw_revenue[bmw_revenue['category'] == 'revenue_(euro_billion)']
-m_revenue = mercedes_revenue[mercedes_revenue['category'] == 'revenue_(euro_billion)']
+    array = array.astype(np.dtype(dtype).newbyteorder('<'))
 
-# prepare data for plotting
-years_bg3r = a_revenue.columns[1:]                   # skip the 'category' column
-audi_values_r = a_revenue.iloc[0 , 1:].values         # get values for Audi
-bmw_values_r = b_revenue.iloc[0 , 1:].values          # get values for BMW
-mercedes_values_r = m_revenue.iloc[0 , 1:].values     # get values for Mercedes
+    return {'dtype' : array.dtype.str[1:] , 'bdata' : base64.b64encode(array.tobytes()).decode()}
 
-revenue_bg3_fig = go.Figure()
 
-# Audi's revenue line
+def compact_trace(trace) :
 
-revenue_bg3_fig.add_trace(go.Scatter(
-                                    x = years_bg3r ,
-                                    y = audi_values_r ,
-                                    mode = 'lines+markers' ,
-                                    name = 'Audi' ,
-                                    line_color = '#F50537' ,
-                                    line_width = 3 ,
-                                    marker = dict(size = 10, symbol = 'circle')
-                                )
-)
+    if not TYPED_ARRAYS :
+        return trace
 
-# BMW's revenue line
+    trace = dict(trace)
 
-revenue_bg3_fig.add_trace(go.Scatter(
-                                    x = years_bg3r ,
-                                    y = bmw_values_r ,
-                                    mode = 'lines+markers' ,
-                                    name = 'BMW' ,
-                                    line_color = '#007eed' ,
-                                    line_width = 3 ,
-                                    marker = dict(size = 10, symbol = 'circle')
-                                )
-)
+    for path , dtype in typed_array_fields.items() :
+        parent = trace
 
+        if len(path) == 2 :
+            if not isinstance(trace.get(path[0]) , dict) :
+                continue
+            parent = trace[path[0]] = dict(trace[path[0]])
 
-# Mercedes's revenue line
+        if path[-1] in parent :
+            parent[path[-1]] = typed_array(parent[path[-1]] , dtype)
 
+    return trace
 
-revenue_bg3_fig.add_trace(go.Scatter(
-                                    x = years_bg3r ,
-                                    y = mercedes_values_r ,
-                                    mode = 'lines+markers' ,
-                                    name = 'Mercedes-Benz' ,
-                                    line_color = '#7a8084' ,
-                                    line_width = 3 ,
-                                    marker = dict(size = 10, symbol = 'circle')
-                                )
-)
 
-# customize layout
+def compact_figure(figure) :
 
-revenue_bg3_fig.update_layout(
-                            title = 'Revenue: German Big Three' ,
-                            xaxis_title = 'year' ,
-                            yaxis_title = 'revenue' ,
-                            legend_title = 'company' ,
-                            template = 'plotly' ,
-                            xaxis = dict(
-                                        tickformat = '%Y' ,                       # format x-axis for years
-                                        showgrid = True , 
-                                        gridcolor = 'white'
-                                    ) ,                   
-                            yaxis = dict(
-                                        tickprefix = '€' ,                         # add € prefix
-                                        ticksuffix = 'B' ,                         # add B suffix
-                                        showgrid = True , 
-                                        gridcolor = 'white'
-                                    ) ,
-                            width = 700 ,
-                            height = 500 ,
-                            plot_bgcolor = '#BDC3C7' ,
-                            paper_bgcolor = '#2C3E50' ,
-                            font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                    )         
+    # figure in its plain dict form , every trace (also those of animation frames)
 
-)
+    figure['data'] = [compact_trace(trace) for trace in figure.get('data' , [])]
 
+    for frame in figure.get('frames' , []) :
+        frame['data'] = [compact_trace(trace) for trace in frame.get('data' , [])]
 
+    return figure
 
-# plot 8 (revenue growth BG3)
 
 
+# plot 1 (car sales)
 
-# filter rows for 'Revenue growth'
 
-a_growth = audi_revenue[audi_revenue['category'] == 'revenue_growth_(%)']
-b_growth = bmw_revenue[bmw_revenue['category'] == 'revenue_growth_(%)']
-m_growth = mercedes_revenue[mercedes_revenue['category'] == 'revenue_growth_(%)']
 
-# prepare data for plotting
+@register_figure('car_sales_fig')
+def build_car_sales_fig() :
 
-years_bg3rg = a_growth.columns[1:]                  # skip the 'category' column
-audi_values_rg = a_growth.iloc[0 , 1:].values       # get values for Audi
-bmw_values_rg = b_growth.iloc[0 , 1:].values        # get values for BMW
-mercedes_values_rg = m_growth.iloc[0 , 1:].values   # get values for Mercedes
+    car_sales = load_csv('./data/car_sales.csv')
 
-# plot
+    # use melt() for plotting
 
-revenue_growth_bg3_fig = go.Figure()
+    car_sales_melted = car_sales.melt(
+                                    id_vars = 'million_units' ,
+                                    var_name = 'year' ,
+                                    value_name = 'units'
+    )
 
-# Audi's revenue line
+    # filter the data for each category
+    global_sales = car_sales_melted[car_sales_melted['million_units'] == 'global_car_sales']
+    us_sales = car_sales_melted[car_sales_melted['million_units'] == 'us_car_sales']
+    europe_sales = car_sales_melted[car_sales_melted['million_units'] == 'europe_car_sales']
 
-revenue_growth_bg3_fig.add_trace(go.Scatter(
-                                            x = years_bg3rg ,
-                                            y = audi_values_rg ,
-                                            mode = 'lines+markers' ,
-                                            name = 'Audi' ,
-                                            line_color = '#F50537' ,
-                                            line_width = 3 ,
-                                            marker = dict(size = 10, symbol = 'circle')
-                                        )
-)
+    # Create the figure
 
-# BMW's revenue line
+    car_sales_fig = go.Figure()
 
-revenue_growth_bg3_fig.add_trace(go.Scatter(
-                                            x = years_bg3rg ,
-                                            y = bmw_values_rg ,
-                                            mode = 'lines+markers' ,
-                                            name = 'BMW' ,
-                                            line_color = '#007eed' ,
-                                            line_width = 3 ,
-                                            marker = dict(size = 10, symbol = 'circle')
-                                        )
-)
+    # add global sales as line chart
 
-# Mercedes's revenue line
+    car_sales_fig.add_trace(go.Scatter(
+                        x = global_sales['year'] ,
+                        y = global_sales['units'] ,
+                        mode = 'lines+markers' ,  
+                        name = 'Global' ,
+                        line = dict(color = '#26518e') ,
+                        hovertemplate = 'Year: %{x}<br>Global Sales: %{y} million<extra></extra>'
+                        )
+    )
 
-revenue_growth_bg3_fig.add_trace(go.Scatter(
-                                            x = years_bg3rg ,
-                                            y = mercedes_values_rg ,
-                                            mode = 'lines+markers' ,
-                                            name = 'Mercedes-Benz' ,
-                                            line_color = '#7a8084' ,
-                                            line_width = 3 ,
-                                            marker = dict(size = 10, symbol = 'circle')
-                                        )
-)
+    # add US sales as a bar chart
 
-# customize layout
+    car_sales_fig.add_trace(go.Bar(
+                    x = us_sales['year'] ,
+                    y = us_sales['units'] ,
+                    name = 'United States' ,
+                    marker_color = '#cc1f1f' ,
+                    hovertemplate = 'Year: %{x}<br>US Sales: %{y} million<extra></extra>'
+                    )
+    )
 
-revenue_growth_bg3_fig.update_layout(
-                                    title = 'Revenue growth: German Big Three' ,
-                                    xaxis_title = 'year' ,
-                                    yaxis_title = 'revenue growth %' ,
-                                    legend_title = 'company' ,
-                                    template = 'plotly' ,
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,          # format x-axis for years
-                                                showgrid = True , 
-                                                gridcolor = 'white'
-                                            ) , 
-                                    yaxis = dict(
-                                                ticksuffix = '%' ,           # add % suffix
-                                                showgrid = True , 
-                                                gridcolor = 'white'
-                                            ) ,
-                                    width = 700 ,
-                                    height = 500 ,
-                                    plot_bgcolor = '#BDC3C7' ,
-                                    paper_bgcolor = '#2C3E50' ,
-                                    font = dict(
-                                                family = 'PT Sans Narrow' ,
-                                                size = 16 ,
-                                                color = '#ECF0F1'
-                                            )       
-)
+    # add Europe sales as a bar chart
 
+    car_sales_fig.add_trace(go.Bar(
+                    x = europe_sales['year'] ,
+                    y = europe_sales['units'] ,
+                    name = 'Europe' ,
+                    marker_color = '#27a920' ,
+                    hovertemplate = 'Year: %{x}<br>Europe Sales: %{y} million<extra></extra>'
+                    )
+    )
 
+    # Customize layout
 
-# plot 9 (revenue T&V)
+    car_sales_fig.update_layout(
+                    template = 'dashboard_dark' ,
+                    title = 'Car Sales' ,
+                    xaxis = dict(
+                                title = 'year' , 
+                                tickmode = 'linear' ,
+                                showgrid = True
+                            ) ,
+                    yaxis = dict(
+                                title = 'units sold' ,
+                                ticksuffix = 'M' ,
+                                showgrid = True
+                            ) ,
+                    barmode = 'group' ,  # Bars are grouped side by side
+                    width = 700 ,
+                    height = 500 ,
+                    legend = dict(title = "Sales Category")
+    )
 
+    return car_sales_fig
 
 
-toyota_revenue = pd.read_csv('./data/toyota_revenue.csv')
-vw_revenue = pd.read_csv('./data/volkswagen_revenue.csv')
 
-# filter rows for 'revenue'
+#market shares plots (scatter)
 
-t_revenue = toyota_revenue[toyota_revenue['category'] == 'revenue_(euro_billion)']
-v_revenue = vw_revenue[vw_revenue['category'] == 'revenue_(euro_billion)']
 
-# prepare data for plotting
 
-years_tvr = t_revenue.columns[1:]                   # skip the 'category' column
-toyota_values_r = t_revenue.iloc[0 , 1:].values     # get values for Toyota
-vw_values_r = v_revenue.iloc[0 , 1:].values         # get values for Volkswagen
+# function to reference images by their /assets url
 
-# plot
+# the logos were embedded base64-encoded into every animation frame (dozens of copies of the
+# same png per figure) ; as /assets urls every logo is downloaded and cached by the browser once
 
-revenue_tv_fig = go.Figure()
+# the original logos are 80 - 130 KB pngs of 1300px and more, but they are shown ~50px high ;
+# the build step (build-cache) writes variants downscaled to the rendered size (x LOGO_SCALE for
+# high dpi screens) with content-hashed file names into LOGO_DIR, plus a manifest ; without a
+# manifest (or without a variant for a size) the original pngs are used
 
-# Toyota's revenue line
+LOGO_DIR = './assets/logos'
+LOGO_MANIFEST = os.path.join(LOGO_DIR , 'manifest.json')
+LOGO_SCALE = 2
 
-revenue_tv_fig.add_trace(go.Scatter(
-                                    x = years_tvr ,
-                                    y = toyota_values_r ,
-                                    mode = 'lines+markers' ,
-                                    name = 'Toyota' ,
-                                    line_color = '#EB0A1E' ,
-                                    line_width = 3 ,
-                                    marker = dict(size = 10, symbol = 'circle')
-                                )
-)
 
-# Volkswagen's revenue line
+@lru_cache(maxsize = None)
+def read_logo_manifest(mtime_ns) :
 
-revenue_tv_fig.add_trace(go.Scatter(
-                                    x = years_tvr ,
-                                    y = vw_values_r ,
-                                    mode = 'lines+markers' ,
-                                    name = 'Volkswagen' ,
-                                    line_color = '#6091C3' ,
-                                    line_width = 3 ,
-                                    marker = dict(size = 10, symbol = 'circle')
-                                )
-)
+    # mtime is only part of the lru key, so a rebuilt manifest is read again
 
-# customize layout
+    with open(LOGO_MANIFEST , encoding = 'utf-8') as file :
+        return json.load(file)
 
-revenue_tv_fig.update_layout(
-                            title = 'Revenue: Toyota vs Volkswagen' ,
-                            xaxis_title = 'year' ,
-                            yaxis_title = 'revenue' ,
-                            legend_title = 'company' ,
-                            template = 'plotly' ,
-                            xaxis = dict(
-                                        tickformat = '%Y' , 
-                                        showgrid = True , 
-                                        gridcolor = 'white'
-                                    ) , 
-                            yaxis = dict(
-                                        tickprefix = '€' , 
-                                        ticksuffix = 'B' , 
-                                        showgrid = True , 
-                                        gridcolor = 'white'
-                                    ) ,
-                            width = 700 ,
-                            height = 500 , 
-                            plot_bgcolor = '#BDC3C7' ,
-                            paper_bgcolor = '#2C3E50' ,
-                            font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                    )             
-)
 
+def logo_manifest() :
 
+    try :
+        return read_logo_manifest(os.stat(LOGO_MANIFEST).st_mtime_ns)
+    except (OSError , ValueError) :
+        return {}
 
-# plot 10 (revenue growth T&V)
 
+def logo_variant_key(image_path , pixels) :
+    return f'{os.path.basename(image_path)}@{pixels}'
 
 
-# filter rows for 'Revenue Growh'
+def asset_url(image_path , pixels = None):
 
-t_growth = toyota_revenue[toyota_revenue['category'] == 'revenue_growth_(%)']
-v_growth = vw_revenue[vw_revenue['category'] == 'revenue_growth_(%)']
+    # './data/audi-logo.png' -> '/assets/logos/audi-logo-50.<hash>.png' (variant for a logo box of
+    # pixels x pixels) or '/assets/audi-logo.png' (the same png is served from ./assets)
 
-# prepare data for plotting
+    if pixels is not None :
+        track_input(LOGO_MANIFEST)          # figures are rebuilt when the variants change
+        variant = logo_manifest().get(logo_variant_key(image_path , pixels))
 
-years_tvrg = t_growth.columns[1:]                   # skip the 'category' column
-toyota_values_rg = t_growth.iloc[0 , 1:].values     # get values for Toyota
-vw_values_rg = v_growth.iloc[0 , 1:].values         # get values for Volkswagen
+        if variant is not None :
+            return "/assets/logos/" + variant
 
-# plot
+    return "/assets/" + os.path.basename(image_path)
 
-revenue_growth_tv_fig = go.Figure()
 
-# Toyota's revenue growth line
+# plots 2 - 4 (animated market shares : global, united states, europe)
 
-revenue_growth_tv_fig.add_trace(go.Scatter(
-                                        x = years_tvrg ,
-                                        y = toyota_values_rg ,
-                                        mode = 'lines+markers' ,
-                                        name = 'Toyota' ,
-                                        line_color = '#EB0A1E' ,
-                                        line_width = 3 ,
-                                        marker = dict(size = 10, symbol = 'circle')
-                                    )
-)
+# all market share views are built by one builder from a *_market_share.csv with the columns
+# <year> ... , company , image ; a new view (e.g. china) is one csv and one line in market_share_views
 
-# Volkswagen's revenue growth line
 
-revenue_growth_tv_fig.add_trace(go.Scatter(
-                                        x = years_tvrg ,
-                                        y = vw_values_rg ,
-                                        mode = 'lines+markers' ,
-                                        name = 'Volkswagen' ,
-                                        line_color = '#6091C3' ,
-                                        line_width = 3 ,
-                                        marker = dict(size = 10, symbol = 'circle')
-                                    )
-)
 
-# customize layout
+def build_market_share_fig(path , title , y_max , logo_size) :
+
+    market_share = load_csv(path).melt(
+                                    id_vars = ['company' , 'image'] ,
+                                    var_name = 'year' , 
+                                    value_name = 'value'
+                    )
+
+    # reference the images by their /assets url (once per distinct logo) , preferably the variant
+    # downscaled to the size the logo is shown at
+
+    pixels = logo_pixels(logo_size , y_max , market_share['company'].nunique())
+    market_share['image'] = market_share['image'].map({image : asset_url(image , pixels) for image in market_share['image'].unique()})
+
+    # hover text for all rows at once (vectorized string formatting)
+
+    market_share['text'] = market_share['company'] + '<br>' + market_share['value'].astype(str) + '% Market Share'
+
+    # the year annotation is the same for every frame, only its text changes
+
+    annotation_font = dict(
+                        family = 'PT Sans Narrow' , 
+                        size = 20 , 
+                        color = '#ECF0F1'
+    )
+
+    # one frame per year, built in a single groupby pass (years are sorted by groupby)
+
+    frames = []
+
+    for year , year_data in market_share.groupby('year' , sort = True) :
+
+        companies = year_data['company'].tolist()
+        values = year_data['value'].tolist()
+
+        frames.append(dict(
+                        data = [dict(
+                                    type = 'scatter' ,
+                                    x = companies ,
+                                    y = values ,
+                                    mode = 'markers' ,
+                                    marker = dict(size = 10 , color = 'rgba(0,0,0,0)') ,   # invisible markers for hover
+                                    text = (year_data['text'] + f'<br>{year}').tolist() ,
+                                    hoverinfo = 'text'
+                                )] ,
+                        layout = dict(
+                                    images = [
+                                        dict(
+                                            source = image ,           # uses the /assets url of the logo
+                                            x = company ,              # places the image at the company’s x-coordinate 
+                                            y = value ,                # places the image at market share y-coordinate.
+                                            xref = 'x' ,
+                                            yref = 'y' ,
+                                            sizex = logo_size ,        # size of images on x-axis
+                                            sizey = logo_size ,        # size of images on y-axis
+                                            xanchor = 'center' ,       # centers the image at the specified coordinates
+                                            yanchor = 'middle'         # centers the image at the specified coordinates
+                                        )
+                                        for image , company , value in zip(year_data['image'] , companies , values)
+                                    ] ,
+                                    annotations = [dict(
+                                                    x = 0.5 , 
+                                                    y = 1.1 ,
+                                                    text = f'<b>{year}</b>' ,
+                                                    showarrow = False ,
+                                                    xref = 'paper' ,
+                                                    yref = 'paper' ,
+                                                    font = annotation_font ,
+                                                    align = 'center'
+                                    )]
+                                ) ,
+                        name = str(year)
+        ))
+
+    # the starting frame (first year) is also the initial scatter trace, without the year in the hover text
+
+    initial_trace = dict(frames[0]['data'][0] , text = market_share.loc[market_share['year'] == frames[0]['name'] , 'text'].tolist())
+
+    market_share_fig = go.Figure(data = [initial_trace] , frames = frames)
+
+    # add play and pause buttons for the animation
+
+    market_share_fig.update_layout(
+                                updatemenus = [
+                                    {
+                                        'buttons' : [
+                                            {                                                       #'Play' : starts cycling through the frames
+                                                'args' : [None , {'frame' : {'duration' : 1000 ,    # at a speed of 1 frame per second 
+                                                                            'redraw' : True} ,       
+                                                                            'fromcurrent' : True}] ,
+                                                'label' : 'Play' ,
+                                                'method' : 'animate'
+                                            } ,
+                                            {                                                                       #'Pause' : stops the animation
+                                                'args' : [[None] , {'frame' : {'duration' : 0 , 'redraw' : True} , 
+                                                                    'mode' : 'immediate' , 
+                                                                    'transition' : {'duration' : 0}}
+                                                        ] ,
+                                                'label' : 'Pause' ,
+                                                'method' : 'animate'
+                                            }
+                                        ] ,
+                                        'direction' : 'left' ,
+                                        'pad' : {'r' : 10 , 't' : 87} ,
+                                        'showactive' : False ,
+                                        'type' : 'buttons' ,
+                                        'x' : 0.1 ,
+                                        'xanchor' : 'right' ,
+                                        'y' : 0 ,
+                                        'yanchor' : 'top'
+                                    }
+                                ]
+    )
+
+    # set layout properties
+
+    market_share_fig.update_layout(
+                                template = 'dashboard_dark' ,
+                                title = title ,
+                                xaxis = dict(title = 'company') ,
+                                yaxis = dict(
+                                            title = 'market share' ,
+                                            range = [0 , y_max] ,
+                                            tickmode = 'linear' ,
+                                            tick0 = 0 ,
+                                            dtick = 3 ,
+                                            ticksuffix = '%'
+                                        ) ,
+                                width = 700 ,
+                                height = 700
+    )
+
+    return market_share_fig
+
+
+# figure name -> csv , title , upper end of the y-axis and logo size (in axis units)
+
+market_share_views = {
+    'global_market_share_fig' : dict(path = './data/global_market_share.csv' , title = 'Global Market Shares' , y_max = 21 , logo_size = 2) ,
+    'us_market_share_fig' : dict(path = './data/us_market_share.csv' , title = 'United States Market Shares' , y_max = 17 , logo_size = 1.5) ,
+    'europe_market_share_fig' : dict(path = './data/europe_market_share.csv' , title = 'Europe Market Shares' , y_max = 31 , logo_size = 3)
+}
+
+for name , view in market_share_views.items() :
+    register_figure(name)(partial(build_market_share_fig , **view))
+
+
+# plot area of the market share figures (700 x 700 minus plotly's default margins)
+
+MARKET_SHARE_PLOT_WIDTH = 700 - 80 - 80
+MARKET_SHARE_PLOT_HEIGHT = 700 - 100 - 80
+
+
+def logo_pixels(logo_size , y_max , companies) :
+
+    # side of the (square) logo box in screen pixels : logo_size axis units in x (one unit per
+    # company) and y (y_max units over the plot height) , the logo is fit into the smaller one
+
+    return math.ceil(logo_size * min(MARKET_SHARE_PLOT_WIDTH / companies , MARKET_SHARE_PLOT_HEIGHT / y_max))
+
+
+def build_logo_variants() :
+
+    # build step : one downscaled variant per logo and rendered size, returns the manifest
+
+    from PIL import Image           # pillow is only needed by the build step
 
-revenue_growth_tv_fig.update_layout(
-                                    title = 'Revenue Growth: Toyota vs Volkswagen' ,
+    manifest = {}
+    os.makedirs(LOGO_DIR , exist_ok = True)
+
+    for view in market_share_views.values() :
+        market_share = read_csv_cached(view['path'])
+        pixels = logo_pixels(view['logo_size'] , view['y_max'] , market_share['company'].nunique())
+
+        for image_path in market_share['image'].unique() :
+            with Image.open(image_path) as image :
+                image.thumbnail((pixels * LOGO_SCALE , pixels * LOGO_SCALE) , Image.LANCZOS)
+                buffer = io.BytesIO()
+                image.save(buffer , format = 'PNG' , optimize = True)
+
+            variant = buffer.getvalue()
+            stem = os.path.splitext(os.path.basename(image_path))[0]
+            filename = f'{stem}-{pixels}.{hashlib.sha256(variant).hexdigest()[:12]}.png'
+
+            if not os.path.exists(os.path.join(LOGO_DIR , filename)) :
+                with open(os.path.join(LOGO_DIR , filename) , 'wb') as file :
+                    file.write(variant)
+
+            manifest[logo_variant_key(image_path , pixels)] = filename
+
+    # drop variants of earlier builds, then publish the new manifest atomically
+
+    for path in glob.glob(os.path.join(LOGO_DIR , '*.png')) :
+        if os.path.basename(path) not in manifest.values() :
+            os.remove(path)
+
+    tmp_path = f'{LOGO_MANIFEST}.{os.getpid()}.tmp'
+
+    with open(tmp_path , 'w' , encoding = 'utf-8') as file :
+        json.dump(manifest , file , indent = 1 , sort_keys = True)
+
+    os.replace(tmp_path , LOGO_MANIFEST)
+
+    return manifest
+
+
+
+# comparising plots
+
+# plot 5 (sales by category GB3)
+
+
+
+@register_figure('big_three_sales_fig')
+def build_big_three_sales_fig() :
+
+    audi_sales = load_csv('./data/audi_sales.csv')
+    bmw_sales = load_csv('./data/bmw_sales.csv')
+    mercedes_sales = load_csv('./data/mercedes_sales.csv')
+
+    # melting the dfs to long format and adding column 'brand'
+
+    audi_sales_melted = audi_sales.melt(
+                                    id_vars = ['category'] , 
+                                    var_name = 'year' , 
+                                    value_name = 'volume'
+                        )
+
+    audi_sales_melted['brand'] = 'Audi'
+
+    bmw_sales_melted = bmw_sales.melt(
+                                    id_vars = ['category'] , 
+                                    var_name = 'year' , 
+                                    value_name  ='volume'
+                        )
+
+    bmw_sales_melted['brand'] = 'BMW'
+
+    mercedes_sales_melted = mercedes_sales.melt(
+                                            id_vars = ['category'] , 
+                                            var_name = 'year' , 
+                                            value_name = 'volume'
+                            )
+
+    mercedes_sales_melted['brand'] = 'Mercedes-Benz'
+
+    # combining all sales data into a single df
+
+    big_three_sales = pd.concat([audi_sales_melted , bmw_sales_melted , mercedes_sales_melted])
+
+    # creating the stacked bar chart (using Plotly Express)
+
+    big_three_sales_fig = px.bar(
+                                big_three_sales,  
+                                x = 'year' , 
+                                y = 'volume' , 
+                                color = 'brand' , 
+                                color_discrete_map = {
+                                                    'Audi' : '#F50537' ,
+                                                    'BMW' : '#007eed' ,
+                                                    'Mercedes-Benz' : '#7a8084'
+                                                } ,
+                                #  facet_col='brand'
+
+                                title = 'Total Sales by Year and Company' ,
+                                hover_data = ['category' , 'brand' , 'volume'] ,
+                                labels = {'volume' : 'sales volume' , 'year' : 'year' , 'category' : 'category'} ,
+                                barmode = 'group'
+                            )
+
+    # update layout 
+
+    big_three_sales_fig.update_layout(
+                                    template = 'dashboard_dark' ,
                                     xaxis_title = 'year' ,
-                                    yaxis_title = 'revenue growth %' ,
-                                    legend_title = 'company' ,
-                                    template = 'plotly' ,
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,
-                                                showgrid = True , 
-                                                gridcolor = 'white'
-                                            ) , 
+                                    yaxis_title = 'total sales volume' ,
+                                    legend_title = 'Company' ,
+                                    xaxis = dict(type = 'category') ,
                                     yaxis = dict(
-                                                ticksuffix = '%' ,
-                                                showgrid = True , 
-                                                gridcolor = 'white'
+                                                tickmode = 'linear',  # set tick mode to linear
+                                                tick0 = 0,            # start ticks at 0
+                                                dtick = 300000,            # step size of 100000
+                                                range = [0, 2500000]
                                             ) ,
-                                    width = 700 ,
-                                    height = 500 , 
-                                    plot_bgcolor = '#BDC3C7' ,
-                                    paper_bgcolor = '#2C3E50' ,
-                                    font = dict(
-                                                family = 'PT Sans Narrow' ,
-                                                size = 16 ,
-                                                color = '#ECF0F1'
-                                            )            
-)
+                                    width = 700 , 
+                                    height = 500        
+    )
 
+    # formatting hovertemplate
 
+    big_three_sales_fig.update_traces(
+                                    hovertemplate = (
+                                                    '<b>Brand:</b> %{customdata[1]}<br>'
+                                                    '<b>Year:</b> %{x}<br>'
+                                                    '<b>Category:</b> %{customdata[0]}<br>'
+                                                    '<b>Sales Volume:</b> %{y:,} units'
+                                                )
+    )
 
-# plot 11 (total registration by company)
+    return big_three_sales_fig
 
 
 
-total_reg_germany = pd.read_csv('./data/total_reg_germany.csv')
+# plot 6 (sales by category T&V)
 
-# using melt() to transform the year columns into rows for plotting
 
-total_reg_melted = total_reg_germany.melt(
-                                        id_vars = 'brand' ,
-                                        var_name = 'year' ,
-                                        value_name = 'value'
-                    )
 
-# plot
+@register_figure('sales_tv_fig')
+def build_sales_tv_fig() :
 
-total_reg_fig = px.line(
-                        total_reg_melted ,
-                        x = 'year' ,
-                        y = 'value' ,
-                        color = 'brand' ,
-                        title = 'Total registrated cars in Germany (2015-2023)' ,
-                        labels = {
-                            'brand' : 'brand' , 
-                            'value' : 'amount of units'
-                            } ,
-                        color_discrete_map = {
-                                        'audi': '#F50537',
-                                        'bmw': '#007eed',
-                                        'mercedes': '#697c85' ,
-                                        'toyota' : '#000000' ,
-                                        'volkswagen' : '#1F2F57'
-                                        }    
-)
+    toyota_sales = load_csv('./data/toyota_sales.csv')
+    vw_sales = load_csv('./data/volkswagen_sales.csv')
 
-# adjusting line appearance
+    # melting the dfs to long format and adding column 'brand'
 
-total_reg_fig.update_traces(
-                            line_width = 3 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10 , symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
-)
+    toyota_sales_melted = toyota_sales.melt(
+                                        id_vars = ['category'] , 
+                                        var_name = 'year' , 
+                                        value_name = 'volume'
+                        )
 
-total_reg_fig.update_layout(
-                xaxis = dict(showgrid = True, gridcolor = 'white') ,
-                yaxis = dict(showgrid = True, gridcolor = 'white') ,
-                width = 1000 ,
-                height = 500 ,
-                plot_bgcolor = '#BDC3C7' ,
-                paper_bgcolor = '#2C3E50' ,
-                font = dict(
-                            family = 'PT Sans Narrow' ,
-                            size = 16 ,
-                            color = '#ECF0F1'
-                        )      
-)
+    toyota_sales_melted['brand'] = 'Toyota'
 
+    vw_sales_melted = vw_sales.melt(
+                                id_vars = ['category'] , 
+                                var_name = 'year' , 
+                                value_name = 'volume'
+                    )
 
+    vw_sales_melted['brand'] = 'Volkswagen'
 
-# plot 12 (diesel registration by company)
+    # combining all sales data into a single df
 
+    sales_tv = pd.concat([toyota_sales_melted , vw_sales_melted])
 
+    # creating the stacked bar chart (using Plotly Express)
 
-diesel_reg_germany = pd.read_csv('./data/diesel_reg_germany.csv')
+    sales_tv_fig = px.bar(sales_tv,  
+                                x = 'year' , 
+                                y = 'volume' , 
+                                color = 'brand' , 
+                                color_discrete_map = {
+                                                    'Toyota' : '#EB0A1E' ,
+                                                    'Volkswagen' : '#6091C3'
+                                                } ,
+                                title = 'Total Sales by Year and Company' ,
+                                hover_data = ['category' , 'brand' , 'volume'] ,
+                                labels = {'volume' : 'Total Sales Volume' , 'year' : 'Year' , 'category' : 'Category'} ,
+                                barmode = 'group'
+    )
 
-# using melt() to transform the year columns into rows for plotting
+    sales_tv_fig.update_layout(
+                            template = 'dashboard_dark' ,
+                            xaxis_title = 'year' ,
+                            yaxis_title = 'total sales volume' ,
+                            legend_title = 'Company' ,
+                            xaxis = dict(type = 'category') ,
+                            yaxis = dict(
+                                        tickmode = 'linear',       # set tick mode to linear
+                                        tick0 = 0,                 # start ticks at 0
+                                        dtick = 800000,            # step size of 800000
+                                        range = [0, 11000000]
+                                    ) ,
+                            width = 700 , 
+                            height = 500
+    )
 
-diesel_reg_melted = diesel_reg_germany.melt(
-                                        id_vars = 'brand' ,
-                                        var_name = 'year' ,
-                                        value_name = 'value'
-)
+    # formatting hovertemplate
 
-# plot
+    sales_tv_fig.update_traces(
+                            hovertemplate = (
+                                            '<b>Brand:</b> %{customdata[1]}<br>'
+                                            '<b>Year:</b> %{x}<br>'
+                                            '<b>Category:</b> %{customdata[0]}<br>'
+                                            '<b>Sales Volume:</b> %{y:,} units'
+                                        )
+    )
 
-diesel_reg_fig = px.line(
-                        diesel_reg_melted ,
-                        x = 'year' ,
-                        y = 'value' ,
-                        color = 'brand' ,
-                        title = 'of which Diesel' ,
-                        labels = {
-                            'brand' : 'brand' , 
-                            'value' : 'amount of units'
-                            } ,
-                        color_discrete_map = {
-                                        'audi': '#F50537',
-                                        'bmw': '#007eed',
-                                        'mercedes': '#697c85' ,
-                                        'toyota' : '#000000' ,
-                                        'volkswagen' : '#1F2F57'
-                                        }    
-            
-)
+    return sales_tv_fig
 
-# adjusting line appearance
 
-diesel_reg_fig.update_traces(
-                            line_width = 3 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10 , symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
-)
 
-# add grid 
-
-diesel_reg_fig.update_layout(
-                            xaxis = dict(showgrid = True , gridcolor = 'white') ,
-                            yaxis = dict(showgrid = True , gridcolor = 'white') ,
-                            width = 1000 ,
-                            height = 600 ,
-                            plot_bgcolor = '#BDC3C7' ,
-                            paper_bgcolor = '#2C3E50' ,
-                            font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                    )      
-)
+# plot 7 (revenue BG3)
 
 
 
-# plot 13 (hybrid registration by company)
+@register_figure('revenue_bg3_fig')
+def build_revenue_bg3_fig() :
 
+    audi_revenue = load_csv('./data/audi_revenue.csv')
+    bmw_revenue = load_csv('./data/bmw_revenue.csv')
+    mercedes_revenue = load_csv('./data/mercedes_revenue.csv')
 
+    # filter rows for 'Revenue'
 
-hybrid_reg_germany = pd.read_csv('./data/hybrid_reg_germany.csv')
+    a_revenue = audi_revenue[audi_revenue['category'] == 'revenue_(euro_billion)']
+    b_revenue = bmw_revenue[bmw_revenue['category'] == 'revenue_(euro_billion)']
+    m_revenue = mercedes_revenue[mercedes_revenue['category'] == 'revenue_(euro_billion)']
 
-# using melt() to transform the year columns into rows for plotting
+    # prepare data for plotting
+    years_bg3r = a_revenue.columns[1:]                   # skip the 'category' column
+    audi_values_r = a_revenue.iloc[0 , 1:].values         # get values for Audi
+    bmw_values_r = b_revenue.iloc[0 , 1:].values          # get values for BMW
+    mercedes_values_r = m_revenue.iloc[0 , 1:].values     # get values for Mercedes
 
-hybrid_reg_melted = hybrid_reg_germany.melt(
-                                        id_vars = 'brand' ,
-                                        var_name = 'year' ,
-                                        value_name = 'value'
-)
+    revenue_bg3_fig = go.Figure()
 
-# plot
+    # Audi's revenue line
 
-hybrid_reg_fig = px.line(
-                        hybrid_reg_melted ,
-                        x = 'year' ,
-                        y = 'value' ,
-                        color = 'brand' ,
-                        title = 'of which Hybrid' ,
-                        labels = {
-                            'brand' : 'brand' , 
-                            'value' : 'amount of units'
-                            } ,
-                        color_discrete_map = {
-                                        'audi': '#F50537',
-                                        'bmw': '#007eed',
-                                        'mercedes': '#697c85' ,
+    revenue_bg3_fig.add_trace(go.Scatter(
+                                        x = years_bg3r ,
+                                        y = audi_values_r ,
+                                        mode = 'lines+markers' ,
+                                        name = 'Audi' ,
+                                        line_color = '#F50537' ,
+                                        line_width = 3 ,
+                                        marker = dict(size = 10, symbol = 'circle')
+                                    )
+    )
+
+    # BMW's revenue line
+
+    revenue_bg3_fig.add_trace(go.Scatter(
+                                        x = years_bg3r ,
+                                        y = bmw_values_r ,
+                                        mode = 'lines+markers' ,
+                                        name = 'BMW' ,
+                                        line_color = '#007eed' ,
+                                        line_width = 3 ,
+                                        marker = dict(size = 10, symbol = 'circle')
+                                    )
+    )
+
+
+    # Mercedes's revenue line
+
+
+    revenue_bg3_fig.add_trace(go.Scatter(
+                                        x = years_bg3r ,
+                                        y = mercedes_values_r ,
+                                        mode = 'lines+markers' ,
+                                        name = 'Mercedes-Benz' ,
+                                        line_color = '#7a8084' ,
+                                        line_width = 3 ,
+                                        marker = dict(size = 10, symbol = 'circle')
+                                    )
+    )
+
+    # customize layout
+
+    revenue_bg3_fig.update_layout(
+                                template = 'dashboard_dark' ,
+                                title = 'Revenue: German Big Three' ,
+                                xaxis_title = 'year' ,
+                                yaxis_title = 'revenue' ,
+                                legend_title = 'company' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' ,                       # format x-axis for years
+                                            showgrid = True
+                                        ) ,                   
+                                yaxis = dict(
+                                            tickprefix = '€' ,                         # add € prefix
+                                            ticksuffix = 'B' ,                         # add B suffix
+                                            showgrid = True
+                                        ) ,
+                                width = 700 ,
+                                height = 500
+
+    )
+
+    return revenue_bg3_fig
+
+
+
+# plot 8 (revenue growth BG3)
+
+
+
+@register_figure('revenue_growth_bg3_fig')
+def build_revenue_growth_bg3_fig() :
+
+    audi_revenue = load_csv('./data/audi_revenue.csv')
+    bmw_revenue = load_csv('./data/bmw_revenue.csv')
+    mercedes_revenue = load_csv('./data/mercedes_revenue.csv')
+
+    # filter rows for 'Revenue growth'
+
+    a_growth = audi_revenue[audi_revenue['category'] == 'revenue_growth_(%)']
+    b_growth = bmw_revenue[bmw_revenue['category'] == 'revenue_growth_(%)']
+    m_growth = mercedes_revenue[mercedes_revenue['category'] == 'revenue_growth_(%)']
+
+    # prepare data for plotting
+
+    years_bg3rg = a_growth.columns[1:]                  # skip the 'category' column
+    audi_values_rg = a_growth.iloc[0 , 1:].values       # get values for Audi
+    bmw_values_rg = b_growth.iloc[0 , 1:].values        # get values for BMW
+    mercedes_values_rg = m_growth.iloc[0 , 1:].values   # get values for Mercedes
+
+    # plot
+
+    revenue_growth_bg3_fig = go.Figure()
+
+    # Audi's revenue line
+
+    revenue_growth_bg3_fig.add_trace(go.Scatter(
+                                                x = years_bg3rg ,
+                                                y = audi_values_rg ,
+                                                mode = 'lines+markers' ,
+                                                name = 'Audi' ,
+                                                line_color = '#F50537' ,
+                                                line_width = 3 ,
+                                                marker = dict(size = 10, symbol = 'circle')
+                                            )
+    )
+
+    # BMW's revenue line
+
+    revenue_growth_bg3_fig.add_trace(go.Scatter(
+                                                x = years_bg3rg ,
+                                                y = bmw_values_rg ,
+                                                mode = 'lines+markers' ,
+                                                name = 'BMW' ,
+                                                line_color = '#007eed' ,
+                                                line_width = 3 ,
+                                                marker = dict(size = 10, symbol = 'circle')
+                                            )
+    )
+
+    # Mercedes's revenue line
+
+    revenue_growth_bg3_fig.add_trace(go.Scatter(
+                                                x = years_bg3rg ,
+                                                y = mercedes_values_rg ,
+                                                mode = 'lines+markers' ,
+                                                name = 'Mercedes-Benz' ,
+                                                line_color = '#7a8084' ,
+                                                line_width = 3 ,
+                                                marker = dict(size = 10, symbol = 'circle')
+                                            )
+    )
+
+    # customize layout
+
+    revenue_growth_bg3_fig.update_layout(
+                                        template = 'dashboard_dark' ,
+                                        title = 'Revenue growth: German Big Three' ,
+                                        xaxis_title = 'year' ,
+                                        yaxis_title = 'revenue growth %' ,
+                                        legend_title = 'company' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,          # format x-axis for years
+                                                    showgrid = True
+                                                ) , 
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,           # add % suffix
+                                                    showgrid = True
+                                                ) ,
+                                        width = 700 ,
+                                        height = 500
+    )
+
+    return revenue_growth_bg3_fig
+
+
+
+# plot 9 (revenue T&V)
+
+
+
+@register_figure('revenue_tv_fig')
+def build_revenue_tv_fig() :
+
+    toyota_revenue = load_csv('./data/toyota_revenue.csv')
+    vw_revenue = load_csv('./data/volkswagen_revenue.csv')
+
+    # filter rows for 'revenue'
+
+    t_revenue = toyota_revenue[toyota_revenue['category'] == 'revenue_(euro_billion)']
+    v_revenue = vw_revenue[vw_revenue['category'] == 'revenue_(euro_billion)']
+
+    # prepare data for plotting
+
+    years_tvr = t_revenue.columns[1:]                   # skip the 'category' column
+    toyota_values_r = t_revenue.iloc[0 , 1:].values     # get values for Toyota
+    vw_values_r = v_revenue.iloc[0 , 1:].values         # get values for Volkswagen
+
+    # plot
+
+    revenue_tv_fig = go.Figure()
+
+    # Toyota's revenue line
+
+    revenue_tv_fig.add_trace(go.Scatter(
+                                        x = years_tvr ,
+                                        y = toyota_values_r ,
+                                        mode = 'lines+markers' ,
+                                        name = 'Toyota' ,
+                                        line_color = '#EB0A1E' ,
+                                        line_width = 3 ,
+                                        marker = dict(size = 10, symbol = 'circle')
+                                    )
+    )
+
+    # Volkswagen's revenue line
+
+    revenue_tv_fig.add_trace(go.Scatter(
+                                        x = years_tvr ,
+                                        y = vw_values_r ,
+                                        mode = 'lines+markers' ,
+                                        name = 'Volkswagen' ,
+                                        line_color = '#6091C3' ,
+                                        line_width = 3 ,
+                                        marker = dict(size = 10, symbol = 'circle')
+                                    )
+    )
+
+    # customize layout
+
+    revenue_tv_fig.update_layout(
+                                template = 'dashboard_dark' ,
+                                title = 'Revenue: Toyota vs Volkswagen' ,
+                                xaxis_title = 'year' ,
+                                yaxis_title = 'revenue' ,
+                                legend_title = 'company' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' , 
+                                            showgrid = True
+                                        ) , 
+                                yaxis = dict(
+                                            tickprefix = '€' , 
+                                            ticksuffix = 'B' , 
+                                            showgrid = True
+                                        ) ,
+                                width = 700 ,
+                                height = 500
+    )
+
+    return revenue_tv_fig
+
+
+
+# plot 10 (revenue growth T&V)
+
+
+
+@register_figure('revenue_growth_tv_fig')
+def build_revenue_growth_tv_fig() :
+
+    toyota_revenue = load_csv('./data/toyota_revenue.csv')
+    vw_revenue = load_csv('./data/volkswagen_revenue.csv')
+
+    # filter rows for 'Revenue Growh'
+
+    t_growth = toyota_revenue[toyota_revenue['category'] == 'revenue_growth_(%)']
+    v_growth = vw_revenue[vw_revenue['category'] == 'revenue_growth_(%)']
+
+    # prepare data for plotting
+
+    years_tvrg = t_growth.columns[1:]                   # skip the 'category' column
+    toyota_values_rg = t_growth.iloc[0 , 1:].values     # get values for Toyota
+    vw_values_rg = v_growth.iloc[0 , 1:].values         # get values for Volkswagen
+
+    # plot
+
+    revenue_growth_tv_fig = go.Figure()
+
+    # Toyota's revenue growth line
+
+    revenue_growth_tv_fig.add_trace(go.Scatter(
+                                            x = years_tvrg ,
+                                            y = toyota_values_rg ,
+                                            mode = 'lines+markers' ,
+                                            name = 'Toyota' ,
+                                            line_color = '#EB0A1E' ,
+                                            line_width = 3 ,
+                                            marker = dict(size = 10, symbol = 'circle')
+                                        )
+    )
+
+    # Volkswagen's revenue growth line
+
+    revenue_growth_tv_fig.add_trace(go.Scatter(
+                                            x = years_tvrg ,
+                                            y = vw_values_rg ,
+                                            mode = 'lines+markers' ,
+                                            name = 'Volkswagen' ,
+                                            line_color = '#6091C3' ,
+                                            line_width = 3 ,
+                                            marker = dict(size = 10, symbol = 'circle')
+                                        )
+    )
+
+    # customize layout
+
+    revenue_growth_tv_fig.update_layout(
+                                        template = 'dashboard_dark' ,
+                                        title = 'Revenue Growth: Toyota vs Volkswagen' ,
+                                        xaxis_title = 'year' ,
+                                        yaxis_title = 'revenue growth %' ,
+                                        legend_title = 'company' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,
+                                                    showgrid = True
+                                                ) , 
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,
+                                                    showgrid = True
+                                                ) ,
+                                        width = 700 ,
+                                        height = 500
+    )
+
+    return revenue_growth_tv_fig
+
+
+
+# car registrations (plots 11 - 14)
+
+# new_reg_cars_g.csv (new registrations per model) is the only source of the registration plots :
+# the brand blocks of the wide file (<BRAND> header row , model rows , OTHER , <brand>_together
+# totals) are reshaped once into a long table (brand , model , year , powertrain , count) and
+# all brand series are produced from it with one groupby ; a new year is one file drop
+
+REGISTRATIONS_FILE = './data/new_reg_cars_g.csv'
+
+# '<brand>_together' row prefix -> brand name used in the plots
+
+registration_brands = {'audi' : 'audi' , 'bmw' : 'bmw' , 'mercedes' : 'mercedes' , 'toyota' : 'toyota' , 'vw' : 'volkswagen'}
+
+# column prefix (<prefix>_<year>) -> powertrain
+
+registration_powertrains = {'total' : 'total' , 'of_which_diesel' : 'diesel' , 'of_which_hybrid' : 'hybrid' , 'of_which_electric' : 'electric'}
+
+
+def reshape_registrations(wide) :
+
+    # (long table , overdrawn (brand , column) pairs)
+
+    names = wide['brand_model']
+    together = names.str.endswith('_together').to_numpy()
+    counts = wide.drop(columns = 'brand_model')
+
+    # every row belongs to the brand of the next '<brand>_together' row
+
+    block = np.concatenate([[0] , np.cumsum(together)[:-1]])
+    brands = names[together].str.removesuffix('_together').map(registration_brands).to_numpy()
+
+    # registrations the model rows do not add up to (small numbers are not itemized per model) are
+    # kept as one 'unallocated' row per brand, so the brand series equal the '<brand>_together' totals ;
+    # empty model cells (unknown , e.g. the 2018 model totals) count as not itemized and stay NaN
+
+    model_counts = counts[~together]
+    unallocated = counts[together].to_numpy() - model_counts.groupby(block[~together]).sum().to_numpy()
+
+    # models adding up to more than their brand total means a broken export , not a small residual :
+    # those model cells are left out (NaN) , the brand keeps its published total , and the figures
+    # are still served ; build-cache reports them and fails
+
+    negative = unallocated < 0
+    overdrawn = [(brands[brand] , counts.columns[column]) for brand , column in zip(*np.nonzero(negative))]
+
+    if overdrawn :
+        logger.warning(
+                    '%s: model rows exceed the brand total , left out of the model series: %s' ,
+                    REGISTRATIONS_FILE , ', '.join(f'{brand} {column}' for brand , column in overdrawn)
+        )
+
+        model_counts = model_counts.mask(negative[block[~together]])
+        unallocated = np.where(negative , counts[together].to_numpy() , unallocated)
+
+    rows = pd.concat([
+        model_counts.assign(brand = brands[block[~together]] , model = names[~together]) ,
+        pd.DataFrame(unallocated , columns = counts.columns).assign(brand = brands , model = 'unallocated')
+    ] , ignore_index = True)
+
+    # drop the (empty) brand header rows and models without any registration
+
+    rows = rows[rows[counts.columns].ne(0).any(axis = 1)]
+
+    long = rows.melt(id_vars = ['brand' , 'model'] , var_name = 'column' , value_name = 'count')
+    powertrain_year = long['column'].str.rsplit('_' , n = 1 , expand = True)
+
+    long = pd.DataFrame({
+                        'brand' : long['brand'] ,
+                        'model' : long['model'] ,
+                        'year' : powertrain_year[1].astype(int) ,
+                        'powertrain' : powertrain_year[0].map(registration_powertrains) ,
+                        'count' : long['count']
+    })
+
+    return long , overdrawn
+
+
+@lru_cache(maxsize = None)
+def registration_table() :
+    return reshape_registrations(read_csv_cached(REGISTRATIONS_FILE))
+
+
+def registrations() :
+    return registration_table()[0]
+
+
+@lru_cache(maxsize = None)
+def brand_registrations() :
+
+    # every brand series at once : (powertrain , brand) rows x year columns , years a powertrain
+    # was not reported in (hybrid / electric before 2017) are 0
+
+    return registrations().groupby(['powertrain' , 'brand' , 'year'])['count'].sum().unstack('year' , fill_value = 0).astype(int)
+
+
+def registration_series(powertrain) :
+
+    # one row per brand with one column per year (the layout of the former *_reg_germany.csv files)
+
+    track_input(REGISTRATIONS_FILE)
+
+    return brand_registrations().loc[powertrain].rename(columns = str).reset_index()
+
+
+# model drill-down of plot 11 : the long table sorted by (powertrain , brand , model , year) as typed
+# arrays plus a (powertrain , brand) -> row range index ; every model of a block has one row per year ,
+# so the models of a brand are one slice reshaped to (models x years) , nothing is filtered per click
+
+@lru_cache(maxsize = None)
+def registration_model_index() :
+
+    # (index , model names , arrays of model codes , years and counts) ; counts are float32 so a
+    # model cell the export does not know (the 2018 totals) stays NaN and is drawn as a gap
+
+    long = registrations()
+    long = long[long['model'] != 'unallocated'].sort_values(['powertrain' , 'brand' , 'model' , 'year'] , ignore_index = True)
+    models = long['model'].astype('category')
+
+    arrays = {
+        'model' : models.cat.codes.to_numpy().astype(np.int16) ,
+        'year' : long['year'].to_numpy().astype(np.int16) ,
+        'count' : long['count'].to_numpy().astype(np.float32)
+    }
+
+    blocks = long.groupby(['powertrain' , 'brand'] , sort = False).size()
+    stops = np.cumsum(blocks.to_numpy())
+    index = {key : (int(stop - size) , int(stop)) for key , size , stop in zip(blocks.index , blocks.to_numpy() , stops)}
+
+    return index , models.cat.categories.to_numpy() , arrays
+
+
+def brand_models(brand , powertrain = 'total') :
+
+    # (model names , years , counts (models x years)) of a brand
+
+    index , model_names , arrays = registration_model_index()
+    start , stop = index[(powertrain , brand)]
+
+    years = np.unique(arrays['year'][start : stop])
+    counts = arrays['count'][start : stop].reshape(-1 , len(years))
+    names = model_names[arrays['model'][start : stop : len(years)]]
+
+    return names , years , counts
+
+
+def brand_models_fig(brand) :
+
+    names , years , counts = brand_models(brand)
+
+    # biggest models first (in the legend)
+
+    traces = [
+        dict(
+            type = 'scatter' ,
+            x = years ,
+            y = counts[i] ,
+            mode = 'lines+markers' ,
+            name = names[i] ,
+            hovertemplate = f'{names[i]}<br>Year: %{{x}}<br>Amount of units: %{{y}}<extra></extra>'
+        )
+        for i in np.argsort(-np.nansum(counts , axis = 1) , kind = 'stable')
+    ]
+
+    layout = dict(
+                template = template_json('dashboard_dark') ,
+                title = dict(text = f'New registrations per model: {brand}') ,
+                xaxis = dict(showgrid = True , dtick = 1) ,
+                yaxis = dict(showgrid = True , title = dict(text = 'amount of units')) ,
+                height = 500
+    )
+
+    return dict(data = traces , layout = layout)
+
+
+
+# plot 11 (total registration by company)
+
+
+
+@register_figure('total_reg_fig')
+def build_total_reg_fig() :
+
+    total_reg_germany = registration_series('total')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    total_reg_melted = total_reg_germany.melt(
+                                            id_vars = 'brand' ,
+                                            var_name = 'year' ,
+                                            value_name = 'value'
+                        )
+
+    # plot
+
+    total_reg_fig = px.line(
+                            total_reg_melted ,
+                            x = 'year' ,
+                            y = 'value' ,
+                            color = 'brand' ,
+                            custom_data = ['brand'] ,                       # brand of a clicked point (model drill-down)
+                            title = 'Total registrated cars in Germany (2015-2023)' ,
+                            labels = {
+                                'brand' : 'brand' , 
+                                'value' : 'amount of units'
+                                } ,
+                            color_discrete_map = {
+                                            'audi': '#F50537',
+                                            'bmw': '#007eed',
+                                            'mercedes': '#697c85' ,
+                                            'toyota' : '#000000' ,
+                                            'volkswagen' : '#1F2F57'
+                                            }    
+    )
+
+    # adjusting line appearance
+
+    total_reg_fig.update_traces(
+                                line_width = 3 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10 , symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
+    )
+
+    total_reg_fig.update_layout(
+                    template = 'dashboard_dark' ,
+                    xaxis = dict(showgrid = True) ,
+                    yaxis = dict(showgrid = True) ,
+                    width = 1000 ,
+                    height = 500
+    )
+
+    return total_reg_fig
+
+
+
+# plot 12 (diesel registration by company)
+
+
+
+@register_figure('diesel_reg_fig')
+def build_diesel_reg_fig() :
+
+    diesel_reg_germany = registration_series('diesel')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    diesel_reg_melted = diesel_reg_germany.melt(
+                                            id_vars = 'brand' ,
+                                            var_name = 'year' ,
+                                            value_name = 'value'
+    )
+
+    # plot
+
+    diesel_reg_fig = px.line(
+                            diesel_reg_melted ,
+                            x = 'year' ,
+                            y = 'value' ,
+                            color = 'brand' ,
+                            title = 'of which Diesel' ,
+                            labels = {
+                                'brand' : 'brand' , 
+                                'value' : 'amount of units'
+                                } ,
+                            color_discrete_map = {
+                                            'audi': '#F50537',
+                                            'bmw': '#007eed',
+                                            'mercedes': '#697c85' ,
+                                            'toyota' : '#000000' ,
+                                            'volkswagen' : '#1F2F57'
+                                            }    
+
+    )
+
+    # adjusting line appearance
+
+    diesel_reg_fig.update_traces(
+                                line_width = 3 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10 , symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
+    )
+
+    # add grid 
+
+    diesel_reg_fig.update_layout(
+                                template = 'dashboard_dark' ,
+                                xaxis = dict(showgrid = True) ,
+                                yaxis = dict(showgrid = True) ,
+                                width = 1000 ,
+                                height = 600
+    )
+
+    return diesel_reg_fig
+
+
+
+# plot 13 (hybrid registration by company)
+
+
+
+@register_figure('hybrid_reg_fig')
+def build_hybrid_reg_fig() :
+
+    hybrid_reg_germany = registration_series('hybrid')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    hybrid_reg_melted = hybrid_reg_germany.melt(
+                                            id_vars = 'brand' ,
+                                            var_name = 'year' ,
+                                            value_name = 'value'
+    )
+
+    # plot
+
+    hybrid_reg_fig = px.line(
+                            hybrid_reg_melted ,
+                            x = 'year' ,
+                            y = 'value' ,
+                            color = 'brand' ,
+                            title = 'of which Hybrid' ,
+                            labels = {
+                                'brand' : 'brand' , 
+                                'value' : 'amount of units'
+                                } ,
+                            color_discrete_map = {
+                                            'audi': '#F50537',
+                                            'bmw': '#007eed',
+                                            'mercedes': '#697c85' ,
+                                            'toyota' : '#000000' ,
+                                            'volkswagen' : '#1F2F57'
+                                            }   
+    )
+
+    # adjusting line appearance
+
+    hybrid_reg_fig.update_traces(
+                                line_width = 3 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10 , symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
+    )
+
+    hybrid_reg_fig.update_layout(
+                            template = 'dashboard_dark' ,
+                            xaxis = dict(showgrid = True) ,
+                            yaxis = dict(showgrid = True) ,
+                            width = 750 ,
+                            height = 500
+    )
+
+    return hybrid_reg_fig
+
+
+
+# plot 14 (electric registration by company)
+
+
+
+@register_figure('ev_reg_fig')
+def build_ev_reg_fig() :
+
+    ev_reg_germany = registration_series('electric')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    ev_reg_melted = ev_reg_germany.melt(
+                                    id_vars = 'brand' ,
+                                    var_name = 'year' ,
+                                    value_name = 'value'
+    )
+
+    # plot
+
+    ev_reg_fig = px.line(
+                        ev_reg_melted ,
+                        x = 'year' ,
+                        y = 'value' ,
+                        color = 'brand' ,
+                        title = 'of which Electric' ,
+                        labels = {
+                            'brand' : 'brand' , 
+                            'value' : 'amount of units'
+                            } ,
+                        color_discrete_map = {
+                                        'audi': '#F50537',
+                                        'bmw': '#007eed',
+                                        'mercedes': '#697c85' ,
                                         'toyota' : '#000000' ,
                                         'volkswagen' : '#1F2F57'
                                         }   
-)
+    )
+
+    # adjusting line appearance
+
+    ev_reg_fig.update_traces(
+                            line_width = 3 ,
+                            mode = 'lines+markers' , 
+                            marker = dict(size = 10 , symbol = 'circle') ,
+                            hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
+    )
+
+    ev_reg_fig.update_layout(
+                            template = 'dashboard_dark' ,
+                            xaxis = dict(showgrid = True) ,
+                            yaxis = dict(showgrid = True) ,
+                            width = 750 ,
+                            height = 500
+    )
+
+    return ev_reg_fig
+
+
+
+# plot 15 (energy prices)
+
+
+
+@register_figure('energy_prices_fig')
+def build_energy_prices_fig() :
+
+    gas_el_price = load_csv('./data/price_gas_electricity.csv')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    prices_melted = gas_el_price.melt(
+                                    id_vars = 'type' ,
+                                    var_name = 'year' ,
+                                    value_name = 'value'
+    )
+
+    energy_prices_fig = px.line(
+                                prices_melted ,
+                                x = 'year' ,
+                                y = 'value' ,
+                                color = 'type' ,
+                                title = 'Prices trend' ,
+                                labels = {'type' : 'fuel type' , 'value' : 'price'} ,
+                                color_discrete_map = {
+                                                'diesel': '#EBC427',  
+                                                'e5': '#B22929',  
+                                                'e10': '#E5292B' ,
+                                                'electricity' : '#0072CE'
+                                                }
+    )
+
+    energy_prices_fig.update_traces(
+                                    mode = 'lines+markers' , 
+                                    marker = dict(size = 10 , symbol = 'circle') ,
+                                    hovertemplate = 'Year: %{x}<br>Price: %{y}'
+    )
+
+    energy_prices_fig.update_layout(
+                                    template = 'dashboard_dark' ,
+                                    xaxis = dict(tickformat = '%Y') ,              # format x-axis for years
+                                    yaxis = dict(
+                                                tickprefix = "€" ,                 # add € prefix
+                                                tickmode = 'linear' ,              # set tick mode to linear
+                                                tick0 = 0 ,                        # start ticks at 0
+                                                dtick = 0.25 ,                     # step size of 0.25
+                                                range = [0 , 2.25]
+                                            )
+    )
+
+    return energy_prices_fig
+
+
+
+# plot 16 (energy prices % changes)
+
+
+
+@register_figure('energy_change_p_fig')
+def build_energy_change_p_fig() :
+
+    percentage_changes = load_csv('./data/percentage_changes.csv')
+
+    # using melt() to transform the year columns into rows for plotting
+
+    percent_melted = percentage_changes.melt(
+                                    id_vars = 'type' ,
+                                    var_name = 'year' ,
+                                    value_name = 'value'
+    )
+
+    # plot
+
+    energy_change_p_fig = px.line(
+                                percent_melted ,
+                                x = 'year' ,
+                                y = 'value' ,
+                                color = 'type' ,
+                                title = 'Prices trend in %' ,
+                                labels = {'type' : 'fuel type' , 'value' : '%'} ,
+                                color_discrete_map = {
+                                                    'diesel': '#EBC427',  
+                                                    'e5': '#B22929',  
+                                                    'e10': '#E5292B' ,
+                                                    'electricity' : '#0072CE'
+                                                }
+    )
+
+    # adjusting line appearance
+
+    energy_change_p_fig.update_traces(
+                                    mode = 'lines+markers' , 
+                                    marker = dict(size = 10 , symbol = 'circle') ,
+                                    hovertemplate = 'Year: %{x}<br>Change in %: %{y}'
+    )
+
+    # formatting axis
+
+    energy_change_p_fig.update_layout(
+                                    template = 'dashboard_dark' ,
+                                    xaxis = dict(tickformat = '%Y') ,   # format x-axis for years
+                                    yaxis = dict(ticksuffix = "%")    # add % suffix
+    )
+
+    return energy_change_p_fig
+
+
+
+# charging points store
+
+# the yearly charging_points_YYYY.csv files are merged by an ingestion step into one typed,
+# columnar store : one .npy file per column (float32 coordinates, int16 year, categorical codes
+# for Bundesland, Ort and PLZ), which is memory-mapped instead of parsed on every start
+# a store is written once per set of source files into its own directory ; a new yearly file
+# only appends its rows to the previous store, the older csv files are not parsed again
+
+CHARGING_POINT_FILES = './data/charging_points_[0-9][0-9][0-9][0-9].csv'
+CHARGING_POINT_STORE_DIR = os.environ.get('CHARGING_POINT_STORE_DIR' , './cache/charging_points')
+
+charging_point_numeric_columns = {'latitude' : np.float32 , 'longitude' : np.float32 , 'year' : np.int16}
+charging_point_category_columns = ['Bundesland' , 'Ort' , 'PLZ']
+
+
+def charging_point_sources() :
+    return {path : file_fingerprint(path) for path in sorted(glob.glob(CHARGING_POINT_FILES))}
+
+
+def read_charging_point_csv(path) :
+
+    raw = pd.read_csv(
+                    path ,
+                    usecols = ['Postleitzahl' , 'Ort' , 'Bundesland' , 'latitude' , 'longitude' , 'commissioning_date']
+    )
+
+    return pd.DataFrame({
+                        'latitude' : raw['latitude'].astype(np.float32) ,
+                        'longitude' : raw['longitude'].astype(np.float32) ,
+                        'year' : raw['commissioning_date'].astype(np.int16) ,
+                        'Bundesland' : raw['Bundesland'] ,
+                        'Ort' : raw['Ort'] ,
+                        'PLZ' : raw['Postleitzahl'].astype(str).str.zfill(5)     # csv lost the leading zeros
+    })
+
+
+def open_charging_point_store(store_dir) :
+
+    with open(os.path.join(store_dir , 'manifest.json') , encoding = 'utf-8') as file :
+        manifest = json.load(file)
+
+    # mmap_mode = 'r' : pages are only read when used and are shared between processes
+
+    columns = {
+        column : np.load(os.path.join(store_dir , f'{column}.npy') , mmap_mode = 'r')
+        for column in charging_point_numeric_columns
+    }
+
+    for column in charging_point_category_columns :
+        columns[column] = pd.Categorical.from_codes(
+                                                np.load(os.path.join(store_dir , f'{column}.npy') , mmap_mode = 'r') ,
+                                                categories = manifest['categories'][column]
+                        )
+
+    return pd.DataFrame(columns , copy = False) , manifest
+
+
+def write_charging_point_store(charging_points , sources , ingestion , store_dir) :
+
+    # rows are kept sorted by year, so every year is one contiguous slice
+
+    charging_points = charging_points.sort_values('year' , kind = 'stable' , ignore_index = True)
+    tmp_dir = f'{store_dir}.{os.getpid()}.tmp'
+    os.makedirs(tmp_dir , exist_ok = True)
+
+    for column , dtype in charging_point_numeric_columns.items() :
+        np.save(os.path.join(tmp_dir , f'{column}.npy') , charging_points[column].to_numpy(dtype))
+
+    categories = {}
+
+    for column in charging_point_category_columns :
+        values = charging_points[column].astype('category').cat
+        np.save(os.path.join(tmp_dir , f'{column}.npy') , values.codes.to_numpy())
+        categories[column] = values.categories.tolist()
+
+    with open(os.path.join(tmp_dir , 'manifest.json') , 'w' , encoding = 'utf-8') as file :
+        json.dump({'sources' : sources , 'ingestion' : ingestion , 'rows' : len(charging_points) , 'categories' : categories} , file)
+
+    # another worker may have written the same store in the meantime, keep the first one
+
+    try :
+        os.rename(tmp_dir , store_dir)
+    except OSError :
+        shutil.rmtree(tmp_dir , ignore_errors = True)
+    else :
+        prune_charging_point_stores(sources , ingestion)
+
+
+@lru_cache(maxsize = None)
+def charging_point_ingestion() :
+
+    # hash of the code that reads the csv files and lays out the store : a changed reader or
+    # column type must not reuse stores written by the old code
+
+    code = [inspect.getsource(function) for function in (read_charging_point_csv , open_charging_point_store , write_charging_point_store)]
+    code += [repr(charging_point_numeric_columns) , repr(charging_point_category_columns)]
+
+    return hashlib.sha256('|'.join(code).encode()).hexdigest()[:16]
+
+
+def charging_point_stores() :
+
+    # (store dir , manifest) of every finished store ; the .tmp dirs of stores being written right
+    # now and unreadable manifests (e.g. a store that is being removed) are skipped
+
+    stores = []
+
+    for manifest_path in glob.glob(os.path.join(CHARGING_POINT_STORE_DIR , '*' , 'manifest.json')) :
+        store_dir = os.path.dirname(manifest_path)
+
+        if store_dir.endswith('.tmp') :
+            continue
+
+        try :
+            with open(manifest_path , encoding = 'utf-8') as file :
+                manifest = json.load(file)
+
+            stores.append((store_dir , {'sources' : manifest['sources'] , 'ingestion' : manifest.get('ingestion')}))
+
+        except (OSError , ValueError , KeyError) :
+            continue
+
+    return stores
+
+
+def prune_charging_point_stores(sources , ingestion) :
+
+    # stores written by other ingestion code , or built from a strict subset of the current sources ,
+    # are superseded by the new one ; workers still reading one keep their memory maps (the files
+    # live on until unmapped)
+
+    for store_dir , manifest in charging_point_stores() :
+        if manifest['ingestion'] != ingestion or manifest['sources'].items() < sources.items() :
+            shutil.rmtree(store_dir , ignore_errors = True)
+
+
+def build_charging_point_store() :
+
+    sources = charging_point_sources()
+    ingestion = charging_point_ingestion()
+    key = hashlib.sha256(json.dumps([sources , ingestion] , sort_keys = True).encode()).hexdigest()[:16]
+    store_dir = os.path.join(CHARGING_POINT_STORE_DIR , key)
+
+    if os.path.isdir(store_dir) :
+        return store_dir
+
+    # reuse the largest older store of the same ingestion code whose source files are all unchanged
+    # and only read the new files
+
+    previous , previous_sources = None , {}
+
+    for old_dir , manifest in charging_point_stores() :
+        old_sources = manifest['sources']
+
+        if manifest['ingestion'] == ingestion and len(old_sources) > len(previous_sources) and old_sources.items() <= sources.items() :
+            previous , previous_sources = old_dir , old_sources
+
+    frames = [open_charging_point_store(previous)[0]] if previous else []
+    frames += [read_charging_point_csv(path) for path in sources if path not in previous_sources]
+
+    charging_points = pd.concat(
+                            [frame.astype({column : object for column in charging_point_category_columns}) for frame in frames] ,
+                            ignore_index = True
+    )
+
+    write_charging_point_store(charging_points , sources , ingestion , store_dir)
+
+    return store_dir
+
+
+@lru_cache(maxsize = None)
+def read_charging_point_store() :
+    return open_charging_point_store(build_charging_point_store())[0]
+
+
+def load_charging_points() :
+
+    # one row per charging point of all years : latitude , longitude , year , Bundesland , Ort , PLZ
+    # the df is backed by read-only memory maps, callers must not modify it
+
+    for path in glob.glob(CHARGING_POINT_FILES) :
+        track_input(path)
+
+    return read_charging_point_store()
+
+
+
+# point clustering
+
+# maps do not send every raw point to the browser : points are pre-aggregated once into a
+# pyramid of grid clusters (one grid per zoom level, cells of ~CLUSTER_CELL_PX screen pixels
+# in web mercator) ; for a given zoom and viewport only the clusters inside the view are sent,
+# individual points only from CLUSTER_POINT_ZOOM on
+
+CLUSTER_CELL_PX = 40
+CLUSTER_POINT_ZOOM = 12
+
+# plotly's mapbox maps use 512px tiles : at zoom 0 the whole world (2 * pi radians of web mercator ,
+# 360 degrees of longitude) is TILE_PX wide on screen and every zoom level doubles that
+
+TILE_PX = 512
+
+
+def cluster_cell_size(zoom) :
+    return 2 * np.pi / (2 ** zoom * TILE_PX / CLUSTER_CELL_PX)
+
+
+def build_cluster_pyramid(points , group_column) :
+
+    # points : df with 'latitude', 'longitude' (no missing values) and a group column (e.g. year) ,
+    # returns {zoom : df of clusters with group column, 'latitude', 'longitude', 'count'}
+
+    latitude = points['latitude'].to_numpy(float)
+    longitude = points['longitude'].to_numpy(float)
+    x = np.radians(longitude)
+    y = np.log(np.tan(np.pi / 4 + np.radians(latitude) / 2))
+
+    pyramid = {}
+
+    for zoom in range(CLUSTER_POINT_ZOOM) :
+        size = cluster_cell_size(zoom)
+        cells = pd.DataFrame({
+                            group_column : points[group_column].to_numpy() ,
+                            'cell_x' : np.floor(x / size).astype(np.int32) ,
+                            'cell_y' : np.floor(y / size).astype(np.int32) ,
+                            'latitude' : latitude ,
+                            'longitude' : longitude
+        })
+
+        # one cluster per group and cell, placed at the mean position of its points
+
+        pyramid[zoom] = (
+            cells.groupby([group_column , 'cell_x' , 'cell_y'] , observed = True , sort = False)
+                 .agg(
+                    latitude = ('latitude' , 'mean') ,
+                    longitude = ('longitude' , 'mean') ,
+                    count = ('latitude' , 'size')
+                 )
+                 .reset_index()
+                 .drop(columns = ['cell_x' , 'cell_y'])
+        )
+
+    return pyramid
+
+
+def view_bounds(relayout_data) :
+
+    # (west, south, east, north) of the current mapbox view, padded by half a view on every side
+    # so that small pans do not show empty borders ; None if the view is unknown
+
+    try :
+        coordinates = np.array(relayout_data['mapbox._derived']['coordinates'] , dtype = float)
+    except (KeyError , TypeError , ValueError) :
+        return None
+
+    west , south = coordinates.min(axis = 0)
+    east , north = coordinates.max(axis = 0)
+    pad_x , pad_y = (east - west) / 2 , (north - south) / 2
+
+    return west - pad_x , south - pad_y , east + pad_x , north + pad_y
+
+
+def points_in_view(points , bounds) :
+
+    if bounds is None :
+        return points
+
+    west , south , east , north = bounds
+
+    return points[
+        points['longitude'].between(west , east) & points['latitude'].between(south , north)
+    ]
+
+
+def clusters_in_view(pyramid , points , zoom , bounds) :
+
+    # clusters of the zoom level (or single points with count 1 when zoomed in far enough)
+
+    level = max(int(zoom) , 0)
+
+    if level >= CLUSTER_POINT_ZOOM :
+        return points_in_view(points , bounds).assign(count = 1)
+
+    return points_in_view(pyramid[level] , bounds)
+
+
+def cluster_marker_size(count) :
+
+    # single points keep the size of the old map markers, clusters grow with sqrt(count)
+
+    return np.clip(3 + 2 * np.sqrt(count) , 5 , 40).round(1)
+
+
+
+# charging points clusters (plot 17)
+
+
+
+colors_cp = {
+    2015 : '#964F4C' ,
+    2016 : '#f7caca' ,
+    2017 : '#88B04B' ,
+    2018 : '#5F4B8B' ,
+    2019 : '#ff6f61' ,
+    2020 : '#0F4C81' ,
+    2021 : '#f5df4d' ,
+    2022 : '#6667AB' ,
+    2023 : '#BE3455'
+}
+
+# initial zoom of the map (whole of Germany)
+
+CHARGING_POINTS_MAP_ZOOM = 4.5
+
+
+@lru_cache(maxsize = None)
+def cluster_charging_points() :
+
+    # points without coordinates cannot be shown on the map
+
+    located = read_charging_point_store().dropna(subset = ['latitude' , 'longitude'])
+    points = pd.DataFrame({
+                        'year' : located['year'].to_numpy() ,
+                        'latitude' : located['latitude'].to_numpy(float).round(6) ,      # float32 -> short decimals in json
+                        'longitude' : located['longitude'].to_numpy(float).round(6)
+    })
+
+    return points , build_cluster_pyramid(points , 'year')
+
+
+def charging_points_map_traces(zoom , bounds) :
+
+    # one trace per year (also when empty, so the legend and its toggles stay the same)
+
+    load_charging_points()                   # records the csv files as figure inputs
+
+    points , pyramid = cluster_charging_points()
+    clusters = clusters_in_view(pyramid , points , zoom , bounds)
+    clusters_by_year = dict(tuple(clusters.groupby('year')))
+    traces = []
+
+    for year in sorted(points['year'].unique()) :
+        year_clusters = clusters_by_year.get(year , clusters.iloc[:0])
+
+        traces.append(dict(
+                        type = 'scattermapbox' ,
+                        lat = year_clusters['latitude'].to_numpy() ,
+                        lon = year_clusters['longitude'].to_numpy() ,
+                        mode = 'markers' ,
+                        marker = dict(
+                                    size = cluster_marker_size(year_clusters['count'].to_numpy()) ,
+                                    color = colors_cp.get(year) ,
+                                    opacity = 0.8
+                                ) ,
+                        customdata = year_clusters['count'].to_numpy() ,
+                        hovertemplate = f'{year}: %{{customdata}} charging point(s)<extra></extra>' ,
+                        name = str(year)
+        ))
+
+    return traces
+
+
+
+# charging points density (plot 17 , density mode)
+
+# instead of markers the density view sends one count per grid cell : the points of every year are
+# binned once into a fixed grid over Germany, so the payload is bounded by the number of cells and
+# does not grow with the number of charging points
+
+DENSITY_CELL_DEG = 0.1
+DENSITY_BOUNDS = (5.5 , 47.0 , 16.0 , 55.5)        # west , south , east , north
+
+
+@lru_cache(maxsize = None)
+def charging_point_density() :
+
+    # (years , cell center latitudes , cell center longitudes , counts (years x latitudes x longitudes))
+
+    points = cluster_charging_points()[0]
+    latitude = points['latitude'].to_numpy(float)
+    longitude = points['longitude'].to_numpy(float)
+    slices = charging_point_year_slices()
+    years = np.array(sorted(slices))
+
+    west , south , east , north = DENSITY_BOUNDS
+    latitude_edges = np.arange(south , north + DENSITY_CELL_DEG / 2 , DENSITY_CELL_DEG)
+    longitude_edges = np.arange(west , east + DENSITY_CELL_DEG / 2 , DENSITY_CELL_DEG)
+
+    # the points of a year are one contiguous slice , one 2-d histogram per year
+
+    counts = np.stack([
+        np.histogram2d(latitude[start : stop] , longitude[start : stop] , bins = (latitude_edges , longitude_edges))[0]
+        for start , stop in (slices[year] for year in years)
+    ])
+
+    return (
+        years ,
+        ((latitude_edges[:-1] + latitude_edges[1:]) / 2).round(3) ,
+        ((longitude_edges[:-1] + longitude_edges[1:]) / 2).round(3) ,
+        counts.astype(np.int32)
+    )
+
+
+def density_radius(zoom) :
+
+    # about one and a half grid cells on screen
+
+    return float(np.clip(1.5 * DENSITY_CELL_DEG * TILE_PX * 2 ** zoom / 360 , 5 , 150).round(1))
+
+
+def charging_points_density_trace(zoom , year = None) :
+
+    # density of all charging points up to year (default : all years) , only non-empty cells are sent
+
+    load_charging_points()                   # records the csv files as figure inputs
+
+    years , latitudes , longitudes , counts = charging_point_density()
+    grid = counts[years <= (years[-1] if year is None else year)].sum(axis = 0)
+    rows , columns = np.nonzero(grid)
+
+    return dict(
+                type = 'densitymapbox' ,
+                lat = latitudes[rows] ,
+                lon = longitudes[columns] ,
+                z = grid[rows , columns] ,
+                radius = density_radius(zoom) ,
+                colorscale = 'YlOrRd' ,
+                colorbar = dict(title = dict(text = 'per cell')) ,
+                hovertemplate = '%{z} charging point(s)<extra></extra>' ,
+                name = 'density'
+    )
+
+
+
+# charging points growth (plot 17b)
+
+# the growth map adds the charging points of one year at a time : every year is one trace that is
+# filled (extended) the first time the slider reaches it and only hidden / shown afterwards
+
+@lru_cache(maxsize = None)
+def charging_point_year_slices() :
+
+    # the store keeps the rows sorted by year, so the points of every year are one contiguous slice
+    # of the located points : year -> (start , stop)
+
+    year_values = cluster_charging_points()[0]['year'].to_numpy()
+    years = np.unique(year_values)
+    starts = np.searchsorted(year_values , years , side = 'left')
+    stops = np.searchsorted(year_values , years , side = 'right')
+
+    return {int(year) : (int(start) , int(stop)) for year , start , stop in zip(years , starts , stops)}
+
+
+def charging_point_years() :
+    return list(charging_point_year_slices())
+
+
+def charging_points_of_year(year) :
+
+    start , stop = charging_point_year_slices()[year]
+    points = cluster_charging_points()[0].iloc[start : stop]
+
+    return points['latitude'].to_numpy() , points['longitude'].to_numpy()
+
+
+
+# spatial index
+
+# nearest-neighbour and radius queries on haversine (great-circle) distance, backed by a
+# ball tree ; all queries take arrays of coordinates and answer the whole batch at once
+# sklearn is imported only when the first index is built
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def build_spatial_index(latitude , longitude) :
+
+    from sklearn.neighbors import BallTree
+
+    return BallTree(np.radians(np.column_stack([latitude , longitude])) , metric = 'haversine')
+
+
+def query_nearest(index , latitude , longitude , k = 1) :
+
+    # distances (km) and row positions of the k nearest indexed points, both of shape (n, k)
+
+    query = np.radians(np.column_stack([np.atleast_1d(latitude) , np.atleast_1d(longitude)]))
+    distances , positions = index.query(query , k = k)
+
+    return distances * EARTH_RADIUS_KM , positions
+
+
+def query_radius(index , latitude , longitude , radius_km , count_only = True) :
+
+    # number of indexed points within radius_km of every query point, or their row positions
+
+    query = np.radians(np.column_stack([np.atleast_1d(latitude) , np.atleast_1d(longitude)]))
+
+    return index.query_radius(query , r = radius_km / EARTH_RADIUS_KM , count_only = count_only)
+
+
+@lru_cache(maxsize = None)
+def charging_point_index() :
+
+    # (located charging points, their ball tree) ; row positions returned by the queries
+    # refer to the rows of the located df
+
+    located = read_charging_point_store().dropna(subset = ['latitude' , 'longitude']).reset_index(drop = True)
+
+    return located , build_spatial_index(located['latitude'].to_numpy(float) , located['longitude'].to_numpy(float))
+
+
+def nearest_charging_points(latitude , longitude , k = 1) :
+
+    # e.g. the nearest charger of every gas station :
+    #   nearest_charging_points(stations['latitude'] , stations['longitude'])
+
+    located , index = charging_point_index()
+    distances , positions = query_nearest(index , latitude , longitude , k = k)
+
+    return distances , located.iloc[positions.ravel()].reset_index(drop = True)
+
+
+def count_charging_points_within(latitude , longitude , radius_km) :
+
+    # e.g. the charging points within 5 km of an address : count_charging_points_within(lat , lon , 5)
+
+    return query_radius(charging_point_index()[1] , latitude , longitude , radius_km)
+
+
+
+# plot 17 (amount of charging points map)
+
+
+
+@register_figure('charging_points_map_fig')
+def build_charging_points_map_fig() :
+
+    # the initial view shows the clusters for the whole of Germany, update_charging_points_map()
+    # replaces them whenever the user pans or zooms
+
+    layers = charging_points_map_traces(zoom = CHARGING_POINTS_MAP_ZOOM , bounds = None)
+
+    # create the map layout
+
+    layout = go.Layout(
+                    template = 'dashboard_dark' ,
+                    mapbox = dict(
+                                style = 'carto-positron' , 
+                                zoom = CHARGING_POINTS_MAP_ZOOM ,
+                                center = dict(lat = 51.1657 , lon = 10.4515)        # center of Germany
+                            ),
+                    margin = dict(r = 0 , t = 0 , l = 0 , b = 0) ,                  # remove margins
+                    legend = dict(
+                                title = dict(text = 'Year')  
+                            ) ,
+                    uirevision = 'charging_points_map'                              # keep the view when the clusters change
+    )
+
+    # combine layers into a figure
+
+    charging_points_map_fig = go.Figure(
+                                        data = layers , 
+                                        layout = layout
+                                    )
+
+    return charging_points_map_fig
+
+
+
+# plot 17b (growth of the charging points network map)
+
+
+
+@register_figure('charging_points_growth_fig')
+def build_charging_points_growth_fig() :
+
+    load_charging_points()                   # records the csv files as figure inputs
+
+    # one trace per year, only the first year starts with its points (see update_charging_points_growth)
+
+    years = charging_point_years()
+    layers = []
+
+    for year in years :
+        latitude , longitude = charging_points_of_year(year) if year == years[0] else ([] , [])
+
+        layers.append(go.Scattermapbox(
+                                    lat = latitude ,
+                                    lon = longitude ,
+                                    mode = 'markers' ,
+                                    marker = dict(
+                                                size = 5 ,
+                                                color = colors_cp.get(year) ,
+                                                opacity = 0.8
+                                            ) ,
+                                    hovertemplate = f'{year}<extra></extra>' ,
+                                    name = str(year)
+                                )
+        )
+
+    layout = go.Layout(
+                    template = 'dashboard_dark' ,
+                    mapbox = dict(
+                                style = 'carto-positron' ,
+                                zoom = CHARGING_POINTS_MAP_ZOOM ,
+                                center = dict(lat = 51.1657 , lon = 10.4515)        # center of Germany
+                            ) ,
+                    margin = dict(r = 0 , t = 0 , l = 0 , b = 0) ,
+                    height = 700 ,
+                    legend = dict(
+                                title = dict(text = 'Year')
+                            ) ,
+                    uirevision = 'charging_points_growth'                           # keep the view while points are added
+    )
+
+    charging_points_growth_fig = go.Figure(
+                                        data = layers ,
+                                        layout = layout
+                                    )
+
+    return charging_points_growth_fig
+
+
+
+# gas station clusters (plot 18)
+
+
+
+brand_colors = {
+                'ARAL' : '#1670B9' ,
+                'ESSO' : '#d6dbdb' ,
+                'TotalEnergies' : '#FF7800' ,
+                'Shell' : '#FFD500' ,
+                'AVIA' : '#E30613'
+}
+
+
+@lru_cache(maxsize = None)
+def cluster_gas_stations() :
+
+    # the address is only sent (as hover customdata) for single stations at high zoom
+
+    top_5_gas_stations = read_csv_cached('./data/top5_gasstations.csv')
+
+    points = pd.DataFrame({
+                        'brand' : top_5_gas_stations['brand'].to_numpy() ,
+                        'latitude' : top_5_gas_stations['latitude'].to_numpy(float) ,
+                        'longitude' : top_5_gas_stations['longitude'].to_numpy(float) ,
+                        'address' : (
+                            (top_5_gas_stations['street'] + ' ' + top_5_gas_stations['house_number'].fillna('').str.strip()).str.strip() + ', ' +
+                            top_5_gas_stations['post_code'].astype(str).str.zfill(5) + ' ' + top_5_gas_stations['city']
+                        ).to_numpy()
+    })
+
+    return points , build_cluster_pyramid(points , 'brand')
+
+
+def gas_station_map_traces(zoom , bounds) :
+
+    # one trace per brand, clusters show their station count, single stations brand and address
+
+    load_csv('./data/top5_gasstations.csv')  # records the csv file as figure input
+
+    points , pyramid = cluster_gas_stations()
+    clusters = clusters_in_view(pyramid , points , zoom , bounds)
+    clusters_by_brand = dict(tuple(clusters.groupby('brand')))
+    single_stations = zoom >= CLUSTER_POINT_ZOOM
+    traces = []
+
+    for brand in brand_colors :
+        brand_clusters = clusters_by_brand.get(brand , clusters.iloc[:0])
+
+        traces.append(dict(
+                        type = 'scattermapbox' ,
+                        lat = brand_clusters['latitude'].to_numpy() ,
+                        lon = brand_clusters['longitude'].to_numpy() ,
+                        mode = 'markers' ,
+                        marker = dict(
+                                    size = cluster_marker_size(brand_clusters['count'].to_numpy()) ,
+                                    color = brand_colors[brand] ,
+                                    opacity = 0.8
+                                ) ,
+                        customdata = brand_clusters['address' if single_stations else 'count'].to_numpy() ,
+                        hovertemplate = f'{brand}<br>%{{customdata}}<extra></extra>' if single_stations
+                                        else f'{brand}: %{{customdata}} gas station(s)<extra></extra>' ,
+                        name = brand
+        ))
+
+    return traces
+
+
+
+# plot 18 (amount of gas stations (top 5 brands) map)
+
+
+
+@register_figure('top5_gas_st_fig')
+def build_top5_gas_st_fig() :
+
+    # clusters instead of one labelled marker per station, update_gas_station_map() replaces
+    # them whenever the user pans or zooms
+
+    layers = gas_station_map_traces(zoom = CHARGING_POINTS_MAP_ZOOM , bounds = None)
+
+    layout = go.Layout(
+                    template = 'dashboard_dark' ,
+                    mapbox = dict(
+                                style = 'carto-positron' ,
+                                zoom = CHARGING_POINTS_MAP_ZOOM ,
+                                center = dict(lat = 51.1657 , lon = 10.4515)        # center of Germany
+                            ) ,
+                    height = 500 ,
+                    legend = dict(
+                                title = dict(text = 'brand')
+                            ) ,
+                    margin = {'r' : 0 ,'t' : 0 , 'l' : 0 , 'b' : 0} ,           # remove margins
+                    uirevision = 'top5_gas_st_map'                              # keep the view when the clusters change
+    )
+
+    top5_gas_st_fig = go.Figure(
+                                data = layers ,
+                                layout = layout
+                            )
+
+    return top5_gas_st_fig
+
+
+
+# coverage gaps (gas stations vs charging points)
+
+# for every gas station the distance to the nearest charging point of the network as it was at the
+# end of every year : the new charging points of a year (one contiguous slice of the year-sorted
+# store) get their own ball tree that answers the batch of all stations at once , and a running
+# minimum over the years turns "nearest new charging point" into "nearest one built so far"
+
+COVERAGE_RADII_KM = [1 , 2 , 5 , 10]
+COVERAGE_RADIUS_KM = 5              # default selection
+
+coverage_groups = {'bundesland' : 'Bundesland' , 'plz_region' : 'PLZ region'}
+
+
+@lru_cache(maxsize = None)
+def gas_station_coverage() :
+
+    # (stations df , years , distances (stations x years) in km)
+
+    stations = cluster_gas_stations()[0]
+    located , index = charging_point_index()
+    years = charging_point_years()
+
+    latitude = stations['latitude'].to_numpy()
+    longitude = stations['longitude'].to_numpy()
+    charger_latitude = located['latitude'].to_numpy(float)
+    charger_longitude = located['longitude'].to_numpy(float)
+
+    nearest_new = np.column_stack([
+        query_nearest(build_spatial_index(charger_latitude[start : stop] , charger_longitude[start : stop]) , latitude , longitude)[0][: , 0]
+        for start , stop in (charging_point_year_slices()[year] for year in years)
+    ])
+
+    distances = np.minimum.accumulate(nearest_new , axis = 1)
+
+    # the station data has no Bundesland : a station gets the one of its post code , and only a
+    # post code without any charging point falls back to the one of its nearest charging point ;
+    # PLZ regions are the first two digits of the post code
+
+    post_codes = read_csv_cached('./data/top5_gasstations.csv')['post_code'].astype(str).str.zfill(5)
+    bundesland = post_codes.map(post_code_bundesland()).to_numpy(object)
+    unknown = pd.isna(bundesland)
+
+    if unknown.any() :
+        positions = query_nearest(index , latitude[unknown] , longitude[unknown])[1][: , 0]
+        bundesland[unknown] = located['Bundesland'].to_numpy()[positions]
+
+    stations = stations.assign(
+                            bundesland = bundesland ,
+                            plz_region = post_codes.str[:2].to_numpy()
+    )
+
+    return stations , years , distances
+
+
+@lru_cache(maxsize = None)
+def post_code_bundesland() :
+
+    # PLZ -> Bundesland of the charging point store ; the few post codes crossing a state border
+    # get the Bundesland most of their charging points are in
+
+    counts = load_charging_points().groupby(['PLZ' , 'Bundesland'] , observed = True).size()
+    counts = counts.sort_values(ascending = False , kind = 'stable')
+
+    return counts[~counts.index.get_level_values('PLZ').duplicated()].reset_index(level = 'Bundesland')['Bundesland'].astype(object)
+
+
+def coverage_shares(radius_km , group) :
+
+    # share of the gas stations with a charging point within radius_km , one row per group
+    # (plus Germany) and one column per year
+
+    stations , years , distances = gas_station_coverage()
+
+    covered = pd.DataFrame(distances <= radius_km , columns = [str(year) for year in years])
+    covered.insert(0 , 'stations' , 1)
+    covered.insert(0 , group , stations[group].to_numpy())
+
+    aggregations = {'stations' : 'sum'} | {str(year) : 'mean' for year in years}
+    shares = covered.groupby(group , observed = True).agg(aggregations).reset_index()
+    germany = covered.drop(columns = group).agg(aggregations).to_frame().T.assign(**{group : 'Germany'})
+
+    return pd.concat([shares , germany[shares.columns]] , ignore_index = True).astype({'stations' : int})
+
+
+def coverage_table(radius_km , group) :
+
+    # (rows , columns) of the coverage table
+
+    shares = coverage_shares(radius_km , group)
+
+    columns = [
+        {'name' : coverage_groups[group] , 'id' : group} ,
+        {'name' : 'gas stations' , 'id' : 'stations' , 'type' : 'numeric'}
+    ] + [
+        {'name' : column , 'id' : column , 'type' : 'numeric' , 'format' : dash_table.FormatTemplate.percentage(0)}
+        for column in shares.columns[2 :]
+    ]
+
+    return shares.to_dict('records') , columns
+
+
+def coverage_gap_trace(radius_km) :
+
+    # gas stations without a charging point within radius_km today , colored by the distance
+
+    stations , years , distances = gas_station_coverage()
+    gaps = distances[: , -1] > radius_km
+
+    return dict(
+                type = 'scattermapbox' ,
+                lat = stations['latitude'].to_numpy()[gaps] ,
+                lon = stations['longitude'].to_numpy()[gaps] ,
+                mode = 'markers' ,
+                marker = dict(
+                            size = 7 ,
+                            color = distances[gaps , -1].round(1) ,
+                            colorscale = 'YlOrRd' ,
+                            cmin = radius_km ,
+                            colorbar = dict(title = dict(text = 'km'))
+                        ) ,
+                customdata = np.column_stack([stations['brand'].to_numpy()[gaps] , stations['address'].to_numpy()[gaps]]) ,
+                hovertemplate = '%{customdata[0]}<br>%{customdata[1]}<br>%{marker.color} km to the nearest charging point<extra></extra>' ,
+                name = f'no charging point within {radius_km} km ({years[-1]})'
+    )
+
+
+
+# plot 18b (gas stations without a charging point nearby map)
+
+
+
+@register_figure('coverage_gap_fig')
+def build_coverage_gap_fig() :
+
+    load_csv('./data/top5_gasstations.csv')  # records the csv files as figure inputs
+    load_charging_points()
+
+    layout = go.Layout(
+                    template = 'dashboard_dark' ,
+                    mapbox = dict(
+                                style = 'carto-positron' ,
+                                zoom = CHARGING_POINTS_MAP_ZOOM ,
+                                center = dict(lat = 51.1657 , lon = 10.4515)        # center of Germany
+                            ) ,
+                    height = 600 ,
+                    margin = dict(r = 0 , t = 0 , l = 0 , b = 0) ,
+                    uirevision = 'coverage_gap_map'
+    )
+
+    coverage_gap_fig = go.Figure(
+                                data = [coverage_gap_trace(COVERAGE_RADIUS_KM)] ,
+                                layout = layout
+                            )
+
+    return coverage_gap_fig
+
+
+
+# plot 20 (total amount of charging points per federal state)
+
+
+
+@register_figure('total_cp_fs_fig')
+def build_total_cp_fs_fig() :
+
+    total_cp = load_csv('./data/total_cp.csv')
+
+    # convert data to a long format
+
+    total_melted = total_cp.melt(
+                                id_vars = 'federal_state' , 
+                                var_name = 'year' , 
+                                value_name = 'value'
+                            )
+
+    total_melted['year'] = total_melted['year'].astype(int)
+
+    custom_colors = {
+        'Baden-Württemberg' : '#FFD700' ,  
+        'Bayern' : '#4682B4' ,
+        'Berlin' : '#8B0000' ,
+        'Brandenburg' : '#8B0000' ,
+        'Bremen' : '#8B0000' ,
+        'Hamburg' : '#8B0000' ,
+        'Hessen' : '#8B0000' ,
+        'Mecklenburg-Vorpommern' : '#FFBF00' ,
+        'Niedersachsen' : 'black' ,
+        'Nordrhein-Westfalen' : '#228B22' ,
+        'Rheinland-Pfalz' : 'black' ,
+        'Saarland' : '#4682B4' ,
+        'Sachsen' : '#228B22' ,
+        'Sachsen-Anhalt' : '#FFBF00' ,
+        'Schleswig-Holstein' : '#4682B4' ,
+        'Thüringen' : '#4682B4'  
+    }
+
+    # create the small multiples plot
+
+    total_cp_fs_fig = px.line(
+                            total_melted ,
+                            x = 'year' ,
+                            y = 'value' ,
+                            color = 'federal_state' ,
+                            facet_col = 'federal_state' ,
+                            facet_col_wrap = 4 , 
+                            title = 'Amount of Charging Points per Federal State' ,
+                            labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
+                            height = 900 ,
+                            color_discrete_map = custom_colors
+    )
+
+    total_cp_fs_fig.update_layout(
+                                template = 'dashboard_dark' ,
+                                xaxis = dict(showgrid = True) ,  
+                                yaxis = dict(showgrid = True) ,
+                                showlegend = False  
+    )
+
+    total_cp_fs_fig.update_traces(
+                                line = dict(width = 2) ,
+                                marker = dict(size = 3)  
+    )
+
+    total_cp_fs_fig.for_each_annotation(lambda a: a.update(text = a.text.split("=")[-1]))
+
+    return total_cp_fs_fig
+
+
+
+# plot 21 (amount of slow charging points per federal state)
+
+
+
+@register_figure('nlp_fig')
+def build_nlp_fig() :
+
+    nlp = load_csv('./data/nlp.csv')
+
+    # convert data to a long format
+
+    nlp_melted = nlp.melt(
+                        id_vars = 'federal_state' , 
+                        var_name = 'year' , 
+                        value_name = 'value'
+                    )
+
+    nlp_melted['year'] = nlp_melted['year'].astype(int)
+
+    custom_colors = {
+        'Baden-Württemberg' : '#FFD700' ,  
+        'Bayern' : '#4682B4' ,
+        'Berlin' : '#8B0000' ,
+        'Brandenburg' : '#8B0000' ,
+        'Bremen' : '#8B0000' ,
+        'Hamburg' : '#8B0000' ,
+        'Hessen' : '#8B0000' ,
+        'Mecklenburg-Vorpommern' : '#FFBF00' ,
+        'Niedersachsen' : 'black' ,
+        'Nordrhein-Westfalen' : '#228B22' ,
+        'Rheinland-Pfalz' : 'black' ,
+        'Saarland' : '#4682B4' ,
+        'Sachsen' : '#228B22' ,
+        'Sachsen-Anhalt' : '#FFBF00' ,
+        'Schleswig-Holstein' : '#4682B4' ,
+        'Thüringen' : '#4682B4'  
+    }
+
+    # create the small multiples plot
+
+    nlp_fig = px.line(
+                nlp_melted ,
+                x = 'year' ,
+                y = 'value' ,
+                color = 'federal_state' ,
+                facet_col = 'federal_state' ,
+                facet_col_wrap = 4 ,   
+                title = 'Amount of Standard Charging Points in Federal States' ,
+                labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
+                height = 900 ,
+                color_discrete_map = custom_colors
+    )
+
+    nlp_fig.update_layout(
+                        template = 'dashboard_dark' ,
+                        xaxis = dict(showgrid = True) ,  
+                        yaxis = dict(showgrid = True) ,
+                        showlegend = False
+    )
+
+    nlp_fig.update_traces(
+                        line = dict(width = 2) ,  
+                        marker = dict(size = 3)  
+    )
+
+    nlp_fig.for_each_annotation(lambda a : a.update(text=a.text.split("=")[-1]))
+
+    return nlp_fig
+
+
+
+# plot 22 (amount of fast charging points per federal state)
+
+
+
+@register_figure('slp_fig')
+def build_slp_fig() :
+
+    slp = load_csv('./data/slp.csv')
+
+    # convert data to a long format
+
+    slp_melted = slp.melt(
+                        id_vars = 'federal_state' , 
+                        var_name = 'year' , 
+                        value_name = 'value'
+                )
+
+    slp_melted['year'] = slp_melted['year'].astype(int)
+
+    custom_colors = {
+        'Baden-Württemberg' : '#FFD700' ,  
+        'Bayern' : '#4682B4' ,
+        'Berlin' : '#8B0000' ,
+        'Brandenburg' : '#8B0000' ,
+        'Bremen' : '#8B0000' ,
+        'Hamburg' : '#8B0000' ,
+        'Hessen' : '#8B0000' ,
+        'Mecklenburg-Vorpommern' : '#FFBF00' ,
+        'Niedersachsen' : 'black' ,
+        'Nordrhein-Westfalen' : '#228B22' ,
+        'Rheinland-Pfalz' : 'black' ,
+        'Saarland' : '#4682B4' ,
+        'Sachsen' : '#228B22' ,
+        'Sachsen-Anhalt' : '#FFBF00' ,
+        'Schleswig-Holstein' : '#4682B4' ,
+        'Thüringen' : '#4682B4'  
+    }
+
+    # create the small multiples plot
+
+    slp_fig = px.line(
+                    slp_melted,
+                    x = 'year' ,
+                    y = 'value' ,
+                    color = 'federal_state' ,
+                    facet_col = 'federal_state' ,
+                    facet_col_wrap = 4 ,   
+                    title = 'Amount of Fast Charging Points in Federal States' ,
+                    labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
+                    height = 900 ,
+                    color_discrete_map = custom_colors
+    )
+
+    slp_fig.update_layout(
+                        template = 'dashboard_dark' ,
+                        xaxis = dict(showgrid = True) ,  
+                        yaxis = dict(showgrid = True) ,
+                        showlegend = False
+    )
+
+    slp_fig.update_traces(
+                        line = dict(width = 2) ,  
+                        marker = dict(size = 3)  
+    )
+
+    slp_fig.for_each_annotation(lambda a : a.update(text=a.text.split("=")[-1]))
+
+    return slp_fig
+
+
+
+# charging point forecasts
+
+# every charging point series (16 federal states and germany x NLP / SLP / total) is fitted by a
+# forecast model in one batched least squares solve and extrapolated to FORECAST_END ; the result is a
+# tidy table with one row per series and year, shared by the national and the per-state prediction plots
+
+FORECAST_END = 2035
+
+charging_point_series_files = {
+    'NLP' : './data/nlp.csv' ,
+    'SLP' : './data/slp.csv' ,
+    'total' : './data/total_cp.csv'
+}
+
+# colors for each charger type
+
+colors_ttcp = {'NLP' : '#20b843' , 'SLP' : '#2049b8' , 'total' : '#20b8b4'}
+
+
+def load_charging_point_series() :
+
+    # one row per series : federal state , charger type ('index') and the amount per year
+
+    frames = [load_csv(path).assign(index = index) for index , path in charging_point_series_files.items()]
+    frames.append(load_csv('./data/total_total_cp.csv').assign(federal_state = 'Germany'))
+
+    series = pd.concat(frames , ignore_index = True)
+    year_columns = [column for column in series.columns if column.isdigit()]
+
+    labels = series[['federal_state' , 'index']]
+    years = np.array(year_columns , dtype = int)
+    values = series[year_columns].to_numpy(dtype = float)
+
+    return labels , years , values
+
+
+# forecast models
+
+# a model is a batched fit function : fit(years , values) with values (series x years) returns a
+# predict(years) function that gives the fitted amounts as (series x years) ; models are registered
+# with register_forecast_model and show up in the model selector of plot 23 on their own
+
+forecast_models = {}                # model name -> {'label' , 'fit' , 'parameters' (count , for the bootstrap) , 'space'}
+
+DEFAULT_FORECAST_MODEL = 'linear'
+
+# the space a model fits in : given the fitted predictor (one or many series) it returns
+# (forward , inverse) on (series x years) arrays and the bootstrap resamples the residuals there ,
+# e.g. multiplicative residuals for the log-linear model , so a resampled series stays inside what
+# the model can fit (positive , or below its saturation)
+
+def linear_space(predict) :
+    return (lambda values : values , lambda values : values)
+
+
+def log_space(predict) :
+    return (lambda values : np.log(np.maximum(values , 1)) , np.exp)
+
+
+def logit_space(predict) :
+
+    # every series in the logit space of its own fitted saturation level
+
+    capacity = predict.capacities[: , np.newaxis]
+
+    def forward(values) :
+        values = np.clip(values , 1 , capacity * (1 - 1e-6))
+        return np.log(values / (capacity - values))
+
+    return (forward , lambda logits : capacity / (1 + np.exp(-logits)))
+
+
+def register_forecast_model(name , label , parameters , space = linear_space) :
+
+    def decorator(fit) :
+        forecast_models[name] = {'label' : label , 'fit' : fit , 'parameters' : parameters , 'space' : space}
+        return fit
+
+    return decorator
+
+
+def trend_design(years , first_year , degree) :
+
+    # years are shifted to start at 0 for a stable solve
+
+    return np.vander(years - first_year , degree + 1 , increasing = True).astype(float)
+
+
+def fit_polynomial(years , values , degree) :
+
+    # all series share the design matrix, so a single lstsq call fits every series at once
+
+    first_year = years[0]
+    coefficients = np.linalg.lstsq(trend_design(years , first_year , degree) , values.T , rcond = None)[0]
+
+    return lambda future_years : (trend_design(future_years , first_year , degree) @ coefficients).T
+
+
+register_forecast_model('linear' , 'Linear' , 2)(partial(fit_polynomial , degree = 1))
+register_forecast_model('polynomial' , 'Polynomial' , 3)(partial(fit_polynomial , degree = 2))
+
+
+@register_forecast_model('log_linear' , 'Log-linear' , 2 , space = log_space)
+def fit_log_linear(years , values) :
+
+    # exponential growth is a straight line in log space
+
+    predict_log = fit_polynomial(years , np.log(np.maximum(values , 1)) , 1)
+
+    return lambda future_years : np.exp(predict_log(future_years))
+
+
+# saturation levels tried by the logistic model, as multiples of the largest observed amount
+
+LOGISTIC_CAPACITY_GRID = np.geomspace(1.05 , 20 , 60)
+
+
+@register_forecast_model('logistic' , 'Logistic saturation' , 3 , space = logit_space)
+def fit_logistic(years , values) :
+
+    # for a fixed saturation level K the logistic curve is a straight line in logit space ,
+    # log(y / (K - y)) = a + b * year , so every (series , K) pair is fitted in one batched lstsq
+    # and per series the K with the smallest squared error in the original space wins
+
+    values = np.maximum(values , 1)
+    capacities = values.max(axis = 1)[: , np.newaxis] * LOGISTIC_CAPACITY_GRID                  # (series x grid)
+    logits = np.log(values[: , np.newaxis] / (capacities[: , : , np.newaxis] - values[: , np.newaxis]))
+
+    predict_logit = fit_polynomial(years , logits.reshape(-1 , len(years)) , 1)
+
+    def predict_all(future_years) :
+        return capacities.reshape(-1 , 1) / (1 + np.exp(-predict_logit(future_years)))         # ((series x grid) x years)
+
+    errors = ((predict_all(years).reshape(logits.shape) - values[: , np.newaxis]) ** 2).sum(axis = 2)
+    best = np.arange(len(values)) * len(LOGISTIC_CAPACITY_GRID) + errors.argmin(axis = 1)
+
+    def predict(future_years) :
+        return predict_all(future_years)[best]
+
+    predict.capacities = capacities.reshape(-1)[best]
+
+    return predict
+
+
+# prediction bands : residual bootstrap of the model fit , all resamples of a series are refitted
+# in one batch ; the seed is fixed so a rebuilt figure (and its cache entry) is stable
+
+BOOTSTRAP_SAMPLES = 2000
+BAND_LEVEL = 0.95
+
+
+@lru_cache(maxsize = None)
+def bootstrap_band(model , years , values , future_years) :
+
+    # arguments are tuples , so the lru cache keeps one band per model and series (and its data)
+
+    years , values , future_years = np.array(years) , np.array(values) , np.array(future_years)
+    fit = forecast_models[model]['fit']
+    rng = np.random.default_rng(0)
+
+    space = forecast_models[model]['space']
+
+    predict = fit(years , values[np.newaxis])
+    forward , inverse = space(predict)
+    fitted = forward(predict(years))
+
+    # residuals in the model's space , rescaled for the fitted parameters
+
+    residuals = (forward(values[np.newaxis]) - fitted)[0] * np.sqrt(len(years) / (len(years) - forecast_models[model]['parameters']))
+
+    # (samples x years) resampled series -> (samples x future years) predictions plus new noise ;
+    # every resample is refitted with all its parameters (the logistic one picks its own saturation
+    # level) and its noise is added in its own space
+
+    resampled = inverse(fitted + residuals[rng.integers(0 , len(years) , (BOOTSTRAP_SAMPLES , len(years)))])
+    refit = fit(years , resampled)
+    forward , inverse = space(refit)
+    predictions = forward(refit(future_years))
+    predictions = inverse(predictions + residuals[rng.integers(0 , len(years) , predictions.shape)])
+
+    lower , upper = np.quantile(predictions , [(1 - BAND_LEVEL) / 2 , (1 + BAND_LEVEL) / 2] , axis = 0)
+
+    return lower , upper
+
+
+def prediction_band(series , model = DEFAULT_FORECAST_MODEL) :
+
+    # series : the rows of one series in the forecast table
+
+    observed = series.dropna(subset = ['actual'])
+
+    return bootstrap_band(model , tuple(observed['year']) , tuple(observed['actual']) , tuple(series['year']))
+
+
+# a band edge further than BAND_MAX_FACTOR x the series scale (largest predicted or observed
+# amount) from its prediction means the bootstrap broke down , build-cache refuses such bands ;
+# a decade of log-linear extrapolation from the smallest states legitimately reaches ~25 x
+
+BAND_MAX_FACTOR = 50
+
+
+def check_prediction_bands() :
+
+    # (model , federal state , charger type) of every series whose band is out of range
+
+    broken = []
+
+    for model in forecast_models :
+        for (federal_state , index) , series in charging_point_forecasts(model).groupby(['federal_state' , 'index'] , sort = False) :
+            lower , upper = prediction_band(series , model)
+            prediction = series['prediction'].to_numpy()
+            scale = max(np.abs(prediction).max() , series['actual'].max())
+
+            if (np.abs(upper - prediction) > BAND_MAX_FACTOR * scale).any() or (np.abs(prediction - lower) > BAND_MAX_FACTOR * scale).any() :
+                broken.append((model , federal_state , index))
+
+    return broken
+
+
+# fitted predictions per model and series ; the key holds a hash of the series data , so a data
+# refresh only refits the series that changed and switching models never refits a cached one
+
+fit_cache = {}              # (model , federal state , charger type , data hash) -> predicted amounts
+
+
+def charging_point_forecasts(model = DEFAULT_FORECAST_MODEL) :
+
+    labels , years , values = load_charging_point_series()
+    future_years = np.arange(years[0] , FORECAST_END + 1)
+
+    keys = [
+        (model , federal_state , index , hashlib.sha256(years.tobytes() + future_years.tobytes() + row.tobytes()).hexdigest())
+        for federal_state , index , row in zip(labels['federal_state'] , labels['index'] , values)
+    ]
+
+    # fit all series missing from the cache in one batch
+
+    missing = [i for i , key in enumerate(keys) if key not in fit_cache]
+
+    if missing :
+        predicted = forecast_models[model]['fit'](years , values[missing])(future_years)
+
+        for i , row in zip(missing , predicted) :
+            fit_cache[keys[i]] = row
 
-# adjusting line appearance
+    predictions = np.array([fit_cache[key] for key in keys])
 
-hybrid_reg_fig.update_traces(
-                            line_width = 3 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10 , symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
-)
+    # actual amounts for the observed years, nan for the forecast horizon
 
-hybrid_reg_fig.update_layout(
-                        xaxis = dict(showgrid = True, gridcolor = 'white') ,
-                        yaxis = dict(showgrid = True, gridcolor = 'white') ,
-                        width = 750 ,
-                        height = 500 ,
-                        plot_bgcolor = '#BDC3C7' ,
-                        paper_bgcolor = '#2C3E50' ,
-                        font = dict(
-                                    family = 'PT Sans Narrow' ,
-                                    size = 16 ,
-                                    color = '#ECF0F1'
-                                )      
-)
+    actual = np.full(predictions.shape , np.nan)
+    actual[: , np.searchsorted(future_years , years)] = values
 
+    return pd.DataFrame({
+                        'federal_state' : np.repeat(labels['federal_state'].to_numpy() , len(future_years)) ,
+                        'index' : np.repeat(labels['index'].to_numpy() , len(future_years)) ,
+                        'year' : np.tile(future_years , len(labels)) ,
+                        'actual' : actual.ravel() ,
+                        'prediction' : predictions.ravel()
+    })
 
 
-# plot 14 (electric registration by company)
 
+# plot 23 (prediction on amount of charging points)
 
 
-ev_reg_germany = pd.read_csv('./data/ev_reg_germany.csv')
 
-# using melt() to transform the year columns into rows for plotting
+def build_ttcp_fig(model) :
 
-ev_reg_melted = ev_reg_germany.melt(
-                                id_vars = 'brand' ,
-                                var_name = 'year' ,
-                                value_name = 'value'
-)
+    forecasts = charging_point_forecasts(model)
+    germany = forecasts[forecasts['federal_state'] == 'Germany']
 
-# plot
+    # initialize figure
 
-ev_reg_fig = px.line(
-                    ev_reg_melted ,
-                    x = 'year' ,
-                    y = 'value' ,
-                    color = 'brand' ,
-                    title = 'of which Electric' ,
-                    labels = {
-                        'brand' : 'brand' , 
-                        'value' : 'amount of units'
-                        } ,
-                    color_discrete_map = {
-                                    'audi': '#F50537',
-                                    'bmw': '#007eed',
-                                    'mercedes': '#697c85' ,
-                                    'toyota' : '#000000' ,
-                                    'volkswagen' : '#1F2F57'
-                                    }   
-)
+    ttcp_fig = go.Figure()
 
-# adjusting line appearance
+    trace_indices = []          # charger type of every trace (for the visibility buttons)
 
-ev_reg_fig.update_traces(
-                        line_width = 3 ,
-                        mode = 'lines+markers' , 
-                        marker = dict(size = 10 , symbol = 'circle') ,
-                        hovertemplate = 'Year: %{x}<br>Amount of units: %{y}'
-)
+    for index in ['NLP' , 'SLP' , 'total'] :
 
-ev_reg_fig.update_layout(
-                        xaxis = dict(showgrid = True, gridcolor = 'white') ,
-                        yaxis = dict(showgrid = True, gridcolor = 'white') ,
-                        width = 750 ,
-                        height = 500 ,
-                        plot_bgcolor = '#BDC3C7' ,
-                        paper_bgcolor = '#2C3E50' ,
-                        font = dict(
-                                    family = 'PT Sans Narrow' ,
-                                    size = 16 ,
-                                    color = '#ECF0F1'
-                                )      
-)
+        # actual data and trend of the current index
 
+        series = germany[germany['index'] == index]
+        observed = series.dropna(subset = ['actual'])
 
+        # add actual data points to the plot
 
-# plot 15 (energy prices)
+        ttcp_fig.add_trace(go.Scatter(
+                                    x = observed['year'] ,
+                                    y = observed['actual'] ,
+                                    mode = 'markers' ,
+                                    name = f'{index} Actual' ,
+                                    marker = dict(
+                                                size = 8 , 
+                                                symbol = 'circle' , 
+                                                color = colors_ttcp[index])
+                                )
+        )
 
+        # add predicted trendline to the plot
 
+        ttcp_fig.add_trace(go.Scatter(
+                                    x = series['year'] ,
+                                    y = series['prediction'] ,
+                                    mode = 'lines' ,
+                                    name = f'{index} Prediction' ,
+                                    line = dict(
+                                                color = colors_ttcp[index] , 
+                                                dash = 'dash'
+                                            )
+                                )
+        )
 
-gas_el_price = pd.read_csv('./data/price_gas_electricity.csv')
+        # add the prediction band (upper edge first, the lower edge fills up to it)
 
-# using melt() to transform the year columns into rows for plotting
+        lower , upper = prediction_band(series , model)
+        red , green , blue = (int(colors_ttcp[index][i : i + 2] , 16) for i in (1 , 3 , 5))
 
-prices_melted = gas_el_price.melt(
-                                id_vars = 'type' ,
-                                var_name = 'year' ,
-                                value_name = 'value'
-)
+        ttcp_fig.add_trace(go.Scatter(
+                                    x = series['year'] ,
+                                    y = upper ,
+                                    mode = 'lines' ,
+                                    line = dict(width = 0) ,
+                                    name = f'{index} Prediction {BAND_LEVEL:.0%} upper' ,
+                                    legendgroup = f'{index} band' ,
+                                    showlegend = False ,
+                                    hovertemplate = 'Year: %{x}<br>Upper: %{y:.0f}<extra></extra>'
+                                )
+        )
 
-energy_prices_fig = px.line(
-                            prices_melted ,
-                            x = 'year' ,
-                            y = 'value' ,
-                            color = 'type' ,
-                            title = 'Prices trend' ,
-                            labels = {'type' : 'fuel type' , 'value' : 'price'} ,
-                            color_discrete_map = {
-                                            'diesel': '#EBC427',  
-                                            'e5': '#B22929',  
-                                            'e10': '#E5292B' ,
-                                            'electricity' : '#0072CE'
-                                            }
-)
+        ttcp_fig.add_trace(go.Scatter(
+                                    x = series['year'] ,
+                                    y = lower ,
+                                    mode = 'lines' ,
+                                    line = dict(width = 0) ,
+                                    fill = 'tonexty' ,
+                                    fillcolor = f'rgba({red}, {green}, {blue}, 0.2)' ,
+                                    name = f'{index} Prediction {BAND_LEVEL:.0%}' ,
+                                    legendgroup = f'{index} band' ,
+                                    hovertemplate = 'Year: %{x}<br>Lower: %{y:.0f}<extra></extra>'
+                                )
+        )
 
-energy_prices_fig.update_traces(
-                                mode = 'lines+markers' , 
-                                marker = dict(size = 10 , symbol = 'circle') ,
-                                hovertemplate = 'Year: %{x}<br>Price: %{y}'
-)
+        trace_indices += [index] * 4
 
-energy_prices_fig.update_layout(
-                                xaxis = dict(tickformat = '%Y') ,              # format x-axis for years
-                                yaxis = dict(
-                                            tickprefix = "€" ,                 # add € prefix
-                                            tickmode = 'linear' ,              # set tick mode to linear
-                                            tick0 = 0 ,                        # start ticks at 0
-                                            dtick = 0.25 ,                     # step size of 0.25
-                                            range = [0 , 2.25]
-                                        ) , 
-                                plot_bgcolor = '#BDC3C7' ,
-                                paper_bgcolor = '#2C3E50' ,
-                                font = dict(
-                                            family = 'PT Sans Narrow' ,
-                                            size = 16 ,
-                                            color = '#ECF0F1'
-                                        )                                     
-)
+    ttcp_fig.update_layout(
+                        template = 'dashboard_dark' ,
+                        title = 'Prediction on amount of charging points in Germany (2017-2035)' ,
+                        xaxis_title = 'year' ,
+                        yaxis_title = 'amount of charging points' ,
+                        legend = dict(x = 0.1 , y = 0.9) ,
+                        xaxis = dict(showgrid = True) ,
+                        yaxis = dict(showgrid = True) ,
+                        updatemenus = [
+                                        dict(
+                                            buttons = list([
+
+                                                        # Show All Button : make all traces visible
+
+                                                        dict(
+                                                            label = 'Show All' ,
+                                                            method = 'update' ,
+                                                            args = [{'visible' : [True] * len(trace_indices)}]
+                                                        ) ,
+
+                                                        # NLP Only Button : show only NLP Actual, NLP Prediction and its band
+
+                                                        dict(
+                                                            label = 'NLP Only' ,
+                                                            method = 'update' ,
+                                                            args = [{'visible' : [trace_index == 'NLP' for trace_index in trace_indices]}]
+                                                        ) ,
+
+                                                        # SLP Only Button : show only SLP Actual, SLP Prediction and its band
+
+                                                        dict(
+                                                            label = 'SLP Only' ,
+                                                            method = 'update' ,
+                                                            args = [{'visible' : [trace_index == 'SLP' for trace_index in trace_indices]}]
+                                                        ) ,
+
+                                                        # Total Only Button : show only Total Actual, Total Prediction and its band
+
+                                                        dict(
+                                                            label = 'Total Only' ,
+                                                            method = 'update' ,
+                                                            args = [{'visible' : [trace_index == 'total' for trace_index in trace_indices]}]
+                                                        ) ,
+                                                    ]) ,
+                                            direction = 'down' ,
+                                        )
+                                    ]
+    )
 
+    return ttcp_fig
 
 
-# plot 16 (energy prices % changes)
+# one figure per forecast model , the model selector only swaps the (memoized) figures
+
+for model in forecast_models :
+    register_figure(f'ttcp_{model}_fig')(partial(build_ttcp_fig , model = model))
+
+
+
+# plot 23b (prediction on amount of charging points per federal state)
+
 
 
+@register_figure('cp_forecast_fs_fig')
+def build_cp_forecast_fs_fig() :
 
-percentage_changes = pd.read_csv('./data/percentage_changes.csv')
+    forecasts = charging_point_forecasts(DEFAULT_FORECAST_MODEL)
+    states = forecasts[forecasts['federal_state'] != 'Germany']
 
-# using melt() to transform the year columns into rows for plotting
+    # long format : actual amounts and predicted trend as separate rows
 
-percent_melted = percentage_changes.melt(
-                                id_vars = 'type' ,
-                                var_name = 'year' ,
+    states_melted = states.melt(
+                                id_vars = ['federal_state' , 'index' , 'year'] ,
+                                value_vars = ['actual' , 'prediction'] ,
+                                var_name = 'kind' ,
                                 value_name = 'value'
-)
+    ).dropna(subset = ['value'])
 
-# plot
+    # create the small multiples plot
 
-energy_change_p_fig = px.line(
-                            percent_melted ,
-                            x = 'year' ,
-                            y = 'value' ,
-                            color = 'type' ,
-                            title = 'Prices trend in %' ,
-                            labels = {'type' : 'fuel type' , 'value' : '%'} ,
-                            color_discrete_map = {
-                                                'diesel': '#EBC427',  
-                                                'e5': '#B22929',  
-                                                'e10': '#E5292B' ,
-                                                'electricity' : '#0072CE'
-                                            }
-)
+    cp_forecast_fs_fig = px.line(
+                                states_melted ,
+                                x = 'year' ,
+                                y = 'value' ,
+                                color = 'index' ,
+                                line_dash = 'kind' ,
+                                facet_col = 'federal_state' ,
+                                facet_col_wrap = 4 ,
+                                title = f'Prediction on amount of charging points in Federal States (2017-{FORECAST_END})' ,
+                                labels = {'value' : 'amount of charging points' , 'year' : 'year' , 'index' : 'type'} ,
+                                height = 1100 ,
+                                color_discrete_map = colors_ttcp ,
+                                line_dash_map = {'actual' : 'solid' , 'prediction' : 'dash'}
+    )
 
-# adjusting line appearance
+    cp_forecast_fs_fig.update_layout(
+                                    template = 'dashboard_dark' ,
+                                    xaxis = dict(showgrid = True) ,
+                                    yaxis = dict(showgrid = True)
+    )
 
-energy_change_p_fig.update_traces(
-                                mode = 'lines+markers' , 
-                                marker = dict(size = 10 , symbol = 'circle') ,
-                                hovertemplate = 'Year: %{x}<br>Change in %: %{y}'
-)
+    cp_forecast_fs_fig.update_yaxes(matches = None)       # states differ by orders of magnitude
 
-# formatting axis
-
-energy_change_p_fig.update_layout(
-                                xaxis = dict(tickformat = '%Y') ,   # format x-axis for years
-                                yaxis = dict(ticksuffix = "%") ,    # add % suffix
-                                plot_bgcolor = '#BDC3C7' ,
-                                paper_bgcolor = '#2C3E50' ,
-                                font = dict(
-                                            family = 'PT Sans Narrow' ,
-                                            size = 16 ,
-                                            color = '#ECF0F1'
-                                        )                   
-)
+    cp_forecast_fs_fig.update_traces(line = dict(width = 2))
 
+    cp_forecast_fs_fig.for_each_annotation(lambda a : a.update(text = a.text.split("=")[-1]))
 
+    return cp_forecast_fs_fig
 
-# plot 17 (amount of charging points map)
 
 
+# plot 24 (audi revenue)
 
-charging_points_2015 = pd.read_csv('./data/charging_points_2015.csv')
-charging_points_2016 = pd.read_csv('./data/charging_points_2016.csv')
-charging_points_2017 = pd.read_csv('./data/charging_points_2017.csv')
-charging_points_2018 = pd.read_csv('./data/charging_points_2018.csv')
-charging_points_2019 = pd.read_csv('./data/charging_points_2019.csv')
-charging_points_2020 = pd.read_csv('./data/charging_points_2020.csv')
-charging_points_2021 = pd.read_csv('./data/charging_points_2021.csv')
-charging_points_2022 = pd.read_csv('./data/charging_points_2022.csv')
-charging_points_2023 = pd.read_csv('./data/charging_points_2023.csv')
 
-layer1 = go.Scattermapbox(
-                        lat = charging_points_2015['latitude'] ,
-                        lon = charging_points_2015['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5, color = '#964F4C') ,  
-                        name = '2015'    
-)
 
-layer2 = go.Scattermapbox(
-                        lat = charging_points_2016['latitude'] ,
-                        lon = charging_points_2016['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#f7caca') ,  
-                        name = '2016'
-)
+@register_figure('a_revenue_fig')
+def build_a_revenue_fig() :
 
-layer3 = go.Scattermapbox(
-                        lat = charging_points_2017['latitude'] ,
-                        lon = charging_points_2017['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#88B04B') ,  
-                        name = '2017'  
-)
+    audi_revenue = load_csv('./data/audi_revenue.csv')
 
-layer4 = go.Scattermapbox(
-                        lat = charging_points_2018['latitude'] ,
-                        lon = charging_points_2018['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#5F4B8B') ,
-                        name = '2018' 
-)
+    # filtering using boolean mask just needed category (revenue)
 
-layer5 = go.Scattermapbox(
-                        lat = charging_points_2019['latitude'] ,
-                        lon = charging_points_2019['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#ff6f61') ,  
-                        name = '2019'  
-)
+    revenue_a_data = audi_revenue[audi_revenue['category'] == 'revenue_(euro_billion)']
 
-layer6 = go.Scattermapbox(
-                        lat = charging_points_2020['latitude'] ,
-                        lon = charging_points_2020['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#0F4C81') ,
-                        name = '2020'
-)
+    #  using melt() to transform the year columns into rows for plotting
 
-layer7 = go.Scattermapbox(
-                        lat = charging_points_2021['latitude'] ,
-                        lon = charging_points_2021['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#f5df4d') , 
-                        name = '2021'  
-)
+    revenue_a_melted = revenue_a_data.melt(
+                                        id_vars = 'category',       # keep the 'category' column as is
+                                        var_name = 'year',          # create a column for years
+                                        value_name = 'revenue'      # create a column for revenue values
+    )
 
-layer8 = go.Scattermapbox(
-                        lat = charging_points_2022['latitude'] ,
-                        lon = charging_points_2022['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#6667AB') ,
-                        name = '2022'
-)
+    # plot
 
-layer9 = go.Scattermapbox(
-                        lat = charging_points_2023['latitude'] ,
-                        lon = charging_points_2023['longitude'] ,
-                        mode = 'markers' ,
-                        marker = dict(size = 5 , color = '#BE3455') , 
-                        name = '2023'
-)
+    a_revenue_fig = px.line(
+                        revenue_a_melted ,
+                        x = 'year' ,                 # years on the x-axis
+                        y = 'revenue' ,              # revenue on the y-axis
+                        title = 'Audi Revenue (2015-2023)'
+    )
 
-# create the map layout
-
-layout = go.Layout(
-                mapbox = dict(
-                            style = 'carto-positron' , 
-                            zoom = 4.5 ,
-                            center = dict(lat = 51.1657 , lon = 10.4515)        # center of Germany
-                        ),
-                margin = dict(r = 0 , t = 0 , l = 0 , b = 0) ,                  # remove margins
-                paper_bgcolor = '#2C3E50' ,
-                font = dict(
-                            family = 'PT Sans Narrow' ,
-                            size = 16 ,
-                            color = '#ECF0F1'
-                        ) ,
-                legend = dict(
-                            title = dict(text = 'Year')  
-                        )                       
-)
+    # adjusting line appearance
 
-# combine layers into a figure
+    a_revenue_fig.update_traces(
+                                line_color = '#F50537' ,
+                                line_width = 4 ,
+                                mode = 'lines+markers' ,
+                                marker = dict(size = 10 , symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
+    )
 
-charging_points_map_fig = go.Figure(
-                                    data = [layer1, layer2, layer3, layer4, layer5, layer6, layer7, layer8, layer9] , 
-                                    layout = layout
-                                )
+    a_revenue_fig.update_layout(
+                            template = 'audi' ,
+                            xaxis = dict(
+                                        tickformat = '%Y' ,
+                                         showgrid = True , 
+                                         rangeslider = dict(visible = True)
+                                    ) ,                       
+                            yaxis = dict(
+                                        tickprefix = '€' , 
+                                        ticksuffix = 'B' ,
+                                        showgrid = True
+                                    ) ,
+                            width = 600 , 
+                            height = 400        
+    )
 
+    return a_revenue_fig
 
 
-# plot 18 (amount of gas stations (top 5 brands) map)
 
+# plot 25 (audi revenue growth)
 
 
-top_5_gas_stations = pd.read_csv('./data/top5_gasstations.csv')
 
-brand_colors = {
-                'ARAL' : '#1670B9' ,
-                'ESSO' : '#d6dbdb' ,
-                'TotalEnergies' : '#FF7800' ,
-                'Shell' : '#FFD500' ,
-                'AVIA' : '#E30613'
-}
+@register_figure('a_revenue_growth_fig')
+def build_a_revenue_growth_fig() :
 
+    audi_revenue = load_csv('./data/audi_revenue.csv')
 
-top5_gas_st_fig = px.scatter_mapbox(
-                                    top_5_gas_stations ,
-                                    lat = 'latitude' ,
-                                    lon = 'longitude', 
-                                    text = 'brand' ,
-                                    color = 'brand' ,
-                                    color_discrete_map = brand_colors ,
-                                    zoom = 4.5 ,       
-                                    height = 500    
-)
+    # filtering using boolean mask just needed category (revenue growth)
 
-top5_gas_st_fig.update_layout(
-                            mapbox_style = 'carto-positron' ,  
-                            paper_bgcolor = '#2C3E50' ,
-                            font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                    ) ,
-                            margin = {'r' : 0 ,'t' : 0 , 'l' : 0 , 'b' : 0}             # remove margins 
-)
+    growth_a_data = audi_revenue[audi_revenue['category'] == 'revenue_growth_(%)']
 
+    #  using melt() to transform the year columns into rows for plotting
 
+    growth_a_melted = growth_a_data.melt(
+                                        id_vars = 'category' ,              # keep the 'category' column as is
+                                        var_name = 'year' ,                 # create a column for years
+                                        value_name = '%'                    # create a column for revenue values
+    )
 
-# plot 20 (total amount of charging points per federal state)
+    # plot
 
+    a_revenue_growth_fig = px.line (
+                                    growth_a_melted ,
+                                    x = 'year' ,
+                                    y = '%' ,
+                                    title = 'Audi Revenue Growth (2015-2023)'
+    )
 
+    a_revenue_growth_fig.update_traces(
+                                        line_color = '#F50537' ,
+                                        line_width = 4 ,
+                                        mode = 'lines+markers' , 
+                                        marker = dict(size = 10 , symbol = 'circle') ,
+                                        hovertemplate = 'Year: %{x}<br>Growth: %{y}'
+    )
 
-total_cp = pd.read_csv('./data/total_cp.csv')
+    a_revenue_growth_fig.update_layout(
+                                        template = 'audi' ,
+                                        xaxis = dict(
+                                                     tickformat = '%Y' ,
+                                                     showgrid = True , 
+                                                     rangeslider = dict(visible = True)
+                                                ) ,  
+                                        yaxis = dict(
+                                                     ticksuffix = "%" ,
+                                                     showgrid = True , 
+                                                     tickmode = 'linear' ,  # set tick mode to linear
+                                                     tick0 = 0 ,            # start ticks at 0
+                                                     dtick = 3 ,            # step size of 1
+                                                     range = [-4 , 16]
+                                                ) ,
+                                        width = 600 , 
+                                        height = 400              
+    )
 
-# convert data to a long format
+    return a_revenue_growth_fig
 
-total_melted = total_cp.melt(
-                            id_vars = 'federal_state' , 
-                            var_name = 'year' , 
-                            value_name = 'value'
-                        )
 
-total_melted['year'] = total_melted['year'].astype(int)
-
-custom_colors = {
-    'Baden-Württemberg' : '#FFD700' ,  
-    'Bayern' : '#4682B4' ,
-    'Berlin' : '#8B0000' ,
-    'Brandenburg' : '#8B0000' ,
-    'Bremen' : '#8B0000' ,
-    'Hamburg' : '#8B0000' ,
-    'Hessen' : '#8B0000' ,
-    'Mecklenburg-Vorpommern' : '#FFBF00' ,
-    'Niedersachsen' : 'black' ,
-    'Nordrhein-Westfalen' : '#228B22' ,
-    'Rheinland-Pfalz' : 'black' ,
-    'Saarland' : '#4682B4' ,
-    'Sachsen' : '#228B22' ,
-    'Sachsen-Anhalt' : '#FFBF00' ,
-    'Schleswig-Holstein' : '#4682B4' ,
-    'Thüringen' : '#4682B4'  
-}
 
-# create the small multiples plot
+# plot 26 (bmw revenue)
 
-total_cp_fs_fig = px.line(
-                        total_melted ,
-                        x = 'year' ,
-                        y = 'value' ,
-                        color = 'federal_state' ,
-                        facet_col = 'federal_state' ,
-                        facet_col_wrap = 4 , 
-                        title = 'Amount of Charging Points per Federal State' ,
-                        labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
-                        height = 900 ,
-                        color_discrete_map = custom_colors
-)
 
-total_cp_fs_fig.update_layout(
-                            plot_bgcolor = '#BDC3C7' ,
-                            paper_bgcolor = '#2C3E50' ,
-                            font = dict(
-                                        family = 'PT Sans Narrow' ,
-                                        size = 16 ,
-                                        color = '#ECF0F1'
-                                    ) ,  
-                            xaxis = dict(showgrid = True , gridcolor = 'white') ,  
-                            yaxis = dict(showgrid = True , gridcolor = 'white') ,
-                            showlegend = False  
-)
 
-total_cp_fs_fig.update_traces(
-                            line = dict(width = 2) ,
-                            marker = dict(size = 3)  
-)
+@register_figure('b_revenue_fig')
+def build_b_revenue_fig() :
 
-total_cp_fs_fig.for_each_annotation(lambda a: a.update(text = a.text.split("=")[-1]))
+    bmw_revenue = load_csv('./data/bmw_revenue.csv')
 
+    # filtering using boolean mask just needed category (revenue)
 
+    revenue_b_data = bmw_revenue[bmw_revenue['category'] == 'revenue_(euro_billion)']
 
-# plot 21 (amount of slow charging points per federal state)
+    #  using melt() to transform the year columns into rows for plotting
 
+    revenue_b_melted = revenue_b_data.melt(
+                                        id_vars = 'category',       # Keep the 'category' column as is
+                                        var_name = 'year',          # Create a column for years
+                                        value_name = 'revenue'      # Create a column for revenue values
+    )
 
+    # plot
 
-nlp = pd.read_csv('./data/nlp.csv')
+    b_revenue_fig = px.line(
+                            revenue_b_melted,
+                            x = 'year' ,                            # years on the x-axis
+                            y = 'revenue' ,                         # revenue on the y-axis
+                            title = 'BMW Revenue (2015-2023)' ,
+    )
 
-# convert data to a long format
+    b_revenue_fig.update_traces(
+                                line_color = '#007eed' ,
+                                line_width = 4 ,
+                                mode = 'lines+markers' ,
+                                marker = dict(size = 10 , symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Revenue: %{y}'               
+    )
 
-nlp_melted = nlp.melt(
-                    id_vars = 'federal_state' , 
-                    var_name = 'year' , 
-                    value_name = 'value'
-                )
+    b_revenue_fig.update_layout(
+                                template = 'bmw' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' , 
+                                            showgrid = True, 
+                                            rangeslider = dict(visible = True)
+                                        ),  
+                                yaxis = dict(
+                                            tickprefix = "€" , 
+                                            ticksuffix = "B" , 
+                                            showgrid = True
+                                        ) ,
+                                width = 600 , 
+                                height = 400                
+    )
 
-nlp_melted['year'] = nlp_melted['year'].astype(int)
-
-custom_colors = {
-    'Baden-Württemberg' : '#FFD700' ,  
-    'Bayern' : '#4682B4' ,
-    'Berlin' : '#8B0000' ,
-    'Brandenburg' : '#8B0000' ,
-    'Bremen' : '#8B0000' ,
-    'Hamburg' : '#8B0000' ,
-    'Hessen' : '#8B0000' ,
-    'Mecklenburg-Vorpommern' : '#FFBF00' ,
-    'Niedersachsen' : 'black' ,
-    'Nordrhein-Westfalen' : '#228B22' ,
-    'Rheinland-Pfalz' : 'black' ,
-    'Saarland' : '#4682B4' ,
-    'Sachsen' : '#228B22' ,
-    'Sachsen-Anhalt' : '#FFBF00' ,
-    'Schleswig-Holstein' : '#4682B4' ,
-    'Thüringen' : '#4682B4'  
-}
+    return b_revenue_fig
 
-# create the small multiples plot
-
-nlp_fig = px.line(
-            nlp_melted ,
-            x = 'year' ,
-            y = 'value' ,
-            color = 'federal_state' ,
-            facet_col = 'federal_state' ,
-            facet_col_wrap = 4 ,   
-            title = 'Amount of Standard Charging Points in Federal States' ,
-            labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
-            height = 900 ,
-            color_discrete_map = custom_colors
-)
 
-nlp_fig.update_layout(
-                    plot_bgcolor = '#BDC3C7' ,
-                    paper_bgcolor = '#2C3E50' ,
-                    font = dict(
-                                family = 'PT Sans Narrow' ,
-                                size = 16 ,
-                                color = '#ECF0F1'
-                            ) ,  
-                    xaxis = dict(showgrid = True , gridcolor = 'white') ,  
-                    yaxis = dict(showgrid = True , gridcolor = 'white') ,
-                    showlegend = False
-)
 
-nlp_fig.update_traces(
-                    line = dict(width = 2) ,  
-                    marker = dict(size = 3)  
-)
+# plot 27 (bmw revenue growth)
 
-nlp_fig.for_each_annotation(lambda a : a.update(text=a.text.split("=")[-1]))
 
 
+@register_figure('b_revenue_growth_fig')
+def build_b_revenue_growth_fig() :
 
-# plot 22 (amount of fast charging points per federal state)
+    bmw_revenue = load_csv('./data/bmw_revenue.csv')
 
+    # filtering using boolean mask just needed category (revenue growth)
 
+    growth_b_data = bmw_revenue[bmw_revenue['category'] == 'revenue_growth_(%)']
 
-slp = pd.read_csv('./data/slp.csv')
+    #  using melt() to transform the year columns into rows for plotting
 
-# convert data to a long format
+    growth_b_melted = growth_b_data.melt(
+                                        id_vars = 'category' ,       # keep the 'category' column as is
+                                        var_name = 'year' ,          # create a column for years
+                                        value_name = '%'             # create a column for revenue growth values
+    )
 
-slp_melted = slp.melt(
-                    id_vars = 'federal_state' , 
-                    var_name = 'year' , 
-                    value_name = 'value'
-            )
+    # plot
 
-slp_melted['year'] = slp_melted['year'].astype(int)
-
-custom_colors = {
-    'Baden-Württemberg' : '#FFD700' ,  
-    'Bayern' : '#4682B4' ,
-    'Berlin' : '#8B0000' ,
-    'Brandenburg' : '#8B0000' ,
-    'Bremen' : '#8B0000' ,
-    'Hamburg' : '#8B0000' ,
-    'Hessen' : '#8B0000' ,
-    'Mecklenburg-Vorpommern' : '#FFBF00' ,
-    'Niedersachsen' : 'black' ,
-    'Nordrhein-Westfalen' : '#228B22' ,
-    'Rheinland-Pfalz' : 'black' ,
-    'Saarland' : '#4682B4' ,
-    'Sachsen' : '#228B22' ,
-    'Sachsen-Anhalt' : '#FFBF00' ,
-    'Schleswig-Holstein' : '#4682B4' ,
-    'Thüringen' : '#4682B4'  
-}
+    b_revenue_growth_fig = px.line(
+                                    growth_b_melted ,
+                                    x = 'year' ,
+                                    y = '%' ,
+                                    title = 'BMW Revenue Growth (2015-2023)'
+    )
 
-# create the small multiples plot
+    b_revenue_growth_fig.update_traces(
+                                        line_color = '#007eed' ,
+                                        line_width = 4 ,
+                                        mode = 'lines+markers' ,
+                                        marker = dict(size = 10 , symbol = 'circle') ,
+                                        hovertemplate = 'Year: %{x}<br>Growth: %{y}'
+    )
 
-slp_fig = px.line(
-                slp_melted,
-                x = 'year' ,
-                y = 'value' ,
-                color = 'federal_state' ,
-                facet_col = 'federal_state' ,
-                facet_col_wrap = 4 ,   
-                title = 'Amount of Fast Charging Points in Federal States' ,
-                labels = {'value' : 'amount of charging points' , 'year' : 'year'} ,
-                height = 900 ,
-                color_discrete_map = custom_colors
-)
+    b_revenue_growth_fig.update_layout(
+                                        template = 'bmw' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,
+                                                    showgrid = True , 
+                                                    rangeslider = dict(visible = True)
+                                                ) ,  
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,
+                                                    showgrid = True , 
+                                                    tickmode = 'linear' ,                   # set tick mode to linear
+                                                    tick0 = 0 ,                             # start ticks at 0
+                                                    dtick = 3 ,                             # step size of 3
+                                                    range = [-12 , 19]
+                                                ) ,
+                                        width = 600 ,
+                                        height = 450                 
+    )
+
+    return b_revenue_growth_fig
 
-slp_fig.update_layout(
-                    plot_bgcolor = '#BDC3C7' ,
-                    paper_bgcolor = '#2C3E50' ,
-                    font = dict(
-                                family = 'PT Sans Narrow' ,
-                                size = 16 ,
-                                color = '#ECF0F1'
-                            ) ,  
-                    xaxis = dict(showgrid = True , gridcolor = 'white') ,  
-                    yaxis = dict(showgrid = True , gridcolor = 'white') ,
-                    showlegend = False
-)
 
-slp_fig.update_traces(
-                    line = dict(width = 2) ,  
-                    marker = dict(size = 3)  
-)
 
-slp_fig.for_each_annotation(lambda a : a.update(text=a.text.split("=")[-1]))
+# plot 28 (mercedes revenue)
 
 
 
-# plot 23 (prediction on amount of charging points)
+@register_figure('m_revenue_fig')
+def build_m_revenue_fig() :
 
+    mercedes_revenue = load_csv('./data/mercedes_revenue.csv')
 
+    # boolean mask for filtering only needed row (revenue)
 
-total_total_cp = pd.read_csv('./data/total_total_cp.csv')
+    revenue_m_data = mercedes_revenue[mercedes_revenue['category'] == 'revenue_(euro_billion)']
 
-years_ttcp = np.array([2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024]).reshape(-1, 1)
+    # using melt() to transform the year columns into rows for plotting
 
-# initialize figure
+    revenue_m_melted = revenue_m_data.melt(
+                                            id_vars = 'category' ,          # keeps the 'category' column as is
+                                            var_name = 'year' ,             # create a column for years
+                                            value_name = 'revenue'          # create a column for revenue values
+    )
 
-ttcp_fig = go.Figure()
+    # plot
 
-# colors for each index
+    m_revenue_fig = px.line(
+                            revenue_m_melted ,
+                            x = 'year' ,
+                            y = 'revenue' ,
+                            title = 'Mercedes-Benz Revenue (2015-2023)'
+    ) 
 
-colors_ttcp = {'NLP' : '#20b843' , 'SLP' : '#2049b8' , 'total' : '#20b8b4'}
+    m_revenue_fig.update_traces(
+                                line_color = '#231f20' ,
+                                line_width = 4 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10, symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
+    )
+
+    m_revenue_fig.update_layout(
+                                template = 'mercedes' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' ,
+                                            showgrid = True , 
+                                            rangeslider = dict(visible = True)
+                                        ) , 
+                                yaxis = dict(
+                                            tickprefix = '€' , 
+                                            ticksuffix = 'B' ,
+                                            showgrid = True
+                                        ) ,
+                                width = 600 ,
+                                height = 400
+    )
 
-# regression for each index
+    return m_revenue_fig
 
-for index in ['NLP' , 'SLP' , 'total'] :
 
-    # extract data for the current index
 
-    points = total_total_cp.loc[total_total_cp['index'] == index].iloc[0, 1:].values
+# plot 29 (mercedes revenue growth)
 
-    # fit the model
 
-    model = LinearRegression()
-    model.fit(years_ttcp , points)
 
-    # predict values up to 2035
+@register_figure('m_revenue_growth_fig')
+def build_m_revenue_growth_fig() :
 
-    future_years = np.array(range(2017, 2036)).reshape(-1, 1)
-    predicted_points = model.predict(future_years)
+    mercedes_revenue = load_csv('./data/mercedes_revenue.csv')
 
-    # add actual data points to the plot
+    # boolean mask for filtering only needed row
 
-    ttcp_fig.add_trace(go.Scatter(
-                                x = years_ttcp.flatten() ,
-                                y = points ,
-                                mode = 'markers' ,
-                                name = f'{index} Actual' ,
-                                marker = dict(
-                                            size = 8 , 
-                                            symbol = 'circle' , 
-                                            color = colors_ttcp[index])
-                            )
+    growth_m_data = mercedes_revenue[mercedes_revenue['category'] == 'revenue_growth_(%)']
+
+    # using melt() to transform the year columns into rows for plotting
+
+    growth_m_melted = growth_m_data.melt(
+                                        id_vars = 'category' ,              # keeps the 'category' column as is
+                                        var_name = 'year' ,                 # create a column for years
+                                        value_name = '%'                    # create a column for grow % values
     )
 
-    # add predicted trendline to the plot
+    # plotting line plot
 
-    ttcp_fig.add_trace(go.Scatter(
-                                x = future_years.flatten() ,
-                                y = predicted_points ,
-                                mode = 'lines' ,
-                                name = f'{index} Prediction' ,
-                                line = dict(
-                                            color = colors_ttcp[index] , 
-                                            dash = 'dash'
-                                        )
-                            )
+    m_revenue_growth_fig = px.line(
+                                    growth_m_melted ,
+                                    x = 'year' ,
+                                    y = '%' ,
+                                    title = 'Mercedes-Benz Revenue Growth (2015-2023)' 
+    ) 
+
+    # adjusting line
+
+    m_revenue_growth_fig.update_traces(
+                                        line_color = '#231f20' ,
+                                        line_width = 4 ,
+                                        mode = 'lines+markers' , 
+                                        marker = dict(size = 10, symbol = 'circle') ,
+                                        hovertemplate = 'Year: %{x}<br>Growth: %{y}'
     )
 
-ttcp_fig.update_layout(
-                    title = 'Prediction on amount of charging points in Germany (2017-2035)' ,
-                    xaxis_title = 'year' ,
-                    yaxis_title = 'amount of charging points' ,
-                    legend = dict(x = 0.1 , y = 0.9) ,
-                    template = 'plotly_white' ,
-                    plot_bgcolor = '#BDC3C7' ,
-                    paper_bgcolor = '#2C3E50' ,
-                    font = dict(
-                                family = 'PT Sans Narrow' ,
-                                size = 16 ,
-                                color = '#ECF0F1'
-                            ) ,       
-                    xaxis = dict(showgrid = True , gridcolor = 'white') ,
-                    yaxis = dict(showgrid = True , gridcolor = 'white') ,
-                    updatemenus = [
-                                    dict(
-                                        buttons = list([
-
-                                                    # Show All Button : make all traces visible
-
-                                                    dict(
-                                                        label = 'Show All' ,
-                                                        method = 'update' ,
-                                                        args = [{'visible' : [True , True , True , True , True , True]}]
-                                                    ) ,
+    m_revenue_growth_fig.update_layout(
+                                        template = 'mercedes' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,
+                                                    showgrid = True , 
+                                                    rangeslider = dict(visible = True)
+                                                ) , 
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,
+                                                    showgrid = True ,
+                                                    tickmode = 'linear',                    # set tick mode to linear
+                                                    tick0 = 0,                              # start ticks at 0
+                                                    dtick = 3,                              # step size of 3
+                                                    range = [-3 , 16]
+                                                ) ,
+                                        width = 600 ,
+                                        height = 400
+    )
 
-                                                    # NLP Only Button : show only NLP Actual and NLP Prediction
+    return m_revenue_growth_fig
 
-                                                    dict(
-                                                        label = 'NLP Only' ,
-                                                        method = 'update' ,
-                                                        args = [{'visible' : [True , True , False , False , False , False]}]
-                                                    ) ,
 
-                                                    # SLP Only Button : show only SLP Actual and SLP Prediction
 
-                                                    dict(
-                                                        label = 'SLP Only' ,
-                                                        method = 'update' ,
-                                                        args = [{'visible' : [False , False , True , True , False , False]}]
-                                                    ) ,
+# plot 30 (toyota revenue)
 
-                                                    # Total Only Button : show only Total Actual and Total Prediction
 
-                                                    dict(
-                                                        label = 'Total Only' ,
-                                                        method = 'update' ,
-                                                        args = [{'visible' : [False , False , False , False , True , True]}]
-                                                    ) ,
-                                                ]) ,
-                                        direction = 'down' ,
-                                    )
-                                ]
-)
 
+@register_figure('t_revenue_fig')
+def build_t_revenue_fig() :
 
+    toyota_revenue = load_csv('./data/toyota_revenue.csv')
 
-# plot 24 (audi revenue)
+    # boolean mask for filtering only needed row
 
+    revenue_t_data = toyota_revenue[toyota_revenue['category'] == 'revenue_(euro_billion)']
 
+    # using melt() to transform the year columns into rows for plotting
 
-# filtering using boolean mask just needed category (revenue)
+    revenue_t_melted = revenue_t_data.melt(
+                                            id_vars = 'category' ,              # keeps the 'category' column as is
+                                            var_name = 'year' ,                 # create a column for years
+                                            value_name = 'revenue'              # create a column for revenue values
+            )
 
-revenue_a_data = audi_revenue[audi_revenue['category'] == 'revenue_(euro_billion)']
+    t_revenue_fig = px.line(
+                            revenue_t_melted ,
+                            x = 'year' ,
+                            y = 'revenue' ,
+                            title = 'Toyota Revenue (2015-2023)' 
+    ) 
 
-#  using melt() to transform the year columns into rows for plotting
+    # adjusting line
 
-revenue_a_melted = revenue_a_data.melt(
-                                    id_vars = 'category',       # keep the 'category' column as is
-                                    var_name = 'year',          # create a column for years
-                                    value_name = 'revenue'      # create a column for revenue values
-)
+    t_revenue_fig.update_traces(
+                                line_color = '#EB0A1E' ,
+                                line_width = 4 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10, symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
+    )
 
-# plot
+    t_revenue_fig.update_layout(
+                                template = 'toyota' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' ,
+                                            showgrid = True , 
+                                            rangeslider = dict(visible = True)
+                                        ) , 
+                                yaxis = dict(
+                                            tickprefix = '€' , 
+                                            ticksuffix = 'B' ,
+                                            showgrid = True
+                                        ) ,
+                                width = 600 ,
+                                height = 400
+    )
 
-a_revenue_fig = px.line(
-                    revenue_a_melted ,
-                    x = 'year' ,                 # years on the x-axis
-                    y = 'revenue' ,              # revenue on the y-axis
-                    title = 'Audi Revenue (2015-2023)'
-)
+    return t_revenue_fig
 
-# adjusting line appearance
 
-a_revenue_fig.update_traces(
-                            line_color = '#F50537' ,
-                            line_width = 4 ,
-                            mode = 'lines+markers' ,
-                            marker = dict(size = 10 , symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
-)
 
-a_revenue_fig.update_layout(
-                        xaxis = dict(
-                                    tickformat = '%Y' ,
-                                     showgrid = True , 
-                                     gridcolor = 'black' ,
-                                     rangeslider = dict(visible = True)
-                                ) ,                       
-                        yaxis = dict(
-                                    tickprefix = '€' , 
-                                    ticksuffix = 'B' ,
-                                    showgrid = True , 
-                                    gridcolor = 'black'
-                                ) ,
-                        plot_bgcolor = 'white' ,
-                        paper_bgcolor = 'black' ,
-                        font = dict(
-                                    family = 'Futura' ,  # use 'Futura' as closest to AudiType
-                                    size = 12 ,
-                                    color = 'white'
-                                ) ,
-                        width = 600 , 
-                        height = 400        
-)
+# plot 31 (toyota revenue growth)
 
 
 
-# plot 25 (audi revenue growth)
+@register_figure('t_revenue_growth_fig')
+def build_t_revenue_growth_fig() :
 
+    toyota_revenue = load_csv('./data/toyota_revenue.csv')
 
+    # boolean mask for filtering only needed row
 
-# filtering using boolean mask just needed category (revenue growth)
+    growth_t_data = toyota_revenue[toyota_revenue['category'] == 'revenue_growth_(%)']
 
-growth_a_data = audi_revenue[audi_revenue['category'] == 'revenue_growth_(%)']
+    # using melt() to transform the year columns into rows for plotting
 
-#  using melt() to transform the year columns into rows for plotting
+    growth_t_melted = growth_t_data.melt(
+                                        id_vars = 'category' ,              # keeps the 'category' column as is
+                                        var_name = 'year' ,                 # create a column for years
+                                        value_name = '%'                    # create a column for grow % values
+    )
 
-growth_a_melted = growth_a_data.melt(
-                                    id_vars = 'category' ,              # keep the 'category' column as is
-                                    var_name = 'year' ,                 # create a column for years
-                                    value_name = '%'                    # create a column for revenue values
-)
+    t_revenue_growth_fig = px.line(
+                                    growth_t_melted ,
+                                    x = 'year' ,
+                                    y = '%' ,
+                                    title = 'Toyota Revenue Growth (2015-2023)' 
+    ) 
 
-# plot
+    t_revenue_growth_fig.update_traces(
+                                        line_color = '#EB0A1E' ,
+                                        line_width = 4 ,
+                                        mode = 'lines+markers' , 
+                                        marker = dict(size = 10, symbol = 'circle') ,
+                                        hovertemplate = 'Year: %{x}<br>Growth: %{y}'
+    )
 
-a_revenue_growth_fig = px.line (
-                                growth_a_melted ,
-                                x = 'year' ,
-                                y = '%' ,
-                                title = 'Audi Revenue Growth (2015-2023)'
-)
+    t_revenue_growth_fig.update_layout(
+                                        template = 'toyota' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,
+                                                    showgrid = True , 
+                                                    rangeslider = dict(visible = True)
+                                                ) ,
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,
+                                                    showgrid = True , 
+                                                    tickmode = 'linear',                    # set tick mode to linear
+                                                    tick0 = 0,                              # start ticks at 0
+                                                    dtick = 3,                              # step size of 3
+                                                    range = [-16 , 18]
+                                                ) ,
+                                        width = 600 ,
+                                        height = 500
+    )
 
-a_revenue_growth_fig.update_traces(
-                                    line_color = '#F50537' ,
-                                    line_width = 4 ,
-                                    mode = 'lines+markers' , 
-                                    marker = dict(size = 10 , symbol = 'circle') ,
-                                    hovertemplate = 'Year: %{x}<br>Growth: %{y}'
-)
+    return t_revenue_growth_fig
 
-a_revenue_growth_fig.update_layout(
-                                    xaxis = dict(
-                                                 tickformat = '%Y' ,
-                                                 showgrid = True , 
-                                                 gridcolor = 'black' ,
-                                                 rangeslider = dict(visible = True)
-                                            ) ,  
-                                    yaxis = dict(
-                                                 ticksuffix = "%" ,
-                                                 showgrid = True , 
-                                                 gridcolor = 'black' ,
-                                                 tickmode = 'linear' ,  # set tick mode to linear
-                                                 tick0 = 0 ,            # start ticks at 0
-                                                 dtick = 3 ,            # step size of 1
-                                                 range = [-4 , 16]
-                                            ) ,
-                                    plot_bgcolor = 'white' ,
-                                    paper_bgcolor = 'black' ,
-                                    font = dict(
-                                                family = 'Futura' ,     # use 'Futura' as closest to AudiType
-                                                size = 12 ,
-                                                color = 'white'
-                                            ) ,
-                                    width = 600 , 
-                                    height = 400              
-)
 
 
+# plot 32 (volkswagen revenue)
 
-# plot 26 (bmw revenue)
 
 
+@register_figure('v_revenue_fig')
+def build_v_revenue_fig() :
 
-# filtering using boolean mask just needed category (revenue)
+    vw_revenue = load_csv('./data/volkswagen_revenue.csv')
 
-revenue_b_data = bmw_revenue[bmw_revenue['category'] == 'revenue_(euro_billion)']
+    # boolean mask for filtering only needed row
 
-#  using melt() to transform the year columns into rows for plotting
+    revenue_v_data = vw_revenue[vw_revenue['category'] == 'revenue_(euro_billion)']
 
-revenue_b_melted = revenue_b_data.melt(
-                                    id_vars = 'category',       # Keep the 'category' column as is
-                                    var_name = 'year',          # Create a column for years
-                                    value_name = 'revenue'      # Create a column for revenue values
-)
+    # using melt() to transform the year columns into rows for plotting
 
-# plot
+    revenue_v_melted = revenue_v_data.melt(
+                                            id_vars = 'category' ,                      # keeps the 'category' column as is
+                                            var_name = 'year' ,                         # create a column for years
+                                            value_name = 'revenue'                      # create a column for revenue values
+    )
 
-b_revenue_fig = px.line(
-                        revenue_b_melted,
-                        x = 'year' ,                            # years on the x-axis
-                        y = 'revenue' ,                         # revenue on the y-axis
-                        title = 'BMW Revenue (2015-2023)' ,
-)
+    # plotting line plot
 
-b_revenue_fig.update_traces(
-                            line_color = '#007eed' ,
-                            line_width = 4 ,
-                            mode = 'lines+markers' ,
-                            marker = dict(size = 10 , symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Revenue: %{y}'               
-)
+    v_revenue_fig = px.line(
+                            revenue_v_melted ,
+                            x = 'year' ,
+                            y = 'revenue' ,
+                            title = 'Volkswagen Revenue (2015-2023)' 
+    ) 
+
+    # adjusting line
+
+    v_revenue_fig.update_traces(
+                                line_color = '#1F2F57' ,
+                                line_width = 4 ,
+                                mode = 'lines+markers' , 
+                                marker = dict(size = 10, symbol = 'circle') ,
+                                hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
+    )
+
+    v_revenue_fig.update_layout(
+                                template = 'volkswagen' ,
+                                xaxis = dict(
+                                            tickformat = '%Y' ,
+                                            showgrid = True , 
+                                            rangeslider = dict(visible = True)
+                                        ) , 
+                                yaxis = dict(
+                                            tickprefix = '€' ,
+                                            ticksuffix = 'B' ,
+                                            showgrid = True
+                                        ) ,
+                                width = 600 ,
+                                height = 400
+    )
+
+    return v_revenue_fig
 
-b_revenue_fig.update_layout(
-                            xaxis = dict(
-                                        tickformat = '%Y' , 
-                                        showgrid = True, 
-                                        gridcolor = '#6F6F6F' ,
-                                        rangeslider = dict(visible = True)
-                                    ),  
-                            yaxis = dict(
-                                        tickprefix = "€" , 
-                                        ticksuffix = "B" , 
-                                        showgrid = True , 
-                                        gridcolor = '#6F6F6F'
-                                    ) ,
-                            plot_bgcolor = 'white' ,
-                            paper_bgcolor = '#6F6F6F' ,
-                            font = dict(
-                                        family = 'Helvetica' ,  # 'Helvetica' as most close to font used by bmw
-                                        size = 12 ,
-                                        color = 'black'
-                                    ) ,
-                            width = 600 , 
-                            height = 400                
-)
 
 
+# plot 33 (volkswagen revenue growth)
 
-# plot 27 (bmw revenue growth)
 
 
+@register_figure('v_revenue_growth_fig')
+def build_v_revenue_growth_fig() :
 
-# filtering using boolean mask just needed category (revenue growth)
+    vw_revenue = load_csv('./data/volkswagen_revenue.csv')
 
-growth_b_data = bmw_revenue[bmw_revenue['category'] == 'revenue_growth_(%)']
+    # boolean mask for filtering only needed row
 
-#  using melt() to transform the year columns into rows for plotting
+    growth_v_data = vw_revenue[vw_revenue['category'] == 'revenue_growth_(%)']
 
-growth_b_melted = growth_b_data.melt(
-                                    id_vars = 'category' ,       # keep the 'category' column as is
-                                    var_name = 'year' ,          # create a column for years
-                                    value_name = '%'             # create a column for revenue growth values
-)
+    # using melt() to transform the year columns into rows for plotting
 
-# plot
+    growth_v_melted = growth_v_data.melt(
+                                        id_vars = 'category' ,                      # keeps the 'category' column as is
+                                        var_name = 'year' ,                         # create a column for years
+                                        value_name = '%'                            # create a column for grow % values
+    )
 
-b_revenue_growth_fig = px.line(
-                                growth_b_melted ,
-                                x = 'year' ,
-                                y = '%' ,
-                                title = 'BMW Revenue Growth (2015-2023)'
-)
+    # plotting line plot
+
+    v_revenue_growth_fig = px.line(
+                                    growth_v_melted ,
+                                    x = 'year' ,
+                                    y = '%' ,
+                                    title = 'Volkswagen Revenue Growth (2015-2023)' 
+    ) 
+
+    v_revenue_growth_fig.update_traces(
+                                        line_color = '#1F2F57' ,
+                                        line_width = 4 ,
+                                        mode = 'lines+markers' , 
+                                        marker = dict(size = 10, symbol = 'circle') ,
+                                        hovertemplate = 'Year: %{x}<br>Growth: %{y}'
+    )
 
-b_revenue_growth_fig.update_traces(
-                                    line_color = '#007eed' ,
-                                    line_width = 4 ,
-                                    mode = 'lines+markers' ,
-                                    marker = dict(size = 10 , symbol = 'circle') ,
-                                    hovertemplate = 'Year: %{x}<br>Growth: %{y}'
-)
+    # formating ticks
+
+    v_revenue_growth_fig.update_layout(
+                                        template = 'volkswagen' ,
+                                        xaxis = dict(
+                                                    tickformat = '%Y' ,
+                                                    showgrid = True , 
+                                                    rangeslider = dict(visible = True)
+                                                ) , 
+                                        yaxis = dict(
+                                                    ticksuffix = '%' ,
+                                                    showgrid = True , 
+                                                    tickmode = 'linear',                        # set tick mode to linear
+                                                    tick0 = 0,                                  # start ticks at 0
+                                                    dtick = 3,                                  # step size of 3
+                                                    range = [-25 , 18]
+                                                ) ,
+                                        width = 600 ,
+                                        height = 500
+    )
 
-b_revenue_growth_fig.update_layout(
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,
-                                                showgrid = True , 
-                                                gridcolor = '#6F6F6F' ,
-                                                rangeslider = dict(visible = True)
-                                            ) ,  
-                                    yaxis = dict(
-                                                ticksuffix = '%' ,
-                                                showgrid = True , 
-                                                gridcolor = '#6F6F6F' ,
-                                                tickmode = 'linear' ,                   # set tick mode to linear
-                                                tick0 = 0 ,                             # start ticks at 0
-                                                dtick = 3 ,                             # step size of 3
-                                                range = [-12 , 19]
-                                            ) ,
-                                    plot_bgcolor = 'white' ,
-                                    paper_bgcolor = '#6F6F6F' ,
-                                    font = dict(
-                                                family = 'Helvetica' , 
-                                                size = 12 ,
-                                                color = 'black'
-                                            ) ,
-                                    width = 600 ,
-                                    height = 450                 
-)
+    return v_revenue_growth_fig
 
 
 
-# plot 28 (mercedes revenue)
+# plot 34 (audi sales by category)
 
 
 
-# boolean mask for filtering only needed row (revenue)
+@register_figure('a_sales_fig')
+def build_a_sales_fig() :
 
-revenue_m_data = mercedes_revenue[mercedes_revenue['category'] == 'revenue_(euro_billion)']
+    audi_sales = load_csv('./data/audi_sales.csv')
 
-# using melt() to transform the year columns into rows for plotting
+    # transform data into a long format for plotting
 
-revenue_m_melted = revenue_m_data.melt(
-                                        id_vars = 'category' ,          # keeps the 'category' column as is
-                                        var_name = 'year' ,             # create a column for years
-                                        value_name = 'revenue'          # create a column for revenue values
-)
+    audi_sales_long = audi_sales.melt(
+                                    id_vars = 'category' , 
+                                    var_name = 'year' ,
+                                    value_name = 'amount of units sold'
+    )
 
-# plot
+    # create a grouped bar chart
 
-m_revenue_fig = px.line(
-                        revenue_m_melted ,
+    a_sales_fig = px.bar(
+                        audi_sales_long,
                         x = 'year' ,
-                        y = 'revenue' ,
-                        title = 'Mercedes-Benz Revenue (2015-2023)'
-) 
+                        y = 'amount of units sold' ,
+                        color = 'category' ,
+                        title = 'Audi Sales Volume by Category (2015-2023)' ,
+                        color_discrete_map = {
+                                        'Internal Combustion Engine' : '#F50537' ,  
+                                        'Hybrid' : '#A5ACAF' ,  
+                                        'Electric Vehicles' : '#4B4B4B'
+                                            } ,
+                        barmode = 'group'
+    )
 
-m_revenue_fig.update_traces(
-                            line_color = '#231f20' ,
-                            line_width = 4 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10, symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
-)
+    a_sales_fig.update_layout(
+                                template = 'audi' ,
+                                xaxis = dict(
+                                            showgrid = True
+                                        ) ,
+                                yaxis = dict(
+                                            showgrid = True , 
+                                            tickmode = 'linear' ,  # set tick mode to linear
+                                            tick0 = 0 ,            # start ticks at 0
+                                            dtick = 100000
+                                        ) ,
+                                width = 700 , 
+                                height = 500
+    )
 
-m_revenue_fig.update_layout(
-                            xaxis = dict(
-                                        tickformat = '%Y' ,
-                                        showgrid = True , 
-                                        gridcolor = '#dcddd7' ,
-                                        rangeslider = dict(visible = True)
-                                    ) , 
-                            yaxis = dict(
-                                        tickprefix = '€' , 
-                                        ticksuffix = 'B' ,
-                                        showgrid = True , 
-                                        gridcolor = '#dcddd7'
-                                    ) ,
-                            width = 600 ,
-                            height = 400 ,
-                            plot_bgcolor = 'white' ,
-                            paper_bgcolor = '#dcddd7' ,
-                            font = dict(
-                                        family = 'Noto Serif' ,
-                                        size = 12 ,
-                                        color = '#231f20'
-                                    )       
-)
+    a_sales_fig.update_traces(
+                                hovertemplate = 'Year: %{x}<br>Amount: %{y}'
+    )
 
+    return a_sales_fig
 
 
-# plot 29 (mercedes revenue growth)
 
+# plot 35 (bmw sales by category)
 
 
-# boolean mask for filtering only needed row
 
-growth_m_data = mercedes_revenue[mercedes_revenue['category'] == 'revenue_growth_(%)']
+@register_figure('b_sales_fig')
+def build_b_sales_fig() :
 
-# using melt() to transform the year columns into rows for plotting
+    bmw_sales = load_csv('./data/bmw_sales.csv')
 
-growth_m_melted = growth_m_data.melt(
-                                    id_vars = 'category' ,              # keeps the 'category' column as is
-                                    var_name = 'year' ,                 # create a column for years
-                                    value_name = '%'                    # create a column for grow % values
-)
+    # transform data into a long format for plotting
 
-# plotting line plot
+    bmw_sales_long = bmw_sales.melt(
+                                    id_vars = 'category' , 
+                                    var_name = 'year' , 
+                                    value_name = 'amount of units sold'
+    )
 
-m_revenue_growth_fig = px.line(
-                                growth_m_melted ,
-                                x = 'year' ,
-                                y = '%' ,
-                                title = 'Mercedes-Benz Revenue Growth (2015-2023)' 
-) 
+    # grouped bar chart
 
-# adjusting line
+    b_sales_fig = px.bar(
+                        bmw_sales_long ,
+                        x = 'year' ,
+                        y = 'amount of units sold' ,
+                        color = 'category' ,
+                        title = 'BMW Sales Volume by Category (2015-2023)',
+                        color_discrete_map = {
+                                        'Internal Combustion Engine' : '#f40000' ,  
+                                        'Hybrid' : '#522dae' ,  
+                                        'Electric Vehicles' : '#007eed'
+                                        } ,
+                        barmode = 'group'
+    )
 
-m_revenue_growth_fig.update_traces(
-                                    line_color = '#231f20' ,
-                                    line_width = 4 ,
-                                    mode = 'lines+markers' , 
-                                    marker = dict(size = 10, symbol = 'circle') ,
-                                    hovertemplate = 'Year: %{x}<br>Growth: %{y}'
-)
+    # add grid
 
-m_revenue_growth_fig.update_layout(
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,
-                                                showgrid = True , 
-                                                gridcolor = '#dcddd7' ,
-                                                rangeslider = dict(visible = True)
-                                            ) , 
-                                    yaxis = dict(
-                                                ticksuffix = '%' ,
-                                                showgrid = True ,
-                                                gridcolor = '#dcddd7' ,
-                                                tickmode = 'linear',                    # set tick mode to linear
-                                                tick0 = 0,                              # start ticks at 0
-                                                dtick = 3,                              # step size of 3
-                                                range = [-3 , 16]
-                                            ) ,
-                                    width = 600 ,
-                                    height = 400 ,
-                                    plot_bgcolor = 'white' ,
-                                    paper_bgcolor = '#dcddd7' ,
-                                    font = dict(
-                                                family = 'Noto Serif' ,
-                                                size = 12 ,
-                                                color = '#231f20'
-                                            )       
-)
+    b_sales_fig.update_layout(
+                            template = 'bmw' ,
+                            xaxis = dict(
+                                        showgrid = True
+                                    ) ,
+                            yaxis = dict(
+                                        showgrid = True , 
+                                        tickmode ='linear' ,        # set tick mode to linear
+                                        tick0 = 0 ,                 # start ticks at 0
+                                        dtick = 100000
+                                    ) ,
+                            width = 700 , 
+                            height = 500
+    )
 
+    b_sales_fig.update_traces(
+                    hovertemplate = 'Year: %{x}<br>Amount: %{y}'
+    )
 
+    return b_sales_fig
 
-# plot 30 (toyota revenue)
 
 
+# plot 36 (mercedes sales by category)
 
-# boolean mask for filtering only needed row
 
-revenue_t_data = toyota_revenue[toyota_revenue['category'] == 'revenue_(euro_billion)']
 
-# using melt() to transform the year columns into rows for plotting
+@register_figure('m_sales_fig')
+def build_m_sales_fig() :
 
-revenue_t_melted = revenue_t_data.melt(
-                                        id_vars = 'category' ,              # keeps the 'category' column as is
-                                        var_name = 'year' ,                 # create a column for years
-                                        value_name = 'revenue'              # create a column for revenue values
-        )
+    mercedes_sales = load_csv('./data/mercedes_sales.csv')
 
-t_revenue_fig = px.line(
-                        revenue_t_melted ,
-                        x = 'year' ,
-                        y = 'revenue' ,
-                        title = 'Toyota Revenue (2015-2023)' 
-) 
+    # transform data into a long format for plotting
 
-# adjusting line
+    mercedes_sales_long = mercedes_sales.melt(
+                                            id_vars = 'category' , 
+                                            var_name = 'year' , 
+                                            value_name = 'amount of units sold'
+    )
 
-t_revenue_fig.update_traces(
-                            line_color = '#EB0A1E' ,
-                            line_width = 4 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10, symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
-)
+    # grouped bar chart
 
-t_revenue_fig.update_layout(
+    m_sales_fig = px.bar(
+                        mercedes_sales_long ,
+                        x = 'year' ,
+                        y = 'amount of units sold' ,
+                        color = 'category' ,
+                        title = 'Mercedes-Benz Sales Volume by Category (2015-2023)' ,
+                        color_discrete_map = {
+                                            'Internal Combustion Engine': '#231f20' ,  
+                                            'Hybrid': '#697c85' ,  
+                                            'Electric Vehicles': '#7a8084'
+                                            } ,
+                        barmode = 'group'
+    )
+
+    # add grid
+
+    m_sales_fig.update_layout(
+                            template = 'mercedes' ,
                             xaxis = dict(
-                                        tickformat = '%Y' ,
-                                        showgrid = True , 
-                                        gridcolor = 'black' ,
-                                        rangeslider = dict(visible = True)
+                                        showgrid = True
                                     ) , 
                             yaxis = dict(
-                                        tickprefix = '€' , 
-                                        ticksuffix = 'B' ,
                                         showgrid = True , 
-                                        gridcolor = 'black'
+                                        tickmode = 'linear' ,  # set tick mode to linear
+                                        tick0 = 0 ,            # start ticks at 0
+                                        dtick = 100000
                                     ) ,
-                            width = 600 ,
-                            height = 400 ,
-                            plot_bgcolor = 'white' ,
-                            font = dict(
-                                        family = 'Arial' ,
-                                        size = 12 ,
-                                        color = 'black'
-                                    )
-)
+                            width = 700 , 
+                            height = 500
+    )
 
+    m_sales_fig.update_traces(
+                            hovertemplate = 'Year: %{x}<br>Amount: %{y}'
+    )
 
+    return m_sales_fig
 
-# plot 31 (toyota revenue growth)
 
 
+# plot 37 (toyota sales by category)
 
-# boolean mask for filtering only needed row
 
-growth_t_data = toyota_revenue[toyota_revenue['category'] == 'revenue_growth_(%)']
 
-# using melt() to transform the year columns into rows for plotting
+@register_figure('t_sales_fig')
+def build_t_sales_fig() :
 
-growth_t_melted = growth_t_data.melt(
-                                    id_vars = 'category' ,              # keeps the 'category' column as is
-                                    var_name = 'year' ,                 # create a column for years
-                                    value_name = '%'                    # create a column for grow % values
-)
+    toyota_sales = load_csv('./data/toyota_sales.csv')
 
-t_revenue_growth_fig = px.line(
-                                growth_t_melted ,
-                                x = 'year' ,
-                                y = '%' ,
-                                title = 'Toyota Revenue Growth (2015-2023)' 
-) 
+    # transform data into a long format for plotting
 
-t_revenue_growth_fig.update_traces(
-                                    line_color = '#EB0A1E' ,
-                                    line_width = 4 ,
-                                    mode = 'lines+markers' , 
-                                    marker = dict(size = 10, symbol = 'circle') ,
-                                    hovertemplate = 'Year: %{x}<br>Growth: %{y}'
-)
+    toyota_sales_long = toyota_sales.melt(
+                                        id_vars = 'category' , 
+                                        var_name = 'year' , 
+                                        value_name = 'amount of units sold'
+    )
 
-t_revenue_growth_fig.update_layout(
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,
-                                                showgrid = True , 
-                                                gridcolor = 'black' ,
-                                                rangeslider = dict(visible = True)
-                                            ) ,
-                                    yaxis = dict(
-                                                ticksuffix = '%' ,
-                                                showgrid = True , 
-                                                gridcolor = 'black' ,
-                                                tickmode = 'linear',                    # set tick mode to linear
-                                                tick0 = 0,                              # start ticks at 0
-                                                dtick = 3,                              # step size of 3
-                                                range = [-16 , 18]
-                                            ) ,
-                                    width = 600 ,
-                                    height = 500 ,
-                                    plot_bgcolor = 'white' ,
-                                    font = dict(
-                                                family = 'Arial' ,
-                                                size = 12 ,
-                                                color = 'black'
-                                            )
-)
+    # grouped bar chart
 
+    t_sales_fig = px.bar(
+                        toyota_sales_long ,
+                        x = 'year' ,
+                        y = 'amount of units sold' ,
+                        color = 'category' ,
+                        title = 'Toyota Sales Volume by Category (2015-2023)' ,
+                        color_discrete_map = {
+                                        'Internal Combustion Engine': '#EB0A1E' ,  
+                                        'Hybrid': '#58595B' ,  
+                                        'Electric Vehicles': '#000000'
+                                        } ,
+                        barmode = 'group'
+    )
 
+    t_sales_fig.update_layout(
+                            template = 'toyota' ,
+                            xaxis = dict(
+                                        showgrid = True
+                                    ) ,
+                            yaxis = dict(
+                                        showgrid = True , 
+                                        tickmode = 'linear' ,       # set tick mode to linear
+                                        tick0 = 0 ,                 # start ticks at 0
+                                        dtick = 300000
+                                    ) ,
+                            width = 700 , 
+                            height = 600
+    )
 
-# plot 32 (volkswagen revenue)
+    t_sales_fig.update_traces(
+                            hovertemplate = 'Year: %{x}<br>Amount: %{y}'
+    )
 
+    return t_sales_fig
 
 
-# boolean mask for filtering only needed row
 
-revenue_v_data = vw_revenue[vw_revenue['category'] == 'revenue_(euro_billion)']
+# plot 38 (volkswagen sales by category)
 
-# using melt() to transform the year columns into rows for plotting
 
-revenue_v_melted = revenue_v_data.melt(
-                                        id_vars = 'category' ,                      # keeps the 'category' column as is
-                                        var_name = 'year' ,                         # create a column for years
-                                        value_name = 'revenue'                      # create a column for revenue values
-)
 
-# plotting line plot
+@register_figure('v_sales_fig')
+def build_v_sales_fig() :
 
-v_revenue_fig = px.line(
-                        revenue_v_melted ,
-                        x = 'year' ,
-                        y = 'revenue' ,
-                        title = 'Volkswagen Revenue (2015-2023)' 
-) 
+    vw_sales = load_csv('./data/volkswagen_sales.csv')
 
-# adjusting line
+    # transform data into a long format for plotting
 
-v_revenue_fig.update_traces(
-                            line_color = '#1F2F57' ,
-                            line_width = 4 ,
-                            mode = 'lines+markers' , 
-                            marker = dict(size = 10, symbol = 'circle') ,
-                            hovertemplate = 'Year: %{x}<br>Revenue: %{y}'
-)
+    vw_sales_long = vw_sales.melt(
+                                id_vars = 'category' , 
+                                var_name = 'year' , 
+                                value_name = 'amount of units sold'
+    )
+
+    # create a grouped bar chart
+
+    v_sales_fig = px.bar(
+                        vw_sales_long ,
+                        x = 'year' ,
+                        y = 'amount of units sold' ,
+                        color = 'category' ,
+                        title = 'Volkswagen Sales Volume by Category (2015-2023)' ,
+                        color_discrete_map = {
+                                            'Internal Combustion Engine': '#1F2F57',  
+                                            'Hybrid': '#A8A8A8',  
+                                            'Electric Vehicles': '#6091C3'
+                                        } ,
+                        barmode = 'group'
+    )
 
-v_revenue_fig.update_layout(
+    v_sales_fig.update_layout(
+                            template = 'volkswagen' ,
                             xaxis = dict(
-                                        tickformat = '%Y' ,
-                                        showgrid = True , 
-                                        gridcolor = '#A8A8A8' ,
-                                        rangeslider = dict(visible = True)
-                                    ) , 
+                                        showgrid = True
+                                    ) ,
                             yaxis = dict(
-                                        tickprefix = '€' ,
-                                        ticksuffix = 'B' ,
                                         showgrid = True , 
-                                        gridcolor = '#A8A8A8'
+                                        tickmode = 'linear' ,  
+                                        tick0 = 0 ,            
+                                        dtick = 300000 
                                     ) ,
-                            width = 600 ,
-                            height = 400 ,
-                            plot_bgcolor = 'white' ,
-                            paper_bgcolor = '#A8A8A8' ,
-                            font = dict(
-                                        family = 'Arial Rounded MT Bold' ,
-                                        size = 12 ,
-                                        color = 'black'
-                                    )
+                            width = 700 , 
+                            height = 600
+    )
+
+    v_sales_fig.update_traces(
+                            hovertemplate='Year: %{x}<br>Amount: %{y}'
+    )
+
+    return v_sales_fig
+
+
+
+# initialize the Dash app
+
+# responses (callbacks , sections , the page , assets and the dash / plotly.js bundles) are
+# compressed with brotli or gzip (whatever the browser accepts) by flask-compress ; COMPRESS = 0
+# turns it off , e.g. behind a proxy that compresses already
+
+COMPRESS = os.environ.get('COMPRESS' , '1') != '0' and importlib.util.find_spec('flask_compress') is not None
+
+app = Dash(
+        __name__ ,
+        external_stylesheets=["/assets/styles.css?v=1"] ,
+        suppress_callback_exceptions = True ,               # graphs with callbacks only exist inside some sections
+        compress = COMPRESS
 )
 
+# dash only enables gzip ; brotli at a low quality is as fast and ~10 % smaller on the sections
 
+app.server.config.update(COMPRESS_ALGORITHM = ['br' , 'gzip'] , COMPRESS_BR_LEVEL = 4 , COMPRESS_LEVEL = 6)
 
-# plot 33 (volkswagen revenue growth)
+# time every callback request and measure its response ; the callback is named by its output(s)
+# as registered , anything else a client posts is recorded as 'unknown' so the label sets (and the
+# /metrics page) stay bounded ; 204 is dash's answer to PreventUpdate
 
+CALLBACK_STATUSES = {200 , 204 , 400 , 404 , 500}
 
+@app.server.before_request
+def start_request_timer() :
+    g.request_started = time.perf_counter()
 
-# boolean mask for filtering only needed row
 
-growth_v_data = vw_revenue[vw_revenue['category'] == 'revenue_growth_(%)']
+@app.server.after_request
+def record_callback_metrics(response) :
 
-# using melt() to transform the year columns into rows for plotting
+    if request.path.endswith('/_dash-update-component') and 'request_started' in g :
+        payload = request.get_json(silent = True)
+        output = payload.get('output') if isinstance(payload , dict) else None
 
-growth_v_melted = growth_v_data.melt(
-                                    id_vars = 'category' ,                      # keeps the 'category' column as is
-                                    var_name = 'year' ,                         # create a column for years
-                                    value_name = '%'                            # create a column for grow % values
-)
+        labels = {
+                'output' : output if isinstance(output , str) and output in app.callback_map else 'unknown' ,
+                'status' : response.status_code if response.status_code in CALLBACK_STATUSES else 'other'
+        }
 
-# plotting line plot
+        observe('mobility_matrix_callback_seconds' , labels , time.perf_counter() - g.request_started)
+        observe('mobility_matrix_callback_response_bytes' , labels , response.calculate_content_length() or 0)
 
-v_revenue_growth_fig = px.line(
-                                growth_v_melted ,
-                                x = 'year' ,
-                                y = '%' ,
-                                title = 'Volkswagen Revenue Growth (2015-2023)' 
-) 
+    return response
 
-v_revenue_growth_fig.update_traces(
-                                    line_color = '#1F2F57' ,
-                                    line_width = 4 ,
-                                    mode = 'lines+markers' , 
-                                    marker = dict(size = 10, symbol = 'circle') ,
-                                    hovertemplate = 'Year: %{x}<br>Growth: %{y}'
-)
 
-# formating ticks
+@app.server.route('/metrics')
+def serve_metrics() :
+    return Response(metrics_text() , mimetype = 'text/plain; version=0.0.4')
 
-v_revenue_growth_fig.update_layout(
-                                    xaxis = dict(
-                                                tickformat = '%Y' ,
-                                                showgrid = True , 
-                                                gridcolor = '#A8A8A8' ,
-                                                rangeslider = dict(visible = True)
-                                            ) , 
-                                    yaxis = dict(
-                                                ticksuffix = '%' ,
-                                                showgrid = True , 
-                                                gridcolor = '#A8A8A8' ,
-                                                tickmode = 'linear',                        # set tick mode to linear
-                                                tick0 = 0,                                  # start ticks at 0
-                                                dtick = 3,                                  # step size of 3
-                                                range = [-25 , 18]
-                                            ) ,
-                                    width = 600 ,
-                                    height = 500 ,
-                                    plot_bgcolor = 'white' ,
-                                    paper_bgcolor = '#A8A8A8' ,
-                                    font = dict(
-                                                family = 'Arial Rounded MT Bold' ,
-                                                size = 12 ,
-                                                color = 'black'
-                                            )
-)
+# sections of the dropdown navigation
 
+section_options = [
+                    {"label" : "HOME" , "value" : "overview"} ,
+                    {"label" : "AUDI" , "value" : "audi"} ,
+                    {"label" : "BMW" , "value" : "bmw"} ,
+                    {"label" : "MERCEDES-BENZ" , "value" : "mercedes"} ,
+                    {"label" : "TOYOTA" , "value" : "toyota"} ,
+                    {"label" : "VOLKSWAGEN" , "value" : "volkswagen"} ,
+                    {"label" : "Laws & Regulations" , "value" : "laws_regulations"} ,
+                    {"label" : "Charging Points Infrastructure" , "value" : "charging_points"} ,
+                    {"label" : "Gas Stations Infrastructure" , "value" : "gas_stations"} ,
+                    {"label" : "Environmental Impact" , "value" : "environment"}
+]
 
+section_names = [option['value'] for option in section_options] + ['not_found']
 
-# plot 34 (audi sales by category)
+# section switching mode :
+#   'clientside' : every section is mounted in the layout and shown / hidden in the browser ,
+#                  sections without graphs are shipped with the page, sections with graphs are
+#                  fetched from the server the first time they are selected in a session
+#   'server'     : every dropdown change asks the server for the section (display_content)
 
+SECTION_SWITCHING = os.environ.get('SECTION_SWITCHING' , 'clientside')
 
+# sections without graphs, shipped with the page in clientside mode ('not_found' is shown for unknown values)
 
-# transform data into a long format for plotting
+prerendered_sections = ['laws_regulations' , 'environment' , 'not_found']
 
-audi_sales_long = audi_sales.melt(
-                                id_vars = 'category' , 
-                                var_name = 'year' ,
-                                value_name = 'amount of units sold'
-)
 
-# create a grouped bar chart
+def section_containers() :
 
-a_sales_fig = px.bar(
-                    audi_sales_long,
-                    x = 'year' ,
-                    y = 'amount of units sold' ,
-                    color = 'category' ,
-                    title = 'Audi Sales Volume by Category (2015-2023)' ,
-                    color_discrete_map = {
-                                    'Internal Combustion Engine' : '#F50537' ,  
-                                    'Hybrid' : '#A5ACAF' ,  
-                                    'Electric Vehicles' : '#4B4B4B'
-                                        } ,
-                    barmode = 'group'
-)
+    # one (hidden) container per section ; sections with graphs start empty and get a store that
+    # the clientside callback sets when the section is selected for the first time
 
-a_sales_fig.update_layout(
-                            xaxis = dict(
-                                        showgrid = True , 
-                                        gridcolor = 'black'
-                                    ) ,
-                            yaxis = dict(
-                                        showgrid = True , 
-                                        gridcolor = 'black' ,
-                                        tickmode = 'linear' ,  # set tick mode to linear
-                                        tick0 = 0 ,            # start ticks at 0
-                                        dtick = 100000
-                                    ) ,
-                            width = 700 , 
-                            height = 500 ,
-                            plot_bgcolor = 'white' ,
-                            paper_bgcolor = 'black' ,  
-                            font = dict(
-                                        family = 'Futura' ,  
-                                        size = 12 ,
-                                        color = 'white'
-                                    )
-)
+    containers = []
 
-a_sales_fig.update_traces(
-                            hovertemplate = 'Year: %{x}<br>Amount: %{y}'
-)
+    for name in section_names :
 
+        if name in prerendered_sections :
+            containers.append(html.Div(
+                                    serve_section(name) ,
+                                    id = {'type' : 'section' , 'name' : name} ,
+                                    style = {'display' : 'none'}
+            ))
+        else :
+            containers.append(html.Div(
+                                    id = {'type' : 'section' , 'name' : name} ,
+                                    style = {'display' : 'none'}
+            ))
+            containers.append(dcc.Store(id = {'type' : 'section-request' , 'name' : name}))
 
+    return containers
 
-# plot 35 (bmw sales by category)
 
+# define the app layout
 
+def serve_layout() :
 
-# transform data into a long format for plotting
+    return html.Div(
+                    [
 
-bmw_sales_long = bmw_sales.melt(
-                                id_vars = 'category' , 
-                                var_name = 'year' , 
-                                value_name = 'amount of units sold'
-)
+    # dropdown menu for navigation (with custom class)
 
-# grouped bar chart
+    dcc.Dropdown(
+                id = "dropdown" ,
+                options = section_options ,
+                value = "overview" ,                                        # default selection
+                className = "dropdown-small-right" ,                        # apply custom class
+                placeholder = "Select a section..." ,                       # placeholder text
+            ) ,
 
-b_sales_fig = px.bar(
-                    bmw_sales_long ,
-                    x = 'year' ,
-                    y = 'amount of units sold' ,
-                    color = 'category' ,
-                    title = 'BMW Sales Volume by Category (2015-2023)',
-                    color_discrete_map = {
-                                    'Internal Combustion Engine' : '#f40000' ,  
-                                    'Hybrid' : '#522dae' ,  
-                                    'Electric Vehicles' : '#007eed'
-                                    } ,
-                    barmode = 'group'
-)
+    # content container
 
-# add grid
+    html.Div(
+            section_containers() if SECTION_SWITCHING == 'clientside' else None ,
+            id = "tab-content" , 
+            className = "tab-content"
+        )
+    ]
+    )
 
-b_sales_fig.update_layout(
-                        xaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = '#6F6F6F'
-                                ) ,
-                        yaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = '#6F6F6F' ,
-                                    tickmode ='linear' ,        # set tick mode to linear
-                                    tick0 = 0 ,                 # start ticks at 0
-                                    dtick = 100000
-                                ) ,
-                        width = 700 , 
-                        height = 500 ,
-                        plot_bgcolor = 'white' ,
-                        paper_bgcolor = '#6F6F6F' ,
-                        font = dict(
-                                    family = 'Helvetica' ,  
-                                    size = 12 ,
-                                    color = 'black'
-                                )
-)
+app.layout = serve_layout
 
-b_sales_fig.update_traces(
-                hovertemplate = 'Year: %{x}<br>Amount: %{y}'
-)
+# section cache
 
+# the layout of a section only depends on the selected dropdown value (and the figures in it) ,
+# so every section is rendered and serialized once and then served from a bounded lru cache ;
+# an entry is re-rendered when one of its figures was rebuilt after the entry was cached
+# entries keep only the json bytes : one flat object that serving does not walk , so after a
+# preload (see preload()) the forked workers keep sharing it with the master
 
+SECTION_CACHE_SIZE = int(os.environ.get('SECTION_CACHE_SIZE' , 32))
 
-# plot 36 (mercedes sales by category)
+section_cache = OrderedDict()           # selected tab -> (versions of the figures used , json bytes , etag)
+section_cache_stats = {'hits' : 0 , 'misses' : 0 , 'evictions' : 0}
+section_cache_lock = threading.Lock()
 
 
+def section_layout(selected_tab) :
 
-# transform data into a long format for plotting
+    with section_cache_lock :
+        entry = section_cache.get(selected_tab)
 
-mercedes_sales_long = mercedes_sales.melt(
-                                        id_vars = 'category' , 
-                                        var_name = 'year' , 
-                                        value_name = 'amount of units sold'
-)
+        if entry is not None and all(figure_versions.get(name) == version for name , version in entry[0].items()) :
+            section_cache.move_to_end(selected_tab)
+            section_cache_stats['hits'] += 1
+            return entry[1:]
 
-# grouped bar chart
+        section_cache_stats['misses'] += 1
 
-m_sales_fig = px.bar(
-                    mercedes_sales_long ,
-                    x = 'year' ,
-                    y = 'amount of units sold' ,
-                    color = 'category' ,
-                    title = 'Mercedes-Benz Sales Volume by Category (2015-2023)' ,
-                    color_discrete_map = {
-                                        'Internal Combustion Engine': '#231f20' ,  
-                                        'Hybrid': '#697c85' ,  
-                                        'Electric Vehicles': '#7a8084'
-                                        } ,
-                    barmode = 'group'
-)
+    # render outside the lock, a first render may have to build heavy figures
 
-# add grid
-
-m_sales_fig.update_layout(
-                        xaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = '#dcddd7'
-                                ) , 
-                        yaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = '#dcddd7' ,
-                                    tickmode = 'linear' ,  # set tick mode to linear
-                                    tick0 = 0 ,            # start ticks at 0
-                                    dtick = 100000
-                                ) ,
-                        width = 700 , 
-                        height = 500 ,
-                        plot_bgcolor = 'white' ,
-                        paper_bgcolor = '#dcddd7' ,
-                        font = dict(
-                                    family = 'Noto Serif' ,
-                                    size = 12 ,
-                                    color = '#231f20'
-                                )
-)
+    rendering.figures = []
 
-m_sales_fig.update_traces(
-                        hovertemplate = 'Year: %{x}<br>Amount: %{y}'
-)
+    try :
+        layout = render_section(selected_tab)
+        versions = {name : figure_versions[name] for name in rendering.figures}
+    finally :
+        rendering.figures = None
 
+    layout_json = dumps_json(layout).encode()
 
+    # the json is deterministic for the same figures , so its hash identifies the section for http caching
 
-# plot 37 (toyota sales by category)
+    etag = hashlib.sha256(layout_json).hexdigest()[:20]
 
+    # remember which figures the section includes and how much each of them adds to the payload
 
+    if versions :
+        with metrics_lock :
+            section_figure_bytes[selected_tab] = {name : len(to_json_plotly(figures[name]).encode()) for name in versions}
 
-# transform data into a long format for plotting
+    with section_cache_lock :
+        section_cache[selected_tab] = (versions , layout_json , etag)
+        section_cache.move_to_end(selected_tab)
 
-toyota_sales_long = toyota_sales.melt(
-                                    id_vars = 'category' , 
-                                    var_name = 'year' , 
-                                    value_name = 'amount of units sold'
-)
+        while len(section_cache) > SECTION_CACHE_SIZE :
+            section_cache.popitem(last = False)
+            section_cache_stats['evictions'] += 1
 
-# grouped bar chart
+    return layout_json , etag
 
-t_sales_fig = px.bar(
-                    toyota_sales_long ,
-                    x = 'year' ,
-                    y = 'amount of units sold' ,
-                    color = 'category' ,
-                    title = 'Toyota Sales Volume by Category (2015-2023)' ,
-                    color_discrete_map = {
-                                    'Internal Combustion Engine': '#EB0A1E' ,  
-                                    'Hybrid': '#58595B' ,  
-                                    'Electric Vehicles': '#000000'
-                                    } ,
-                    barmode = 'group'
-)
 
-t_sales_fig.update_layout(
-                        xaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = 'black'
-                                ) ,
-                        yaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = 'black' ,
-                                    tickmode = 'linear' ,       # set tick mode to linear
-                                    tick0 = 0 ,                 # start ticks at 0
-                                    dtick = 300000
-                                ) ,
-                        width = 700 , 
-                        height = 600 ,
-                        plot_bgcolor = 'white' ,
-                        paper_bgcolor = 'white' ,
-                        font = dict(
-                                    family = 'Arial' ,
-                                    size = 12 ,
-                                    color = 'black'
-                                )   
-)
+def serve_section(selected_tab) :
 
-t_sales_fig.update_traces(
-                        hovertemplate = 'Year: %{x}<br>Amount: %{y}'
-)
+    started = time.perf_counter()
 
+    # any other dropdown value renders the not found page , mapped before the lru cache so arbitrary
+    # values can neither flood it nor the metric labels
 
+    section = selected_tab if selected_tab in section_names else 'not_found'
+    layout_json , etag = section_layout(section)
 
-# plot 38 (volkswagen sales by category)
+    # plain dicts parsed from the cached json (a fraction of a millisecond) , dash sends them as
+    # they are without walking the components again
 
+    serialized = json_loads(layout_json)
 
+    observe('mobility_matrix_section_seconds' , {'section' : section} , time.perf_counter() - started)
+    observe('mobility_matrix_section_response_bytes' , {'section' : section} , len(layout_json))
 
-# transform data into a long format for plotting
+    return serialized
 
-vw_sales_long = vw_sales.melt(
-                            id_vars = 'category' , 
-                            var_name = 'year' , 
-                            value_name = 'amount of units sold'
-)
 
-# create a grouped bar chart
+# sections as plain GET requests (clientside mode) : callback responses are POSTs, which the
+# browser never caches ; here every section carries its etag and is revalidated on every visit ,
+# an unchanged section costs a 304 without a body instead of the whole layout
 
-v_sales_fig = px.bar(
-                    vw_sales_long ,
-                    x = 'year' ,
-                    y = 'amount of units sold' ,
-                    color = 'category' ,
-                    title = 'Volkswagen Sales Volume by Category (2015-2023)' ,
-                    color_discrete_map = {
-                                        'Internal Combustion Engine': '#1F2F57',  
-                                        'Hybrid': '#A8A8A8',  
-                                        'Electric Vehicles': '#6091C3'
-                                    } ,
-                    barmode = 'group'
-)
+SECTIONS_PATH = '_sections/'
 
-v_sales_fig.update_layout(
-                        xaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor='#A8A8A8'
-                                ) ,
-                        yaxis = dict(
-                                    showgrid = True , 
-                                    gridcolor = '#A8A8A8' ,
-                                    tickmode = 'linear' ,  
-                                    tick0 = 0 ,            
-                                    dtick = 300000 
-                                ) ,
-                        width = 700 , 
-                        height = 600 ,
-                        plot_bgcolor = 'white' ,
-                        paper_bgcolor = '#A8A8A8' ,
-                        font = dict(
-                                    family = 'Arial Rounded MT Bold' ,
-                                    size = 12 ,
-                                    color = 'black'
-                                )
-)
 
-v_sales_fig.update_traces(
-                        hovertemplate='Year: %{x}<br>Amount: %{y}'
-)
+@app.server.route(app.config.routes_pathname_prefix + SECTIONS_PATH + '<name>')
+def serve_section_json(name) :
 
+    started = time.perf_counter()
+    section = name if name in section_names else 'not_found'
+    layout_json , etag = section_layout(section)
 
+    # flask-compress appends the encoding to the etag ("<etag>:br") , the browser sends it back so
 
-# initialize the Dash app
+    known = next((tag for tag in request.if_none_match.as_set(include_weak = True) if tag.split(':')[0] == etag) , None)
 
-app = Dash(__name__ , external_stylesheets=["/assets/styles.css?v=1"])
+    if known is not None :
+        response = Response(status = 304)
+        response.set_etag(known)
+    else :
+        response = Response(layout_json , mimetype = 'application/json')
+        response.set_etag(etag)
 
-# define the app layout
+    response.headers['Cache-Control'] = 'no-cache'
 
-app.layout = html.Div(
-                    [
+    observe('mobility_matrix_section_seconds' , {'section' : section} , time.perf_counter() - started)
+    observe('mobility_matrix_section_response_bytes' , {'section' : section} , 0 if known is not None else len(layout_json))
 
-    # dropdown menu for navigation (with custom class)
+    return response
 
-    dcc.Dropdown(
-                id = "dropdown" ,
-                options = [
-                            {"label" : "HOME" , "value" : "overview"} ,
-                            {"label" : "AUDI" , "value" : "audi"} ,
-                            {"label" : "BMW" , "value" : "bmw"} ,
-                            {"label" : "MERCEDES-BENZ" , "value" : "mercedes"} ,
-                            {"label" : "TOYOTA" , "value" : "toyota"} ,
-                            {"label" : "VOLKSWAGEN" , "value" : "volkswagen"} ,
-                            {"label" : "Laws & Regulations" , "value" : "laws_regulations"} ,
-                            {"label" : "Charging Points Infrastructure" , "value" : "charging_points"} ,
-                            {"label" : "Gas Stations Infrastructure" , "value" : "gas_stations"} ,
-                            {"label" : "Environmental Impact" , "value" : "environment"}
-                        ] ,
-                value = "overview" ,                                        # default selection
-                className = "dropdown-small-right" ,                        # apply custom class
-                placeholder = "Select a section..." ,                       # placeholder text
-            ) ,
 
-    # content container
+# callback to dynamically update content (server mode)
 
-    html.Div(
-            id = "tab-content" , 
-            className = "tab-content"
-        )
-    ]
+def display_content(selected_tab) :
+    return serve_section(selected_tab)
+
+
+if SECTION_SWITCHING == 'clientside' :
+
+    # show the selected section and hide all others without a server round trip ;
+    # a section with graphs is requested from the server only on its first visit
+
+    app.clientside_callback(
+        """
+        function (selectedTab , requested , sectionIds , requestIds) {
+            const names = sectionIds.map(id => id.name);
+            const shown = names.includes(selectedTab) ? selectedTab : 'not_found';
+            const noUpdate = window.dash_clientside.no_update;
+
+            return [
+                sectionIds.map(id => id.name === shown ? {} : {'display' : 'none'}) ,
+                requestIds.map((id , i) => id.name === shown && !requested[i] ? true : noUpdate)
+            ];
+        }
+        """ ,
+        Output({'type' : 'section' , 'name' : ALL} , 'style') ,
+        Output({'type' : 'section-request' , 'name' : ALL} , 'data') ,
+        Input("dropdown" , "value") ,
+        State({'type' : 'section-request' , 'name' : ALL} , 'data') ,
+        State({'type' : 'section' , 'name' : ALL} , 'id') ,
+        State({'type' : 'section-request' , 'name' : ALL} , 'id')
+    )
+
+    # load a section with graphs the first time it is selected : a GET of serve_section_json ,
+    # the browser cache keeps the section and revalidates it with its etag (304 if unchanged)
+
+    app.clientside_callback(
+        """
+        async function (requested , id) {
+            const response = await fetch('%s' + encodeURIComponent(id.name));
+
+            if (!response.ok) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+
+            return await response.json();
+        }
+        """ % (app.config.requests_pathname_prefix + SECTIONS_PATH) ,
+        Output({'type' : 'section' , 'name' : MATCH} , 'children') ,
+        Input({'type' : 'section-request' , 'name' : MATCH} , 'data') ,
+        State({'type' : 'section' , 'name' : MATCH} , 'id') ,
+        prevent_initial_call = True
     )
 
-# callback to dynamically update content
+else :
 
-@app.callback(
-            Output("tab-content" , "children") ,
-            Input("dropdown" , "value")
-)
+    app.callback(
+                Output("tab-content" , "children") ,
+                Input("dropdown" , "value")
+    )(display_content)
 
-def display_content(selected_tab) :
+
+def render_section(selected_tab) :
 
     content = html.Div(
                     [
@@ -3011,7 +4718,7 @@ def display_content(selected_tab) :
                             html.Div(
                                 [
                                     dcc.Graph(
-                                            figure = car_sales_fig , 
+                                            figure = get_figure('car_sales_fig') , 
                                             id = 'car_sales_fig' , 
                                             className = "car-sales-graph"
                                         ) ,
@@ -3065,7 +4772,7 @@ def display_content(selected_tab) :
         
 
                                     dcc.Graph(
-                                            figure = global_market_share_fig , 
+                                            figure = get_figure('global_market_share_fig') , 
                                             id = 'global_market_share_fig' ,
                                             className = "global-market-graph"
                                         ) ,
@@ -3074,13 +4781,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                    figure = us_market_share_fig , 
+                                                    figure = get_figure('us_market_share_fig') , 
                                                     id = 'us_market_share_fig' ,
                                                     className = "us-market-graph"
                                                 ) ,
                                                 
                                             dcc.Graph(
-                                                    figure = europe_market_share_fig , 
+                                                    figure = get_figure('europe_market_share_fig') , 
                                                     id = 'europe_market_share_fig' ,
                                                     className = "europe-market-graph"
                                                 )
@@ -3115,37 +4822,37 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                    figure = big_three_sales_fig ,
+                                                    figure = get_figure('big_three_sales_fig') ,
                                                     id = "big_three_sales_fig" ,
                                                     className = "gbt-sales-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = sales_tv_fig ,
+                                                    figure = get_figure('sales_tv_fig') ,
                                                     id = "sales_tv_fig" ,
                                                     className = "tv-sales-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = revenue_bg3_fig ,
+                                                    figure = get_figure('revenue_bg3_fig') ,
                                                     id = "revenue_bg3_fig" ,
                                                     className = "r-bgt-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = revenue_tv_fig ,
+                                                    figure = get_figure('revenue_tv_fig') ,
                                                     id = "revenue_tv_fig" ,
                                                     className = "r-tv-graph"
                                             ) ,
                                             
                                             dcc.Graph(
-                                                    figure = revenue_growth_bg3_fig ,
+                                                    figure = get_figure('revenue_growth_bg3_fig') ,
                                                     id = "revenue_growth_bg3_fig" ,
                                                     className = "rg-bgt-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = revenue_growth_tv_fig ,
+                                                    figure = get_figure('revenue_growth_tv_fig') ,
                                                     id = "revenue_growth_tv_fig" ,
                                                     className = "rg-tv-graph"
                                             ) 
@@ -3192,7 +4899,7 @@ def display_content(selected_tab) :
                                             ) ,    
 
                                             dcc.Graph(
-                                                    figure = total_reg_fig ,
+                                                    figure = get_figure('total_reg_fig') ,
                                                     id = "total_reg_fig" ,
                                                     className = "total-reg-graph"
                                             ) 
@@ -3201,8 +4908,16 @@ def display_content(selected_tab) :
                                         className = "text-graph-wrapper" ,
                                     ) ,
 
+                                    # models of the brand clicked on in total_reg_fig (hidden until a click)
+
+                                    dcc.Graph(
+                                            id = "total_reg_models_fig" ,
+                                            className = "reg-models-graph" ,
+                                            style = {'display' : 'none'}
+                                    ) ,
+
                                     dcc.Graph(
-                                            figure = diesel_reg_fig ,
+                                            figure = get_figure('diesel_reg_fig') ,
                                             id = "diesel_reg_fig" ,
                                             className = "diesel-reg-graph"
                                     ) ,
@@ -3210,13 +4925,13 @@ def display_content(selected_tab) :
                                     html.Div(
                                         [
                                             dcc.Graph(
-                                                    figure = hybrid_reg_fig ,
+                                                    figure = get_figure('hybrid_reg_fig') ,
                                                     id = "hybrid_reg_fig" ,
                                                     className = "hybrid-reg-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = ev_reg_fig ,
+                                                    figure = get_figure('ev_reg_fig') ,
                                                     id = "ev_reg_fig" ,
                                                     className = "ev-reg-graph"
                                             )
@@ -3243,13 +4958,13 @@ def display_content(selected_tab) :
                                                 [
 
                                                     dcc.Graph(
-                                                            figure = energy_prices_fig ,
+                                                            figure = get_figure('energy_prices_fig') ,
                                                             id = "energy_prices_fig" ,
                                                             className = "en-pr-graph"
                                                     ) ,
 
                                                     dcc.Graph(
-                                                            figure = energy_change_p_fig ,
+                                                            figure = get_figure('energy_change_p_fig') ,
                                                             id = "energy_change_p_fig" ,
                                                             className = "en-change-p-graph"
                                                     )
@@ -3322,16 +5037,42 @@ def display_content(selected_tab) :
 
                                     ) ,
 
+                                    # points or density view of the charging points map
+
+                                    dcc.RadioItems(
+                                                id = "charging_points_map_mode" ,
+                                                options = [
+                                                            {"label" : "Charging points" , "value" : "points"} ,
+                                                            {"label" : "Density" , "value" : "density"}
+                                                ] ,
+                                                value = "points" ,
+                                                inline = True ,
+                                                className = "map-mode-selector"
+                                    ) ,
+
+                                    # the density view shows the network as it was at the end of the year
+
+                                    dcc.Slider(
+                                            id = "charging_points_map_year" ,
+                                            min = charging_point_years()[0] ,
+                                            max = charging_point_years()[-1] ,
+                                            step = 1 ,
+                                            value = charging_point_years()[-1] ,
+                                            marks = {year : str(year) for year in charging_point_years()} ,
+                                            disabled = True ,
+                                            className = "map-year-slider"
+                                    ) ,
+
                                     html.Div(
                                         [
                                             dcc.Graph(
-                                                    figure = charging_points_map_fig ,
+                                                    figure = get_figure('charging_points_map_fig') ,
                                                     id = "charging_points_map_fig" ,
                                                     className = "charging-map"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = top5_gas_st_fig ,
+                                                    figure = get_figure('top5_gas_st_fig') ,
                                                     id = "top5_gas_st_fig" ,
                                                     className = "gas-station-map"
                                             ) ,
@@ -3342,6 +5083,12 @@ def display_content(selected_tab) :
 
                                     ) ,
 
+                                    html.P(
+                                        "Click on the charging points map to find the nearest charging points." ,
+                                        id = "charging_points_nearest" ,
+                                        className = "charging-nearest-text"
+                                    ) ,
+
                                     html.Div(
                                         [
 
@@ -3363,7 +5110,7 @@ def display_content(selected_tab) :
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = total_cp_fs_fig ,
+                                                    figure = get_figure('total_cp_fs_fig') ,
                                                     id = "total_cp_fs_fig" ,
                                                     className = "total-cp-fs-graph"
                                             ) ,
@@ -3378,13 +5125,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                    figure = nlp_fig ,
+                                                    figure = get_figure('nlp_fig') ,
                                                     id = "nlp_fig" ,
                                                     className = "nlp-graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                    figure = slp_fig ,
+                                                    figure = get_figure('slp_fig') ,
                                                     id = "slp_fig" ,
                                                     className = "slp-graph"
                                             ) 
@@ -3421,8 +5168,18 @@ def display_content(selected_tab) :
 
                                     ) ,
 
+                                    # forecast model of the prediction graph
+
+                                    dcc.RadioItems(
+                                                id = "ttcp_model" ,
+                                                options = [{"label" : forecast_model['label'] , "value" : name} for name , forecast_model in forecast_models.items()] ,
+                                                value = DEFAULT_FORECAST_MODEL ,
+                                                inline = True ,
+                                                className = "forecast-model-selector"
+                                    ) ,
+
                                     dcc.Graph(
-                                            figure = ttcp_fig ,
+                                            figure = get_figure(f'ttcp_{DEFAULT_FORECAST_MODEL}_fig') ,
                                             id = "ttcp_fig" ,
                                             className = 'predict-graph'
                                     )
@@ -3536,13 +5293,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                figure = a_revenue_fig ,
+                                                figure = get_figure('a_revenue_fig') ,
                                                 id = "a_revenue_fig" ,
                                                 className = "a_revenue_graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                figure = a_revenue_growth_fig ,
+                                                figure = get_figure('a_revenue_growth_fig') ,
                                                 id = "a_revenue_growth_fig" ,
                                                 className = "a_revenue_growth_graph"
                                             )
@@ -3620,7 +5377,7 @@ def display_content(selected_tab) :
                                     ) ,
 
                                     dcc.Graph(
-                                        figure = a_sales_fig ,
+                                        figure = get_figure('a_sales_fig') ,
                                         id = "a_sales_fig" ,
                                         className = "a_sales_graph"
                                     )
@@ -3736,13 +5493,13 @@ def display_content(selected_tab) :
                                     html.Div(
                                         [
                                             dcc.Graph(
-                                                figure = b_revenue_fig ,
+                                                figure = get_figure('b_revenue_fig') ,
                                                 id = "b_revenue_fig" ,
                                                 className = "b_revenue_graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                figure = b_revenue_growth_fig ,
+                                                figure = get_figure('b_revenue_growth_fig') ,
                                                 id = "b_revenue_growth_fig" ,
                                                 className = "b_revenue_growth_graph"
                                             )
@@ -3815,7 +5572,7 @@ def display_content(selected_tab) :
                                     ) ,
 
                                     dcc.Graph(
-                                        figure = b_sales_fig ,
+                                        figure = get_figure('b_sales_fig') ,
                                         id = "b_sales_fig" ,
                                         className = "b_sales_graph"
                                     )
@@ -3937,13 +5694,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                figure = m_revenue_fig ,
+                                                figure = get_figure('m_revenue_fig') ,
                                                 id = "m_revenue_fig" ,
                                                 className = "m_revenue_graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                figure = m_revenue_growth_fig ,
+                                                figure = get_figure('m_revenue_growth_fig') ,
                                                 id = "m_revenue_growth_fig" ,
                                                 className = "m_revenue_growth_graph"
                                             ) 
@@ -4017,7 +5774,7 @@ def display_content(selected_tab) :
                                     ) ,
 
                                     dcc.Graph(
-                                        figure = m_sales_fig ,
+                                        figure = get_figure('m_sales_fig') ,
                                         id = "m_sales_fig" ,
                                         className = "m_sales_graph"
                                     )
@@ -4137,13 +5894,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                figure = t_revenue_fig ,
+                                                figure = get_figure('t_revenue_fig') ,
                                                 id = "t_revenue_fig" ,
                                                 className = "t_revenue_graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                figure = t_revenue_growth_fig ,
+                                                figure = get_figure('t_revenue_growth_fig') ,
                                                 id = "t_revenue_growth_fig" ,
                                                 className = "t_revenue_growth_graph"
                                             )
@@ -4220,7 +5977,7 @@ def display_content(selected_tab) :
                                     ) ,
 
                                     dcc.Graph(
-                                        figure = t_sales_fig ,
+                                        figure = get_figure('t_sales_fig') ,
                                         id = "t_sales_fig" ,
                                         className = "t_sales_graph"
                                     )
@@ -4342,13 +6099,13 @@ def display_content(selected_tab) :
                                         [
 
                                             dcc.Graph(
-                                                figure = v_revenue_fig ,
+                                                figure = get_figure('v_revenue_fig') ,
                                                 id = "v_revenue_fig" ,
                                                 className = "v_revenue_graph"
                                             ) ,
 
                                             dcc.Graph(
-                                                figure = v_revenue_growth_fig ,
+                                                figure = get_figure('v_revenue_growth_fig') ,
                                                 id = "v_revenue_growth_fig" ,
                                                 className = "v_revenue_growth_graph"
                                             )
@@ -4424,7 +6181,7 @@ def display_content(selected_tab) :
                                     ) ,
 
                                     dcc.Graph(
-                                        figure = v_sales_fig ,
+                                        figure = get_figure('v_sales_fig') ,
                                         id = "v_sales_fig" ,
                                         className = "v_sales_graph"
                                     )
@@ -4460,25 +6217,133 @@ def display_content(selected_tab) :
                         [
 
                             html.P(
-                                "Coming Soon..." ,
-                                className = "coming-soon"
+                                "Growth of the charging points network" ,
+                                className = "prediction-h"
+                            ) ,
+
+                            # year slider with play button ; the store remembers the year shown and the
+                            # last year whose points were already sent to the browser
+
+                            html.Div(
+                                [
+                                    html.Button(
+                                        "Play" ,
+                                        id = "charging_points_growth_play" ,
+                                        className = "growth-play-button"
+                                    ) ,
+
+                                    dcc.Slider(
+                                            id = "charging_points_growth_year" ,
+                                            min = charging_point_years()[0] ,
+                                            max = charging_point_years()[-1] ,
+                                            step = 1 ,
+                                            value = charging_point_years()[0] ,
+                                            marks = {year : str(year) for year in charging_point_years()} ,
+                                            className = "growth-slider"
+                                    ) ,
+
+                                ] ,
+
+                                className = "growth-controls"
+                            ) ,
+
+                            dcc.Interval(
+                                        id = "charging_points_growth_timer" ,
+                                        interval = 1000 ,
+                                        disabled = True
+                            ) ,
+
+                            dcc.Store(
+                                    id = "charging_points_growth_state" ,
+                                    data = {'shown' : charging_point_years()[0] , 'loaded' : charging_point_years()[0]}
+                            ) ,
+
+                            dcc.Graph(
+                                    figure = get_figure('charging_points_growth_fig') ,
+                                    id = "charging_points_growth_fig" ,
+                                    className = "growth-map"
+                            ) ,
+
+
+                            html.P(
+                                "Prediction of amount of charging points per federal state by 2035" ,
+                                className = "prediction-h"
+                            ) ,
+
+                            dcc.Graph(
+                                    figure = get_figure('cp_forecast_fs_fig') ,
+                                    id = "cp_forecast_fs_fig" ,
+                                    className = "cp-forecast-fs-graph"
                             )
 
-                        ]
+                        ] ,
+
+                            className = "charging-points-page"
 
                     )
         
     elif selected_tab == "gas_stations" :
 
+        coverage_rows , coverage_columns = coverage_table(COVERAGE_RADIUS_KM , 'bundesland')
+
         content = html.Div(
                         [
 
                             html.P(
-                                "Coming Soon..." ,
-                                className = "coming-soon"
+                                "Charging points near gas stations" ,
+                                className = "prediction-h"
+                            ) ,
+
+                            html.P(
+                                "Share of the top 5 brand gas stations with a public charging point within the selected distance, "
+                                "at the end of every year." ,
+                                className = "coverage-text"
+                            ) ,
+
+                            html.Div(
+                                [
+                                    dcc.RadioItems(
+                                                id = "coverage_radius" ,
+                                                options = [{"label" : f"{radius} km" , "value" : radius} for radius in COVERAGE_RADII_KM] ,
+                                                value = COVERAGE_RADIUS_KM ,
+                                                inline = True ,
+                                                className = "coverage-selector"
+                                    ) ,
+
+                                    dcc.RadioItems(
+                                                id = "coverage_group" ,
+                                                options = [{"label" : label , "value" : group} for group , label in coverage_groups.items()] ,
+                                                value = 'bundesland' ,
+                                                inline = True ,
+                                                className = "coverage-selector"
+                                    ) ,
+
+                                ] ,
+
+                                className = "coverage-controls"
+                            ) ,
+
+                            dash_table.DataTable(
+                                            id = "coverage_table" ,
+                                            data = coverage_rows ,
+                                            columns = coverage_columns ,
+                                            sort_action = 'native' ,
+                                            page_size = 17 ,
+                                            style_table = {'overflowX' : 'auto' , 'maxWidth' : '1000px'} ,
+                                            style_header = {'backgroundColor' : '#34495E' , 'color' : '#FFC300' , 'fontWeight' : 'bold'} ,
+                                            style_cell = {'backgroundColor' : '#2C3E50' , 'color' : '#ECF0F1' , 'fontFamily' : 'PT Sans Narrow' , 'padding' : '6px'}
+                            ) ,
+
+                            dcc.Graph(
+                                    figure = get_figure('coverage_gap_fig') ,
+                                    id = "coverage_gap_fig" ,
+                                    className = "coverage-map"
                             )
 
-                        ]
+                        ] ,
+
+                            className = "gas-stations-page"
+
                     )
         
     elif selected_tab == "environment" :
@@ -4496,9 +6361,434 @@ def display_content(selected_tab) :
         
     return content
 
+# callback to send only the charging point clusters of the current zoom and viewport ,
+# or the density grid in density mode
+
+@app.callback(
+            Output("charging_points_map_fig" , "figure") ,
+            Input("charging_points_map_fig" , "relayoutData") ,
+            Input("charging_points_map_mode" , "value") ,
+            Input("charging_points_map_year" , "value") ,
+            prevent_initial_call = True
+)
+
+def update_charging_points_map(relayout_data , mode , year) :
+
+    relayout_data = relayout_data or {}
+    zoom = relayout_data.get('mapbox.zoom')
+    patched_figure = Patch()
+
+    # the points view always shows every year ; a year the data does not have means all years
+
+    if ctx.triggered_id == "charging_points_map_year" and mode != "density" :
+        raise PreventUpdate
+
+    year = year if year in charging_point_years() else None
+
+    if ctx.triggered_id in ("charging_points_map_mode" , "charging_points_map_year") :
+
+        # a mode or year switch redraws the last known view
+
+        zoom = CHARGING_POINTS_MAP_ZOOM if zoom is None else zoom
+
+    else :
+
+        # only pan / zoom events carry the mapbox view (ignore e.g. autosize or legend clicks)
+
+        if zoom is None :
+            raise PreventUpdate
+
+        # the density grid is already in the browser, only its radius follows the zoom
+
+        if mode == "density" :
+            patched_figure['data'][0]['radius'] = density_radius(zoom)
+            return patched_figure
+
+    # replace just the traces, the layout (and with uirevision the current view) stays as it is
+
+    if mode == "density" :
+        patched_figure['data'] = [compact_trace(charging_points_density_trace(zoom , year))]
+    else :
+        patched_figure['data'] = [compact_trace(trace) for trace in charging_points_map_traces(zoom , view_bounds(relayout_data))]
+
+    return patched_figure
+
+# the year slider only applies to the density view
+
+app.clientside_callback(
+    """
+    function (mode) {
+        return mode !== 'density';
+    }
+    """ ,
+    Output("charging_points_map_year" , "disabled") ,
+    Input("charging_points_map_mode" , "value")
+)
+
+# callback to send only the gas station clusters of the current zoom and viewport
+
+@app.callback(
+            Output("top5_gas_st_fig" , "figure") ,
+            Input("top5_gas_st_fig" , "relayoutData") ,
+            prevent_initial_call = True
+)
+
+def update_gas_station_map(relayout_data) :
+
+    if not relayout_data or 'mapbox.zoom' not in relayout_data :
+        raise PreventUpdate
+
+    patched_figure = Patch()
+    patched_figure['data'] = [compact_trace(trace) for trace in gas_station_map_traces(relayout_data['mapbox.zoom'] , view_bounds(relayout_data))]
+
+    return patched_figure
+
+# callback to update the coverage table (and the gap map when the distance changes)
+
+@app.callback(
+            Output("coverage_table" , "data") ,
+            Output("coverage_table" , "columns") ,
+            Output("coverage_gap_fig" , "figure") ,
+            Input("coverage_radius" , "value") ,
+            Input("coverage_group" , "value") ,
+            prevent_initial_call = True
+)
+
+def update_coverage(radius_km , group) :
+
+    if radius_km not in COVERAGE_RADII_KM or group not in coverage_groups :
+        raise PreventUpdate
+
+    rows , columns = coverage_table(radius_km , group)
+
+    if ctx.triggered_id != "coverage_radius" :
+        return rows , columns , dash.no_update
+
+    patched_figure = Patch()
+    patched_figure['data'] = [compact_trace(coverage_gap_trace(radius_km))]
+
+    return rows , columns , patched_figure
+
+# callback to show the models of the brand clicked on in the total registrations plot
+
+@app.callback(
+            Output("total_reg_models_fig" , "figure") ,
+            Output("total_reg_models_fig" , "style") ,
+            Input("total_reg_fig" , "clickData") ,
+            prevent_initial_call = True
+)
+
+def show_brand_models(click_data) :
+
+    if not click_data or not click_data.get('points') :
+        raise PreventUpdate
+
+    brand = (click_data['points'][0].get('customdata') or [None])[0]
+
+    if ('total' , brand) not in registration_model_index()[0] :
+        raise PreventUpdate
+
+    return brand_models_fig(brand) , {}
+
+# callback to move the growth map to the selected year : points of a year are sent only the first
+# time the year is reached (appended to its trace) , afterwards years are just shown or hidden
+
+@app.callback(
+            Output("charging_points_growth_fig" , "figure") ,
+            Output("charging_points_growth_state" , "data") ,
+            Input("charging_points_growth_year" , "value") ,
+            State("charging_points_growth_state" , "data") ,
+            prevent_initial_call = True
+)
+
+def update_charging_points_growth(year , state) :
+
+    years = charging_point_years()
+
+    if year not in years or year == state['shown'] :
+        raise PreventUpdate
+
+    patched_figure = Patch()
+
+    for i , trace_year in enumerate(years) :
+
+        if state['shown'] < trace_year <= year :
+
+            if trace_year > state['loaded'] :
+                latitude , longitude = charging_points_of_year(trace_year)
+                patched_figure['data'][i]['lat'].extend(latitude.tolist())
+                patched_figure['data'][i]['lon'].extend(longitude.tolist())
+            else :
+                patched_figure['data'][i]['visible'] = True
+
+        elif year < trace_year <= state['shown'] :
+            patched_figure['data'][i]['visible'] = False
+
+    return patched_figure , {'shown' : year , 'loaded' : max(year , state['loaded'])}
+
+# callback to play the growth map year by year (the play button starts / pauses the timer)
+
+@app.callback(
+            Output("charging_points_growth_year" , "value") ,
+            Output("charging_points_growth_timer" , "disabled") ,
+            Output("charging_points_growth_play" , "children") ,
+            Input("charging_points_growth_play" , "n_clicks") ,
+            Input("charging_points_growth_timer" , "n_intervals") ,
+            State("charging_points_growth_year" , "value") ,
+            State("charging_points_growth_timer" , "disabled") ,
+            prevent_initial_call = True
+)
+
+def play_charging_points_growth(n_clicks , n_intervals , year , paused) :
+
+    years = charging_point_years()
+
+    if ctx.triggered_id == "charging_points_growth_play" :
+
+        if not paused :
+            return dash.no_update , True , "Play"
+
+        # start again from the first year when the last one is already shown
+
+        return (years[0] if year >= years[-1] else dash.no_update) , False , "Pause"
+
+    next_years = [next_year for next_year in years if next_year > year]
+
+    if not next_years :
+        return dash.no_update , True , "Play"
+
+    # stop the timer with the last year
+
+    if len(next_years) == 1 :
+        return next_years[0] , True , "Play"
+
+    return next_years[0] , dash.no_update , dash.no_update
+
+# callback to switch the forecast model of the prediction graph (every model is a memoized figure)
+
+@app.callback(
+            Output("ttcp_fig" , "figure") ,
+            Input("ttcp_model" , "value") ,
+            prevent_initial_call = True
+)
+
+def select_forecast_model(model) :
+
+    if model not in forecast_models :
+        raise PreventUpdate
+
+    return get_figure(f'ttcp_{model}_fig')
+
+# callback to answer a click on the charging points map with the nearest charging points
+
+@app.callback(
+            Output("charging_points_nearest" , "children") ,
+            Input("charging_points_map_fig" , "clickData") ,
+            prevent_initial_call = True
+)
+
+def show_nearest_charging_points(click_data) :
+
+    if not click_data or not click_data.get('points') :
+        raise PreventUpdate
+
+    point = click_data['points'][0]
+    distances , nearest = nearest_charging_points(point['lat'] , point['lon'] , k = 3)
+    within_5_km = count_charging_points_within(point['lat'] , point['lon'] , 5)[0]
+
+    nearest_text = ' , '.join(
+        f"{distance:.1f} km ({row.Ort}, {row.PLZ}, {row.year})"
+        for distance , row in zip(distances[0] , nearest.itertuples())
+    )
+
+    return f"Nearest charging points: {nearest_text} | {within_5_km} charging points within 5 km"
+
+# preload (gunicorn)
+
+# gunicorn.conf.py runs gunicorn with preload_app : the module is imported once in the master
+# and preload() builds everything there before the workers are forked ; the workers share
+# the master's memory copy-on-write, so a page is only copied when a worker writes to it
+# gc.freeze() keeps the garbage collector from writing to every preloaded object , and the
+# sections are served from their json bytes (one object each , its refcount touches one page)
+
+def preload() :
+
+    started = time.perf_counter()
+
+    # all figures (from the figure cache or built) and all rendered sections
+
+    for name in figure_builders :
+        get_figure(name)
+
+    for name in section_names :
+        section_layout(name)
+
+    # the data behind the map and drill-down callbacks , including the spatial index
+    # (sklearn is imported here once instead of in every worker)
+
+    charging_point_density()
+    charging_point_year_slices()
+    cluster_gas_stations()
+    gas_station_coverage()
+    registration_model_index()
+    charging_point_index()
+
+    gc.collect()
+    gc.freeze()
+
+    return time.perf_counter() - started
+
+
+
+# import report
+
+# heavy libraries that are kept off the startup path : the forecasts are fitted with numpy and
+# sklearn is only imported when the first spatial index (BallTree) is built
+
+lazy_imports = ['sklearn.linear_model' , 'sklearn.neighbors']
+
+# what every worker imports anyway , measured first so only the extra cost of a lazy import counts
+
+startup_imports = 'numpy , pandas , plotly.express , dash'
+
+
+def measure_import(module) :
+
+    # a fresh interpreter per module , nothing is cached from an earlier import
+
+    code = (
+        f'import time , resource , {startup_imports}\n'
+        'memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n'
+        'started = time.perf_counter()\n'
+        f'import {module}\n'
+        'print(time.perf_counter() - started , resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory)'
+    )
+
+    output = subprocess.run([sys.executable , '-c' , code] , capture_output = True , text = True , check = True).stdout
+    seconds , kilobytes = output.split()
+
+    return float(seconds) , int(kilobytes) / 1024
+
+
+# serialization benchmark
+
+# per section : payload size and the time to serialize its layout with the plotly json engine
+# and plain lists (before) and with the configured engine and typed arrays (after) ; "render"
+# is the first visit (components + figures) , "response" every later visit (the cached dicts
+# dash encodes for the callback response)
+
+def plain_trace(trace) :
+
+    # typed array specs back to lists , the form the figures had before
+
+    def plain(value) :
+        if isinstance(value , dict) and 'bdata' in value :
+            return np.frombuffer(base64.b64decode(value['bdata']) , dtype = '<' + value['dtype']).tolist()
+        if isinstance(value , dict) :
+            return {key : plain(item) for key , item in value.items()}
+        return value
+
+    return plain(trace)
+
+
+def time_serialization(value , dumps , repeat) :
+
+    timings = []
+
+    for _ in range(repeat) :
+        started = time.perf_counter()
+        value_json = dumps(value)
+        timings.append(time.perf_counter() - started)
+
+    return min(timings) * 1000 , len(value_json.encode())
+
+
+def json_benchmark(repeat = 5) :
+
+    for name in figure_builders :
+        get_figure(name)
+
+    typed_figures = dict(figures)
+    plain_figures = {name : dict(figure , data = [plain_trace(trace) for trace in figure['data']] ,
+                                 frames = [dict(frame , data = [plain_trace(trace) for trace in frame.get('data' , [])])
+                                           for frame in figure.get('frames' , [])])
+                     for name , figure in typed_figures.items()}
+
+    print(f"{'section':<18}{'KB before':>10}{'KB after':>10}{'render ms before':>18}{'after':>8}{'response ms before':>20}{'after':>8}")
+
+    for section in section_names :
+        results = []
+
+        # before : plotly json engine for both ; after : what section_layout and dash use now
+
+        for stored , render_dumps , response_dumps in (
+            (plain_figures , partial(to_json_plotly , engine = 'json') , partial(to_json_plotly , engine = 'json')) ,
+            (typed_figures , dumps_json , to_json_plotly)
+        ) :
+            figures.update(stored)
+            layout = render_section(section)
+            render_ms , size = time_serialization(layout , render_dumps , repeat)
+            response_ms , _ = time_serialization(json.loads(to_json_plotly(layout)) , response_dumps , repeat)
+            results.append((size , render_ms , response_ms))
+
+        (size_before , render_before , response_before) , (size_after , render_after , response_after) = results
+        print(f"{section:<18}{size_before / 1024:>10.0f}{size_after / 1024:>10.0f}{render_before:>18.1f}{render_after:>8.1f}{response_before:>20.1f}{response_after:>8.1f}")
+
+    figures.update(typed_figures)
+
+
+
+# time to import this module (libraries , registries , layout) , reported on /metrics
+
+import_seconds = time.perf_counter() - import_started
+
 server = app.server
 
 if __name__ == "__main__" :
-    import os
+
+    # build step : python mobility_matrix.py build-cache
+
+    if sys.argv[1:] == ["build-cache"] :
+
+        # logo variants first, the market share figures reference them
+
+        try :
+            variants = build_logo_variants()
+            print(f"wrote {len(variants)} logo variants to {LOGO_DIR}")
+        except ImportError :
+            print("pillow is not installed, the market share figures use the original logos")
+
+        rebuilt = build_figure_cache()
+        print(f"rebuilt {len(rebuilt)} of {len(figure_builders)} figures: {', '.join(rebuilt) or '-'}")
+
+        broken = check_prediction_bands()
+
+        for model , federal_state , index in broken :
+            print(f"prediction band out of range: {model} , {federal_state} , {index}")
+
+        overdrawn = registration_table()[1]
+
+        for brand , column in overdrawn :
+            print(f"registrations: model rows exceed the brand total: {brand} , {column}")
+
+        sys.exit(1 if broken or overdrawn else 0)
+
+    # python mobility_matrix.py import-report : startup time and what the lazy imports save
+
+    if sys.argv[1:] == ["import-report"] :
+        print(f"app import: {import_seconds:.2f} s")
+
+        for module in lazy_imports :
+            seconds , megabytes = measure_import(module)
+            print(f"{module}: {seconds:.2f} s , {megabytes:.0f} MB saved at startup ({'imported' if module in sys.modules else 'not imported'})")
+
+        sys.exit(0)
+
+    # python mobility_matrix.py json-benchmark : serialization time per section , before / after
+
+    if sys.argv[1:] == ["json-benchmark"] :
+        json_benchmark()
+        sys.exit(0)
+
     port = int(os.environ.get("PORT", 8000))
     app.run_server(host="0.0.0.0", port=port)